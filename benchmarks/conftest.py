@@ -0,0 +1,45 @@
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from shopping_list.models import User
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baseline",
+        action="store_true",
+        help="Store the results of the route benchmarks as their baseline.",
+    )
+    parser.addoption(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Slowdown of routes over their baseline that is tolerated, "
+        "as a fraction.",
+    )
+
+
+@pytest.fixture(autouse=True)
+def synchronous_last_interaction(settings):
+    settings.SHOPPING_LIST_INTERACTION_WRITE_BEHIND = False
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def bench_user(db):
+    return User.objects.create(username="bench", password=make_password(None))
+
+
+@pytest.fixture
+def bench_client(bench_user):
+    client = APIClient()
+    client.force_authenticate(bench_user)
+    return client
@@ -0,0 +1,172 @@
+"""
+Compares how the sync and the async variants of the read endpoints hold
+up under concurrent requests, served by uvicorn over ASGI.
+
+    python -m benchmarks.load_async [--requests 2000] [--port 8765]
+
+Seeds a database of its own (see benchmarks/settings.py), starts
+uvicorn with a single worker and measures throughput and latency of
+both variants at increasing numbers of concurrent connections. Where
+throughput stops growing is the concurrency ceiling of a variant.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CONCURRENCY = [1, 8, 32, 128]
+SHOPPING_LISTS = 20
+SHOPPING_ITEMS = 50
+
+
+def seed():
+    """
+    Creates a user with a token and shopping lists full of items, and
+    returns the token and the id of a shopping list.
+    """
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    from rest_framework.authtoken.models import Token
+
+    from shopping_list.models import ShoppingItem, ShoppingList, User
+
+    call_command("migrate", verbosity=0)
+    User.objects.filter(username="bench").delete()
+    user = User.objects.create_user("bench", password=None)
+    for i in range(SHOPPING_LISTS):
+        shopping_list = ShoppingList.objects.create(name=f"List {i}")
+        shopping_list.members.add(user)
+        ShoppingItem.objects.bulk_create(
+            ShoppingItem(
+                shopping_list=shopping_list,
+                name=f"Item {j}",
+                purchased=j % 2 == 0,
+            )
+            for j in range(SHOPPING_ITEMS)
+        )
+    return Token.objects.create(user=user).key, shopping_list.id
+
+
+async def fetch(reader, writer, request):
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    content_length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b""):
+            break
+        name, _, value = header.partition(b":")
+        if name.lower() == b"content-length":
+            content_length = int(value)
+    await reader.readexactly(content_length)
+    return int(status_line.split()[1])
+
+
+async def load(port, path, token, concurrency, requests):
+    """
+    Sends `requests` requests over `concurrency` keep-alive connections,
+    and returns requests per second and latencies in milliseconds.
+    """
+    request = (
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: 127.0.0.1:{port}\r\n"
+        f"Authorization: Token {token}\r\n"
+        "Connection: keep-alive\r\n\r\n"
+    ).encode()
+    latencies = []
+    remaining = [requests]
+
+    async def connection():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            status = await fetch(reader, writer, request)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                raise RuntimeError(f"{path} returned {status}")
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start), latencies
+
+
+async def wait_for_server(port):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn didn't start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+    token, shopping_list_id = seed()
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "core.asgi:application",
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+        ]
+    )
+    try:
+        asyncio.run(wait_for_server(args.port))
+        endpoints = [
+            "shopping-lists/",
+            f"shopping-lists/{shopping_list_id}/shopping-items/",
+        ]
+        print(
+            f"{'endpoint':<20} {'variant':<6} {'connections':>11} "
+            f"{'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}"
+        )
+        for endpoint in endpoints:
+            for variant, prefix in [
+                ("sync", "/api/"),
+                ("async", "/api/async/"),
+            ]:
+                for concurrency in CONCURRENCY:
+                    rate, latencies = asyncio.run(
+                        load(
+                            args.port,
+                            prefix + endpoint,
+                            token,
+                            concurrency,
+                            args.requests,
+                        )
+                    )
+                    quantiles = statistics.quantiles(latencies, n=20)
+                    print(
+                        f"{endpoint.split('/')[-2]:<20} {variant:<6} "
+                        f"{concurrency:>11} {rate:>8.0f} "
+                        f"{statistics.median(latencies):>8.1f} "
+                        f"{quantiles[-1]:>8.1f}"
+                    )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+Settings of the load benchmarks, which run the app in a real server
+against a database of their own.
+"""
+
+import os
+import tempfile
+
+from core.settings import *  # noqa: F401, F403
+from core.settings import REST_FRAMEWORK
+
+DEBUG = False
+ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get(
+            "BENCHMARK_DATABASE",
+            os.path.join(tempfile.gettempdir(), "shopping_list_bench.sqlite3"),
+        ),
+    }
+}
+
+# Throttling would cap the measured request rates
+REST_FRAMEWORK = {**REST_FRAMEWORK, "DEFAULT_THROTTLE_CLASSES": []}
@@ -0,0 +1,77 @@
+import pytest
+from django.urls import reverse
+
+from benchmarks.timing import measure
+from shopping_list.api.pagination import KeysetPagination
+from shopping_list.models import ShoppingItem, ShoppingList
+
+ITEMS = 20000
+PAGE_SIZE = 10
+
+
+@pytest.fixture
+def large_shopping_list(bench_user):
+    shopping_list = ShoppingList.objects.create(name="Large")
+    shopping_list.members.add(bench_user)
+    ShoppingItem.objects.bulk_create(
+        (
+            ShoppingItem(
+                name=f"Item {i:05}",
+                purchased=i % 3 == 0,
+                shopping_list=shopping_list,
+            )
+            for i in range(ITEMS)
+        ),
+        batch_size=1000,
+    )
+    return shopping_list
+
+
+def cursor_at(queryset, position):
+    """
+    Returns the cursor a client would follow to the page that starts at
+    the given position.
+    """
+    paginator = KeysetPagination()
+    paginator.ordering = paginator.get_ordering(queryset)
+    return paginator.encode_cursor(
+        queryset.order_by("purchased", "id")[position - 1]
+    )
+
+
+@pytest.mark.django_db
+def test_latency_of_deep_pages(bench_client, large_shopping_list):
+    url = reverse("list_add_shopping_item", args=[large_shopping_list.id])
+    queryset = ShoppingItem.objects.filter(
+        shopping_list=large_shopping_list
+    ).order_by("purchased", "id")
+    last_page = ITEMS // PAGE_SIZE
+
+    page_number = {
+        page: measure(
+            lambda: bench_client.get(
+                url, {"page": page, "page_size": PAGE_SIZE}
+            )
+        )
+        for page in (1, last_page // 2, last_page)
+    }
+    keyset_params = {
+        page: {
+            "cursor": cursor_at(queryset, (page - 1) * PAGE_SIZE),
+            "page_size": PAGE_SIZE,
+        }
+        for page in (last_page // 2, last_page)
+    }
+    keyset_params[1] = {"pagination": "cursor", "page_size": PAGE_SIZE}
+    keyset = {
+        page: measure(lambda: bench_client.get(url, params))
+        for page, params in keyset_params.items()
+    }
+
+    print()
+    print(f"{'page':>8} {'page number (ms)':>18} {'cursor (ms)':>14}")
+    for page in page_number:
+        print(f"{page:>8} {page_number[page]:>18.2f} {keyset[page]:>14.2f}")
+
+    # The latency of keyset pages stays flat with their depth
+    assert keyset[last_page] < keyset[1] * 2
@@ -0,0 +1,45 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.timing import measure
+from shopping_list.api.renderers import ORJSONRenderer
+from shopping_list.api.serializers import ShoppingItemSerializer
+from shopping_list.models import ShoppingItem, ShoppingList
+
+pytest.importorskip("orjson")
+
+ITEMS = 5000
+
+
+@pytest.mark.django_db
+def test_rendering_of_large_search_results(bench_user):
+    shopping_list = ShoppingList.objects.create(name="Large")
+    shopping_list.members.add(bench_user)
+    ShoppingItem.objects.bulk_create(
+        ShoppingItem(
+            name=f"Item {i:05}",
+            purchased=i % 3 == 0,
+            shopping_list=shopping_list,
+        )
+        for i in range(ITEMS)
+    )
+    # The shape of a page of SearchShoppingItems
+    data = {
+        "count": ITEMS,
+        "next": None,
+        "previous": None,
+        "results": ShoppingItemSerializer(
+            ShoppingItem.objects.all(), many=True
+        ).data,
+    }
+
+    json_renderer = measure(lambda: JSONRenderer().render(data))
+    orjson_renderer = measure(lambda: ORJSONRenderer().render(data))
+
+    print()
+    print(f"{'renderer':>16} {'ms':>8}")
+    print(f"{'JSONRenderer':>16} {json_renderer:>8.2f}")
+    print(f"{'ORJSONRenderer':>16} {orjson_renderer:>8.2f}")
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert orjson_renderer < json_renderer
@@ -0,0 +1,400 @@
+"""
+Measures the throughput, latency and queries of every route of the API
+against a dataset shaped like production's: many users, shopping lists
+with hundreds of members and shopping lists with thousands of items.
+
+    pytest benchmarks/test_routes.py [--update-baseline] [--tolerance 0.5]
+
+Requests are sent one after the other through Django's test client, in
+process over WSGI, and through its async client over ASGI, in rounds of
+which the fastest is kept. Results are compared with
+benchmarks/baseline.json: a route regresses when it makes more queries
+than its baseline, or when its throughput or median latency is worse by
+more than the tolerance. The 99th percentile of a round is mostly noise
+of the machine, so it's reported but not compared. Timings of a baseline
+only mean something on the machine that stored it.
+
+The event stream and the log in and out pages of the browsable API
+aren't measured.
+"""
+
+import gc
+import json
+import re
+import time
+from pathlib import Path
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.throttling import SimpleRateThrottle
+
+from benchmarks.timing import summarize
+from shopping_list.models import (
+    ShoppingItem,
+    ShoppingList,
+    User,
+    unpurchased_preview,
+)
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+USERS = 500
+MEMBERS = 300
+ITEMS = 5000
+SHOPPING_LISTS = 50
+SHOPPING_LIST_ITEMS = 20
+REQUESTS = 50
+ROUNDS = 3
+WARMUP = 5
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def create_shopping_list(name, members, item_count):
+    """
+    Creates a shopping list with its members and shopping items in bulk,
+    along with the revision, counts and preview their saves would keep.
+    """
+    shopping_list = ShoppingList.objects.create(name=name)
+    shopping_list.members.add(*members)
+    shopping_items = ShoppingItem.objects.bulk_create(
+        (
+            ShoppingItem(
+                shopping_list=shopping_list,
+                name=f"Item {i:05}",
+                purchased=i % 3 == 0,
+                revision=i + 1,
+            )
+            for i in range(item_count)
+        ),
+        batch_size=1000,
+    )
+    unpurchased_names = [
+        item.name for item in shopping_items if not item.purchased
+    ]
+    ShoppingList.objects.filter(pk=shopping_list.pk).update(
+        revision=item_count,
+        item_count=item_count,
+        unpurchased_count=len(unpurchased_names),
+        unpurchased_preview=unpurchased_preview(unpurchased_names),
+    )
+    return shopping_list, shopping_items
+
+
+@pytest.fixture
+def dataset(bench_user, settings):
+    # Token requests measure the view rather than the password hasher
+    settings.PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.MD5PasswordHasher"
+    ]
+    bench_user.set_password("bench")
+    # Staff may read the metrics
+    bench_user.is_staff = True
+    bench_user.save()
+
+    users = User.objects.bulk_create(
+        User(username=f"user{i}", password="!") for i in range(USERS)
+    )
+    family, _ = create_shopping_list(
+        "Family", [bench_user, *users[:MEMBERS]], SHOPPING_LIST_ITEMS
+    )
+    pantry, pantry_items = create_shopping_list("Pantry", [bench_user], ITEMS)
+    for i in range(SHOPPING_LISTS):
+        create_shopping_list(
+            f"List {i}", [bench_user, *users[i : i + 5]], SHOPPING_LIST_ITEMS
+        )
+    return {
+        "user": bench_user,
+        "token": Token.objects.create(user=bench_user).key,
+        "members": users[:MEMBERS],
+        "outsiders": users[MEMBERS:],
+        "family": family,
+        "pantry": pantry,
+        "pantry_items": pantry_items,
+    }
+
+
+def routes(dataset):
+    """
+    Returns functions that prepare the i-th request of every route, by
+    method and route name. They return the method, the path and the data
+    of the request, which is sent without them being timed.
+    """
+    family = dataset["family"].id
+    pantry = dataset["pantry"].id
+    pantry_items = dataset["pantry_items"]
+
+    def shopping_list_to_delete(i):
+        shopping_list, _ = create_shopping_list(
+            f"Deleted {i}", [dataset["user"]], SHOPPING_LIST_ITEMS
+        )
+        return reverse("shopping_list_detail", args=[shopping_list.id])
+
+    def shopping_item(i):
+        return reverse(
+            "shopping_item_detail", args=[pantry, pantry_items[i].id]
+        )
+
+    return {
+        "POST api_token_auth": lambda i: (
+            "post",
+            reverse("api_token_auth"),
+            {"username": "bench", "password": "bench"},
+        ),
+        "GET all_shopping_lists": lambda i: (
+            "get",
+            reverse("all_shopping_lists"),
+            None,
+        ),
+        "POST all_shopping_lists": lambda i: (
+            "post",
+            reverse("all_shopping_lists"),
+            {"name": f"New {i}"},
+        ),
+        "GET shopping_list_detail": lambda i: (
+            "get",
+            reverse("shopping_list_detail", args=[family]),
+            None,
+        ),
+        "PATCH shopping_list_detail": lambda i: (
+            "patch",
+            reverse("shopping_list_detail", args=[family]),
+            {"name": f"Family {i}"},
+        ),
+        "DELETE shopping_list_detail": lambda i: (
+            "delete",
+            shopping_list_to_delete(i),
+            None,
+        ),
+        "PUT shopping_list_add_members": lambda i: (
+            "put",
+            reverse("shopping_list_add_members", args=[family]),
+            {"members": [dataset["outsiders"][i].pk]},
+        ),
+        "PUT shopping_list_remove_members": lambda i: (
+            "put",
+            reverse("shopping_list_remove_members", args=[family]),
+            {"members": [dataset["members"][i].pk]},
+        ),
+        "GET list_add_shopping_item": lambda i: (
+            "get",
+            reverse("list_add_shopping_item", args=[pantry]),
+            None,
+        ),
+        "POST list_add_shopping_item": lambda i: (
+            "post",
+            reverse("list_add_shopping_item", args=[pantry]),
+            {"name": f"New {i}", "purchased": False},
+        ),
+        "POST bulk_shopping_items": lambda i: (
+            "post",
+            reverse("bulk_shopping_items", args=[pantry]),
+            {
+                "create": [
+                    {"name": f"Bulk {i} {j}", "purchased": False}
+                    for j in range(10)
+                ],
+                "update": [
+                    {
+                        "id": str(pantry_items[i].id),
+                        "name": f"Updated {i}",
+                    }
+                ],
+            },
+        ),
+        "GET shopping_item_changes": lambda i: (
+            "get",
+            reverse("shopping_item_changes", args=[pantry]),
+            {"since": ITEMS - 50},
+        ),
+        "GET shopping_item_detail": lambda i: ("get", shopping_item(i), None),
+        "PATCH shopping_item_detail": lambda i: (
+            "patch",
+            shopping_item(i),
+            {"purchased": not pantry_items[i].purchased},
+        ),
+        "DELETE shopping_item_detail": lambda i: (
+            "delete",
+            shopping_item(-i - 1),
+            None,
+        ),
+        "GET search_shopping_items": lambda i: (
+            "get",
+            reverse("search_shopping_items"),
+            {"search": f"Item {i:05}"},
+        ),
+        "GET async_all_shopping_lists": lambda i: (
+            "get",
+            reverse("async_all_shopping_lists"),
+            None,
+        ),
+        "GET async_shopping_list_detail": lambda i: (
+            "get",
+            reverse("async_shopping_list_detail", args=[family]),
+            None,
+        ),
+        "GET async_list_shopping_items": lambda i: (
+            "get",
+            reverse("async_list_shopping_items", args=[pantry]),
+            None,
+        ),
+        "GET async_shopping_item_detail": lambda i: (
+            "get",
+            reverse(
+                "async_shopping_item_detail", args=[pantry, pantry_items[i].id]
+            ),
+            None,
+        ),
+        "GET metrics": lambda i: ("get", reverse("metrics"), None),
+        "GET schema": lambda i: ("get", reverse("schema"), None),
+        "GET swagger-ui": lambda i: ("get", reverse("swagger-ui"), None),
+    }
+
+
+def request_kwargs(method, data, token):
+    kwargs = {"headers": {"Authorization": f"Token {token}"}}
+    if data is None:
+        return kwargs
+    if method == "get":
+        return {**kwargs, "data": data}
+    return {
+        **kwargs,
+        "data": json.dumps(data),
+        "content_type": "application/json",
+    }
+
+
+def check(route, response):
+    if response.status_code >= 300:
+        raise AssertionError(
+            f"{route} returned {response.status_code}: {response.content!r}"
+        )
+    return int(QUERIES.search(response.headers["Server-Timing"]).group(1))
+
+
+def send_wsgi(client, token, route, requests):
+    latencies, queries = [], []
+    for method, path, data in requests:
+        start = time.perf_counter()
+        response = getattr(client, method)(
+            path, **request_kwargs(method, data, token)
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(check(route, response))
+    return latencies, queries
+
+
+@async_to_sync
+async def send_asgi(client, token, route, requests):
+    latencies, queries = [], []
+    for method, path, data in requests:
+        start = time.perf_counter()
+        response = await getattr(client, method)(
+            path, **request_kwargs(method, data, token)
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(check(route, response))
+    return latencies, queries
+
+
+DRIVERS = {"wsgi": (Client, send_wsgi), "asgi": (AsyncClient, send_asgi)}
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Returns descriptions of the results that are worse than their
+    baseline.
+    """
+    found = []
+    for route, result in results.items():
+        if route not in baseline:
+            continue
+        expected = baseline[route]
+        if result["queries"] > expected["queries"]:
+            found.append(
+                f"{route}: {result['queries']} queries instead of "
+                f"{expected['queries']}"
+            )
+        if result["throughput"] < expected["throughput"] / (1 + tolerance):
+            found.append(
+                f"{route}: {result['throughput']} requests/s instead of "
+                f"{expected['throughput']}"
+            )
+        if result["p50_ms"] > expected["p50_ms"] * (1 + tolerance):
+            found.append(
+                f"{route}: p50 of {result['p50_ms']} ms instead of "
+                f"{expected['p50_ms']}"
+            )
+    return found
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("driver", DRIVERS)
+def test_routes(driver, dataset, settings, monkeypatch, pytestconfig):
+    settings.SHOPPING_LIST_SERVER_TIMING = True
+    # Deployments share membership indexes and token stamps between
+    # processes in a cache that keeps them, unlike the local memory cache
+    # of the benchmarks
+    settings.SHOPPING_LIST_MEMBERSHIP_LOCAL_CACHE_TIMEOUT = (
+        settings.SHOPPING_LIST_MEMBERSHIP_CACHE_TIMEOUT
+    )
+    settings.SHOPPING_LIST_TOKEN_LOCAL_CACHE_TIMEOUT = (
+        settings.SHOPPING_LIST_TOKEN_CACHE_TIMEOUT
+    )
+    for scope in ["user_minute", "user_day"]:
+        monkeypatch.setitem(
+            SimpleRateThrottle.THROTTLE_RATES, scope, "1000000/day"
+        )
+    client_class, send = DRIVERS[driver]
+    client = client_class()
+
+    results = {}
+    for route, prepare in routes(dataset).items():
+        requests = [prepare(i) for i in range(WARMUP + ROUNDS * REQUESTS)]
+        send(client, dataset["token"], route, requests[:WARMUP])
+        rounds = []
+        for start in range(WARMUP, len(requests), REQUESTS):
+            # Collections would land on random requests, like timeit
+            gc.collect()
+            gc.disable()
+            try:
+                measured = send(
+                    client,
+                    dataset["token"],
+                    route,
+                    requests[start : start + REQUESTS],
+                )
+            finally:
+                gc.enable()
+            rounds.append(summarize(*measured))
+        # The fastest round is the one least disturbed by the machine
+        results[route] = max(rounds, key=lambda result: result["throughput"])
+        results[route]["queries"] = max(result["queries"] for result in rounds)
+
+    print()
+    print(
+        f"{driver + ' route':<36} {'queries':>7} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for route, result in results.items():
+        print(
+            f"{route:<36} {result['queries']:>7} "
+            f"{result['throughput']:>8.1f} {result['p50_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f}"
+        )
+
+    baselines = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    if pytestconfig.getoption("update_baseline"):
+        baselines[driver] = results
+        BASELINE.write_text(json.dumps(baselines, indent=2) + "\n")
+        return
+
+    if driver not in baselines:
+        pytest.skip(f"No {driver} baseline, store one with --update-baseline")
+    found = regressions(
+        results, baselines[driver], pytestconfig.getoption("tolerance")
+    )
+    assert not found, "\n".join(found)
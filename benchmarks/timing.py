@@ -0,0 +1,29 @@
+import statistics
+import time
+
+
+def measure(func, repeat=20):
+    """
+    Calls func `repeat` times and returns the median duration in
+    milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def summarize(latencies, queries):
+    """
+    Returns the throughput, the median and 99th percentile latency in
+    milliseconds and the most queries of sequential requests, given
+    their latencies in milliseconds and their numbers of queries.
+    """
+    return {
+        "queries": max(queries),
+        "throughput": round(len(latencies) / sum(latencies) * 1000, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(statistics.quantiles(latencies, n=100)[98], 2),
+    }
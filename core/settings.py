@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,6 +26,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "shopping_list.middleware.MetricsMiddleware",
+    "shopping_list.middleware.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -57,11 +60,51 @@ WSGI_APPLICATION = "core.wsgi.application"
 
 
 # Database
+# Connections are kept open for CONN_MAX_AGE seconds and checked before
+# they are reused. Under ASGI, set DATABASE_CONN_MAX_AGE=0 and pool the
+# connections of PostgreSQL with PgBouncer instead, as Django advises.
+DATABASE_CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", 60))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": DATABASE_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        # Tests share the database between threads, which WAL mode only
+        # allows for files
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    }
+}
+
+if os.environ.get("POSTGRES_DB"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ["POSTGRES_DB"],
+        "USER": os.environ.get("POSTGRES_USER", ""),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+        "HOST": os.environ.get("POSTGRES_HOST", ""),
+        "PORT": os.environ.get("POSTGRES_PORT", ""),
+        "CONN_MAX_AGE": DATABASE_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        # Server-side cursors don't survive PgBouncer's transaction pooling
+        "DISABLE_SERVER_SIDE_CURSORS": (
+            os.environ.get("POSTGRES_POOLING") == "transaction"
+        ),
+        "OPTIONS": {"connect_timeout": 5},
     }
+
+DATABASE_ROUTERS = ["shopping_list.routers.ReplicaRouter"]
+
+# Set on every SQLite connection. In WAL mode readers and the writer don't
+# block each other, and with synchronous=NORMAL commits don't wait for the
+# disk, at the risk of losing the last transactions on power loss. Writers
+# wait up to busy_timeout milliseconds for each other.
+SHOPPING_LIST_SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 20000,
+    "mmap_size": 256 * 1024 * 1024,
 }
 
 
@@ -108,7 +151,7 @@ AUTH_USER_MODEL = "shopping_list.User"
 # DRF settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "shopping_list.api.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -127,12 +170,77 @@ REST_FRAMEWORK = {
         "user_minute": "200/minute",
     },
     # Disable default DRF browsable API
+    # JSON is rendered and parsed with orjson when it is installed
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "shopping_list.api.renderers.ORJSONRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "shopping_list.api.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Shopping list settings
+# Cache alias and timeout (in seconds) of the shopping list membership index.
+# Member changes only reach the other processes through a shared cache,
+# such as Redis or Memcached. A local-memory cache, the default without
+# CACHES, keeps indexes for SHOPPING_LIST_MEMBERSHIP_LOCAL_CACHE_TIMEOUT
+# seconds instead, during which a removed member may stay authorized.
+SHOPPING_LIST_MEMBERSHIP_CACHE = "default"
+SHOPPING_LIST_MEMBERSHIP_CACHE_TIMEOUT = 60 * 60
+SHOPPING_LIST_MEMBERSHIP_LOCAL_CACHE_TIMEOUT = 5
+# Coalesce last_interaction updates of shopping lists per transaction
+SHOPPING_LIST_INTERACTION_WRITE_BEHIND = True
+# Number of serialized shopping lists kept in memory by every process
+SHOPPING_LIST_FRAGMENT_CACHE_SIZE = 1000
+# Number of unpurchased items previewed with every shopping list. Run
+# check_unpurchased_previews --repair after changing it.
+SHOPPING_LIST_PREVIEW_SIZE = 3
+# Number of tokens whose users are kept in memory by every process, and
+# for how many seconds. Deleted tokens and changed users are revoked in
+# every process through version stamps in SHOPPING_LIST_TOKEN_CACHE, when
+# it is shared, such as Redis or Memcached. A local-memory cache, the
+# default without CACHES, keeps users for
+# SHOPPING_LIST_TOKEN_LOCAL_CACHE_TIMEOUT seconds instead. Users changed
+# with QuerySet.update(), e.g. update(is_active=False), send no signals
+# and are only noticed once their tokens time out.
+SHOPPING_LIST_TOKEN_CACHE = "default"
+SHOPPING_LIST_TOKEN_CACHE_SIZE = 10000
+SHOPPING_LIST_TOKEN_CACHE_TIMEOUT = 60
+SHOPPING_LIST_TOKEN_LOCAL_CACHE_TIMEOUT = 5
+# Keeps the request counters of MinuteRateThrottle and DailyRateThrottle.
+# CacheCounterStore makes a call to the cache per throttle, and one more,
+# for every request. Only RedisCounterStore counts all scopes of a request
+# in a single round trip, and it requires a cache using Django's Redis
+# backend.
+SHOPPING_LIST_THROTTLE_STORE = (
+    "shopping_list.api.throttling.CacheCounterStore"
+)
+SHOPPING_LIST_THROTTLE_CACHE = "default"
+# Seconds the tombstones of deleted shopping items are kept for, so that
+# clients can sync deletions. Pruned by the prune_tombstones management
+# command, after which clients that synced before them sync again.
+SHOPPING_LIST_TOMBSTONE_RETENTION = 30 * 24 * 60 * 60
+# Fans events of shopping lists out to their subscribers. The in-memory
+# broker only reaches subscribers connected to the same process.
+SHOPPING_LIST_EVENT_BROKER = "shopping_list.events.InMemoryBroker"
+# Seconds between keep-alive comments on idle event streams
+SHOPPING_LIST_EVENTS_HEARTBEAT = 15
+# Send the database, rendering and total time of every request in a
+# Server-Timing header. It reveals timings to clients.
+SHOPPING_LIST_SERVER_TIMING = False
+# Aliases of DATABASES that replicate the default database. Reads of GET,
+# HEAD and OPTIONS requests go to one of them. After a client writes, its
+# reads go to the default database for a number of seconds that should
+# exceed the replication lag, tracked in SHOPPING_LIST_REPLICA_PIN_CACHE.
+# Every process must see the pins, so with replicas the system checks
+# reject a local-memory or dummy cache there; use Redis or Memcached.
+SHOPPING_LIST_READ_REPLICAS = []
+SHOPPING_LIST_REPLICA_PIN_TIMEOUT = 10
+SHOPPING_LIST_REPLICA_PIN_CACHE = "default"
+
 # drf-spectacular settings
 SPECTACULAR_SETTINGS = {
     "TITLE": "Shopping lists API",
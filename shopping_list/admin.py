@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from shopping_list.models import ShoppingItem, ShoppingList
+from shopping_list.models import (ShoppingItem, ShoppingItemTombstone,
+                                  ShoppingList)
 
 admin.site.register(ShoppingItem)
 admin.site.register(ShoppingList)
+admin.site.register(ShoppingItemTombstone)
@@ -0,0 +1,333 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db.models import prefetch_related_objects
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from shopping_list.api.authentication import token_cache
+from shopping_list.api.pagination import LargeResultsSetPagination
+from shopping_list.api.serializers import (ShoppingItemSerializer,
+                                           ShoppingListSerializer)
+from shopping_list.events import get_broker
+from shopping_list.fragments import fragment_cache
+from shopping_list.membership import ais_shopping_list_member
+from shopping_list.models import ShoppingItem, ShoppingList
+
+
+class AsyncAPIView(View):
+    """
+    Base of the read-only async variants of the API views, which run on
+    the event loop under ASGI instead of in a thread per request.
+
+    Authenticates like CachedTokenAuthentication and SessionAuthentication,
+    throttles with the default throttles, and renders errors and results
+    like DRF. DRF views are sync, so content negotiation isn't applied.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    keyword = "Token"
+
+    async def authenticate(self, request):
+        auth = request.headers.get("Authorization", "").split()
+        if auth and auth[0].lower() == self.keyword.lower():
+            if len(auth) != 2:
+                raise exceptions.AuthenticationFailed("Invalid token header.")
+            user = await token_cache.aget(auth[1])
+            if user is not None:
+                return user
+            stamp = await token_cache.astamp(auth[1])
+            try:
+                token = await Token.objects.select_related("user").aget(
+                    key=auth[1]
+                )
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed("Invalid token.")
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(
+                    "User inactive or deleted."
+                )
+            token_cache.set(token.key, token.user, stamp)
+            return token.user
+
+        # Sessions and their users are only loaded synchronously in
+        # Django 4.2
+        user = await sync_to_async(get_user)(request)
+        if not user.is_active:
+            raise exceptions.NotAuthenticated()
+        return user
+
+    async def check_permissions(self, request, **kwargs):
+        pass
+
+    def get_throttles(self):
+        return [
+            throttle() for throttle in api_settings.DEFAULT_THROTTLE_CLASSES
+        ]
+
+    def check_throttles(self, request):
+        durations = [
+            throttle.wait()
+            for throttle in self.get_throttles()
+            if not throttle.allow_request(request, self)
+        ]
+        if durations:
+            durations = [
+                duration for duration in durations if duration is not None
+            ]
+            raise exceptions.Throttled(max(durations, default=None))
+
+    async def check_object_permissions(self, request, shopping_list_id):
+        if request.user.is_superuser:
+            return
+        if not await ais_shopping_list_member(request, shopping_list_id):
+            raise exceptions.PermissionDenied()
+
+    async def get_data(self, request, **kwargs):
+        raise NotImplementedError
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            request.user = await self.authenticate(request)
+            await self.check_permissions(request, **kwargs)
+            # Throttles count requests in the cache
+            await sync_to_async(self.check_throttles)(request)
+            data = await self.get_data(request, **kwargs)
+        except exceptions.APIException as exc:
+            response = self.render(
+                {"detail": exc.detail}, status=exc.status_code
+            )
+            if isinstance(
+                exc,
+                (exceptions.NotAuthenticated, exceptions.AuthenticationFailed),
+            ):
+                response.headers["WWW-Authenticate"] = self.keyword
+            if getattr(exc, "wait", None):
+                response.headers["Retry-After"] = "%d" % exc.wait
+            return response
+
+        return self.respond(request, data)
+
+    def respond(self, request, data):
+        return self.render(data)
+
+    def render(self, data, status=200):
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        return HttpResponse(
+            renderer.render(data),
+            content_type=renderer.media_type,
+            status=status,
+        )
+
+    async def paginate(self, request, queryset, page_size):
+        """
+        Returns a page of the queryset like PageNumberPagination does.
+        """
+        try:
+            page_number = int(request.GET.get("page", 1))
+            if page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise exceptions.NotFound("Invalid page.")
+
+        count = await queryset.acount()
+        num_pages = max(1, -(-count // page_size))
+        if page_number > num_pages:
+            raise exceptions.NotFound("Invalid page.")
+
+        offset = (page_number - 1) * page_size
+        results = [obj async for obj in queryset[offset : offset + page_size]]
+
+        url = request.build_absolute_uri()
+        next_url = None
+        if page_number < num_pages:
+            next_url = replace_query_param(url, "page", page_number + 1)
+        previous_url = None
+        if page_number == 2:
+            previous_url = remove_query_param(url, "page")
+        elif page_number > 2:
+            previous_url = replace_query_param(url, "page", page_number - 1)
+
+        return count, next_url, previous_url, results
+
+
+async def serialize_shopping_lists(shopping_lists):
+    """
+    Assembles shopping lists from cached fragments. Django 4.2 can't
+    prefetch asynchronously, so the related objects of the shopping lists
+    that aren't cached are loaded in one trip to a thread.
+    """
+    fragments = fragment_cache.get_many(shopping_lists)
+    missing = [
+        shopping_list
+        for shopping_list in shopping_lists
+        if shopping_list.pk not in fragments
+    ]
+
+    if missing:
+        await sync_to_async(prefetch_related_objects)(
+            missing, *ShoppingListSerializer.eager_loading_lookups()
+        )
+        serializer = ShoppingListSerializer(missing, many=True)
+        for shopping_list, fragment in zip(missing, serializer.data):
+            fragment_cache.set(shopping_list, fragment)
+            fragments[shopping_list.pk] = fragment
+
+    return [fragments[shopping_list.pk] for shopping_list in shopping_lists]
+
+
+class AsyncListShoppingLists(AsyncAPIView):
+    async def get_data(self, request, **kwargs):
+        queryset = ShoppingList.objects.filter(members=request.user).order_by(
+            "-last_interaction"
+        )
+        count, next_url, previous_url, shopping_lists = await self.paginate(
+            request, queryset, api_settings.PAGE_SIZE
+        )
+        return {
+            "count": count,
+            "next": next_url,
+            "previous": previous_url,
+            "results": await serialize_shopping_lists(shopping_lists),
+        }
+
+
+class AsyncShoppingListDetail(AsyncAPIView):
+    async def get_data(self, request, pk):
+        try:
+            shopping_list = await ShoppingList.objects.aget(pk=pk)
+        except ShoppingList.DoesNotExist:
+            raise exceptions.NotFound()
+        await self.check_object_permissions(request, shopping_list.pk)
+
+        (fragment,) = await serialize_shopping_lists([shopping_list])
+        return fragment
+
+
+class AsyncListShoppingItems(AsyncAPIView):
+    ordering_fields = ["name", "purchased"]
+    pagination_class = LargeResultsSetPagination
+
+    async def check_permissions(self, request, pk):
+        await self.check_object_permissions(request, pk)
+
+    def get_ordering(self, request):
+        """
+        Reads the ordering like OrderingFilter, ignoring unknown fields.
+        """
+        ordering = [
+            field.strip()
+            for field in request.GET.get("ordering", "").split(",")
+            if field.strip().lstrip("-") in self.ordering_fields
+        ]
+        return ordering or ["purchased", "id"]
+
+    def get_page_size(self, request):
+        pagination = self.pagination_class
+        try:
+            page_size = int(request.GET[pagination.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, pagination.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return pagination.page_size
+
+    async def get_data(self, request, pk):
+        queryset = ShoppingItem.objects.filter(shopping_list=pk).order_by(
+            *self.get_ordering(request)
+        )
+        count, next_url, previous_url, shopping_items = await self.paginate(
+            request, queryset, self.get_page_size(request)
+        )
+        return {
+            "count": count,
+            "next": next_url,
+            "previous": previous_url,
+            # The shopping list is represented by its id, which is loaded
+            "results": ShoppingItemSerializer(shopping_items, many=True).data,
+        }
+
+
+class AsyncShoppingItemDetail(AsyncAPIView):
+    async def get_data(self, request, pk, item_pk):
+        try:
+            shopping_item = await ShoppingItem.objects.aget(pk=item_pk)
+        except ShoppingItem.DoesNotExist:
+            raise exceptions.NotFound()
+        await self.check_object_permissions(
+            request, shopping_item.shopping_list_id
+        )
+
+        return ShoppingItemSerializer(shopping_item).data
+
+
+class AsyncShoppingListEvents(AsyncAPIView):
+    """
+    Streams the changes of a shopping list to its members as
+    Server-Sent Events, instead of having them poll for changes.
+
+    Events of shopping items carry the revision of the change as their
+    id. A client that reconnects, or is asked to resync, catches up on
+    what it missed with the changes feed of the shopping list.
+    """
+
+    async def get_data(self, request, pk):
+        if not await ShoppingList.objects.filter(pk=pk).aexists():
+            raise exceptions.NotFound()
+        await self.check_object_permissions(request, pk)
+        return pk
+
+    def respond(self, request, shopping_list_id):
+        response = StreamingHttpResponse(
+            self.stream(request, shopping_list_id),
+            content_type="text/event-stream",
+        )
+        response.headers["Cache-Control"] = "no-cache"
+        # Keeps proxies such as nginx from buffering the stream
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    def format_event(self, event):
+        event = dict(event)
+        event_type = event.pop("type")
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        lines = [b"event: " + event_type.encode()]
+        if "revision" in event:
+            lines.insert(0, b"id: %d" % event["revision"])
+        lines.append(b"data: " + renderer.render(event))
+        return b"\n".join(lines) + b"\n\n"
+
+    async def stream(self, request, shopping_list_id):
+        broker = get_broker()
+        # Subscribes once the response is being sent, so that a response
+        # that is never sent can't leave its subscription behind
+        subscription = broker.subscribe(shopping_list_id)
+        try:
+            yield b": subscribed\n\n"
+            while True:
+                try:
+                    event = await subscription.get(
+                        settings.SHOPPING_LIST_EVENTS_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    yield b": heartbeat\n\n"
+                    continue
+
+                if event is None:
+                    # Fell too far behind to be caught up event by event
+                    yield self.format_event({"type": "resync"})
+                    return
+                yield self.format_event(event)
+                if event["type"] == "shopping_list_deleted" or (
+                    event["type"] == "members_changed"
+                    and request.user.pk in event["removed"]
+                ):
+                    return
+        finally:
+            broker.unsubscribe(subscription)
@@ -0,0 +1,185 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Keeps the users of the most recently used tokens in memory, up to
+    SHOPPING_LIST_TOKEN_CACHE_SIZE, for SHOPPING_LIST_TOKEN_CACHE_TIMEOUT
+    seconds each.
+
+    Every user is kept with the version stamp its token had, in the cache
+    configured by SHOPPING_LIST_TOKEN_CACHE, before the user was read from
+    the database. Deleting a token or changing its user bumps the stamp,
+    which makes every process that shares the cache read the user again.
+    Processes don't share a local-memory cache, so with one users are
+    only kept for SHOPPING_LIST_TOKEN_LOCAL_CACHE_TIMEOUT seconds: that's
+    how long the other processes may accept a revoked token.
+    """
+
+    key_prefix = "token-cache"
+
+    def __init__(self, max_size=None, timeout=None, cache=None):
+        self._max_size = max_size
+        self._timeout = timeout
+        self._cache = cache
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        if self._cache is not None:
+            return self._cache
+        return caches[settings.SHOPPING_LIST_TOKEN_CACHE]
+
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return settings.SHOPPING_LIST_TOKEN_CACHE_SIZE
+
+    @property
+    def timeout(self):
+        timeout = self._timeout
+        if timeout is None:
+            timeout = settings.SHOPPING_LIST_TOKEN_CACHE_TIMEOUT
+        if isinstance(self.cache, LocMemCache):
+            return min(
+                timeout, settings.SHOPPING_LIST_TOKEN_LOCAL_CACHE_TIMEOUT
+            )
+        return timeout
+
+    def _stamp_key(self, key):
+        # Tokens are credentials, and aren't stored in the cache as they are
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return f"{self.key_prefix}:stamp:{digest}"
+
+    def stamp(self, key):
+        """
+        Returns the version stamp of the token. Has to be read before the
+        user of the token is read from the database.
+        """
+        stamp_key = self._stamp_key(key)
+        stamp = self.cache.get(stamp_key)
+        if stamp is None:
+            # A stamp that can't collide with one from before the previous
+            # stamp was evicted
+            self.cache.add(stamp_key, time.time_ns(), None)
+            stamp = self.cache.get(stamp_key)
+        return stamp
+
+    async def astamp(self, key):
+        """
+        Async variant of stamp(), for async views.
+        """
+        stamp_key = self._stamp_key(key)
+        stamp = await self.cache.aget(stamp_key)
+        if stamp is None:
+            await self.cache.aadd(stamp_key, time.time_ns(), None)
+            stamp = await self.cache.aget(stamp_key)
+        return stamp
+
+    def _cached(self, key):
+        with self._lock:
+            cached = self._users.get(key)
+            if cached is None:
+                return None
+            expires, stamp, user = cached
+            if expires <= time.monotonic():
+                del self._users[key]
+                return None
+            self._users.move_to_end(key)
+        return stamp, user
+
+    def _current(self, key, cached, stamp):
+        if cached[0] != stamp:
+            self.evict(key)
+            return None
+        # Requests get copies, as they may annotate their users
+        return copy.copy(cached[1])
+
+    def get(self, key):
+        """
+        Returns a copy of the user of the token, or None if the token
+        isn't cached or was revoked.
+        """
+        cached = self._cached(key)
+        if cached is None:
+            return None
+        return self._current(key, cached, self.stamp(key))
+
+    async def aget(self, key):
+        """
+        Async variant of get(), for async views.
+        """
+        cached = self._cached(key)
+        if cached is None:
+            return None
+        return self._current(key, cached, await self.astamp(key))
+
+    def set(self, key, user, stamp):
+        with self._lock:
+            self._users[key] = (time.monotonic() + self.timeout, stamp, user)
+            self._users.move_to_end(key)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def evict(self, key):
+        with self._lock:
+            self._users.pop(key, None)
+
+    def revoke(self, keys):
+        """
+        Makes every process that shares the cache read the users of the
+        tokens again.
+        """
+        for key in keys:
+            self.evict(key)
+            try:
+                self.cache.incr(self._stamp_key(key))
+            except ValueError:
+                # Without a stamp no cached user can be trusted anyway
+                pass
+
+    def revoke_on_commit(self, keys):
+        """
+        Revokes the tokens right away, and once more after commit, so that
+        other processes can't cache what they read from the database
+        before the change was committed.
+        """
+        keys = list(keys)
+        self.revoke(keys)
+        transaction.on_commit(lambda: self.revoke(keys))
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that looks the users of tokens up in the
+    token cache before it queries the database.
+    """
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is None:
+            stamp = token_cache.stamp(key)
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, stamp)
+            return user, token
+
+        return user, self.get_model()(key=key, user=user)
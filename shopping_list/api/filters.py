@@ -0,0 +1,46 @@
+from rest_framework import filters
+
+from shopping_list.membership import get_shopping_list_ids
+from shopping_list.search import get_search_backend
+
+
+class ShoppingItemSearchFilter(filters.SearchFilter):
+    """
+    Searches the names of shopping items with the search index of the
+    database, scoped to the shopping lists of the user. The best matches
+    come first, and at most `limit` of them are returned.
+    """
+
+    limit_query_param = "limit"
+    default_limit = 50
+    max_limit = 200
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        return get_search_backend().search(
+            queryset,
+            search_terms,
+            shopping_list_ids=get_shopping_list_ids(request),
+            limit=self.get_limit(request),
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.limit_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Maximum number of search results.",
+                "schema": {"type": "integer"},
+            }
+        ]
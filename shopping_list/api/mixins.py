@@ -0,0 +1,61 @@
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests with 304 Not Modified when the client already has
+    the current representation, before the queryset is serialized.
+
+    Views return the version of the resource from get_version(), which
+    runs after authentication and permission checks. The ETag is built
+    from the version, the user and the query string, and the time the
+    resource was last modified is sent as Last-Modified.
+
+    Only the ETag is compared. The time doesn't change when a member
+    leaves a shopping list, or when it changes twice within a second, so
+    If-Modified-Since is ignored.
+    """
+
+    def get_version(self, request, *args, **kwargs):
+        """
+        Returns the time the resource was last modified, or None, and a
+        tuple of any other values that change with its representation.
+        """
+        raise NotImplementedError
+
+    def get_etag(self, request, last_modified, version):
+        parts = [
+            request.user.pk,
+            last_modified.isoformat() if last_modified else "",
+            request.META.get("QUERY_STRING", ""),
+            *version,
+        ]
+        digest = hashlib.md5(
+            ":".join(str(part) for part in parts).encode(),
+            usedforsecurity=False,
+        )
+        return f'"{digest.hexdigest()}"'
+
+    def get(self, request, *args, **kwargs):
+        last_modified, version = self.get_version(request, *args, **kwargs)
+        etag = self.get_etag(request, last_modified, version)
+        timestamp = (
+            timegm(last_modified.utctimetuple()) if last_modified else None
+        )
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response.headers["ETag"] = etag
+        if timestamp is not None:
+            response.headers["Last-Modified"] = http_date(timestamp)
+        # Responses differ per user and have to be revalidated every time
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
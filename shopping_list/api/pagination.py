@@ -1,7 +1,262 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import datetime
+import json
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Field, Func, Q, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class LargeResultsSetPagination(PageNumberPagination):
     page_size = 5
     page_size_query_param = "page_size"
     max_page_size = 10
+
+
+class RowValue(Func):
+    template = "(%(expressions)s)"
+    output_field = Field()
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates by the values of the ordering fields of the last result of
+    the previous page, instead of by an offset. Every page is found with
+    an index range scan and no count is made, so the cost of a page
+    doesn't grow with its depth. The primary key breaks ties, so results
+    aren't skipped or repeated when rows are inserted between pages.
+    """
+
+    # Databases that compare row values, and can use an index on the
+    # ordering fields to find where a page starts.
+    row_value_vendors = {"sqlite", "postgresql", "mysql"}
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = None
+    max_page_size = None
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        values = self.decode_cursor(request)
+        if values is not None:
+            try:
+                values = self.to_python(queryset, values)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(self.after(queryset, values))
+
+        results = list(
+            queryset.order_by(
+                *[
+                    f"-{field}" if descending else field
+                    for field, descending in self.ordering
+                ]
+            )[: self.page_size + 1]
+        )
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(
+                    request.query_params[self.page_size_query_param]
+                )
+                if page_size > 0:
+                    if self.max_page_size:
+                        return min(page_size, self.max_page_size)
+                    return page_size
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, queryset):
+        """
+        Returns (field, descending) pairs of the ordering of the queryset,
+        ending with the primary key in the direction of the last field.
+        """
+        ordering = []
+        for field in queryset.query.order_by:
+            descending = field.startswith("-")
+            field = field.lstrip("-")
+            if field == "pk":
+                field = "id"
+            ordering.append((field, descending))
+            if field == "id":
+                break
+        else:
+            ordering.append(("id", ordering[-1][1] if ordering else False))
+        return ordering
+
+    def get_output_field(self, queryset, field):
+        if field in queryset.query.annotations:
+            return queryset.query.annotations[field].output_field
+        return queryset.model._meta.get_field(field)
+
+    def to_python(self, queryset, values):
+        return [
+            self.get_output_field(queryset, field).to_python(value)
+            for (field, _), value in zip(self.ordering, values)
+        ]
+
+    def after(self, queryset, values):
+        """
+        Matches the rows that come after the given values of the ordering
+        fields, i.e. (a, b, id) > (x, y, z) for ascending fields.
+        """
+        directions = {descending for _, descending in self.ordering}
+        vendor = connections[queryset.db].vendor
+        if len(directions) == 1 and vendor in self.row_value_vendors:
+            lookup = LessThan if directions.pop() else GreaterThan
+            return lookup(
+                RowValue(*[F(field) for field, _ in self.ordering]),
+                RowValue(
+                    *[
+                        Value(
+                            value,
+                            output_field=self.get_output_field(
+                                queryset, field
+                            ),
+                        )
+                        for (field, _), value in zip(self.ordering, values)
+                    ]
+                ),
+            )
+
+        condition = Q()
+        for position, (field, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending else "gt"
+            row_condition = Q(**{f"{field}__{lookup}": values[position]})
+            for (equal_field, _), value in zip(
+                self.ordering[:position], values
+            ):
+                row_condition &= Q(**{equal_field: value})
+            condition |= row_condition
+        return condition
+
+    def encode_cursor(self, obj):
+        values = []
+        for field, _ in self.ordering:
+            value = getattr(obj, field)
+            if isinstance(value, (datetime.datetime, datetime.date)):
+                value = value.isoformat()
+            elif isinstance(value, uuid.UUID):
+                value = str(value)
+            values.append(value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class OptInKeysetPagination(BasePagination):
+    """
+    Page number pagination, unless the client asks for keyset
+    pagination with ?pagination=cursor or follows a cursor link.
+    """
+
+    page_number_pagination_class = PageNumberPagination
+    keyset_pagination_class = KeysetPagination
+    pagination_query_param = "pagination"
+
+    def get_paginator(self, request):
+        if (
+            request.query_params.get(self.pagination_query_param) == "cursor"
+            or self.keyset_pagination_class.cursor_query_param
+            in request.query_params
+        ):
+            page_number_pagination = self.page_number_pagination_class
+            paginator = self.keyset_pagination_class()
+            paginator.page_size = page_number_pagination.page_size
+            paginator.page_size_query_param = (
+                page_number_pagination.page_size_query_param
+            )
+            paginator.max_page_size = page_number_pagination.max_page_size
+            return paginator
+        return self.page_number_pagination_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        paginator = self.page_number_pagination_class()
+        return paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        page_number_paginator = self.page_number_pagination_class()
+        keyset_paginator = self.keyset_pagination_class()
+        return [
+            *page_number_paginator.get_schema_operation_parameters(view),
+            {
+                "name": self.pagination_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` for keyset pagination.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            *keyset_paginator.get_schema_operation_parameters(view),
+        ]
+
+
+class ShoppingItemsPagination(OptInKeysetPagination):
+    page_number_pagination_class = LargeResultsSetPagination
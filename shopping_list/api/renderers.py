@@ -0,0 +1,55 @@
+from rest_framework.renderers import JSONRenderer
+
+from shopping_list.metrics import rendering
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson to the same bytes as the compact, unicode
+    output of JSONRenderer, except for NaN and Infinity, which orjson
+    renders as null where JSONRenderer raises an error. Dates and times,
+    and anything else orjson can't encode natively, go through DRF's JSON
+    encoder. Data orjson can't render at all, such as integers beyond 64
+    bits, is rendered by JSONRenderer.
+
+    The time spent rendering is recorded in the metrics of the request.
+
+    Falls back to JSONRenderer without orjson, when an indent is asked
+    for, or when the UNICODE_JSON or COMPACT_JSON settings are disabled.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with rendering():
+            return self.encode(data, accepted_media_type, renderer_context)
+
+    def encode(self, data, accepted_media_type, renderer_context):
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b""
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, as these line terminators aren't
+        # valid in JavaScript strings before ES2019.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -1,8 +1,15 @@
+import copy
+from contextlib import contextmanager
 from typing import List, TypedDict
 
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
-from shopping_list.models import ShoppingItem, ShoppingList, User
+from shopping_list.events import publish_on_commit
+from shopping_list.interactions import last_interaction_updater
+from shopping_list.membership import ShoppingListMember
+from shopping_list.models import ShoppingItem, ShoppingList, User, unpurchased
+from shopping_list.sync import CHANGES_LIMIT
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -11,6 +18,42 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "username"]
 
 
+DUPLICATE_ITEM_MESSAGE = "There's already this item on the list"
+
+
+def is_duplicate_item_error(error):
+    """
+    Tells whether an IntegrityError is a violation of the unique
+    constraint on the names of unpurchased shopping items.
+    """
+    constraint = "unique_unpurchased_item_name"
+    diag = getattr(error.__cause__, "diag", None)
+    if diag is not None:
+        # PostgreSQL names the violated constraint
+        return diag.constraint_name == constraint
+    # SQLite names the columns of the violated index instead
+    table = ShoppingItem._meta.db_table
+    return str(error) == (
+        f"UNIQUE constraint failed: {table}.shopping_list_id, {table}.name"
+    ) or constraint in str(error)
+
+
+@contextmanager
+def unique_unpurchased_items():
+    """
+    Reports a violation of the unique constraint on the names of
+    unpurchased shopping items as a validation error. Other integrity
+    errors are raised as they are.
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as error:
+        if not is_duplicate_item_error(error):
+            raise
+        raise serializers.ValidationError(DUPLICATE_ITEM_MESSAGE)
+
+
 class ShoppingItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShoppingItem
@@ -22,14 +65,328 @@ class ShoppingItemSerializer(serializers.ModelSerializer):
             "request"
         ].parser_context["kwargs"]["pk"]
 
-        if ShoppingList.objects.get(
-            id=validated_data["shopping_list_id"]
-        ).shopping_items.filter(name=validated_data["name"], purchased=False):
+        # Duplicates are rejected by the insert itself, which rolls back
+        # the revision it allocated
+        with unique_unpurchased_items():
+            return super(ShoppingItemSerializer, self).create(validated_data)
+
+    def update(self, instance, validated_data):
+        with unique_unpurchased_items():
+            return super(ShoppingItemSerializer, self).update(
+                instance, validated_data
+            )
+
+
+def serialize_when_published(shopping_item):
+    """
+    Returns a function that serializes the shopping item as it is now,
+    for events that are only serialized once they are published.
+    """
+    shopping_item = copy.copy(shopping_item)
+    return lambda: ShoppingItemSerializer(shopping_item).data
+
+
+class BulkShoppingItemCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ShoppingItem
+        fields = ["name", "purchased"]
+
+
+class BulkShoppingItemUpdateSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField()
+
+    class Meta:
+        model = ShoppingItem
+        fields = ["id", "name", "purchased"]
+        extra_kwargs = {
+            "name": {"required": False},
+            "purchased": {"required": False},
+        }
+
+
+class BulkShoppingItemsSerializer(serializers.Serializer):
+    """
+    Creates, updates and deletes many shopping items of a shopping list
+    in one transaction. Errors are reported per shopping item, and
+    nothing is changed unless every shopping item is valid.
+    """
+
+    max_batch_size = 1000
+
+    create = BulkShoppingItemCreateSerializer(
+        many=True, required=False, write_only=True, max_length=max_batch_size
+    )
+    update = BulkShoppingItemUpdateSerializer(
+        many=True, required=False, write_only=True, max_length=max_batch_size
+    )
+    delete = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        write_only=True,
+        max_length=max_batch_size,
+    )
+    created = ShoppingItemSerializer(many=True, read_only=True)
+    updated = ShoppingItemSerializer(many=True, read_only=True)
+    deleted = serializers.ListField(
+        child=serializers.UUIDField(), read_only=True
+    )
+
+    @property
+    def shopping_list_id(self):
+        return self.context["request"].parser_context["kwargs"]["pk"]
+
+    def validate(self, attrs):
+        creates = attrs.get("create", [])
+        updates = attrs.get("update", [])
+        deletes = attrs.get("delete", [])
+
+        # All shopping items that are updated or deleted are loaded at once
+        shopping_items = ShoppingItem.objects.filter(
+            shopping_list_id=self.shopping_list_id
+        ).in_bulk([update["id"] for update in updates] + deletes)
+
+        errors = {}
+        update_errors = []
+        seen_ids = set()
+        for update in updates:
+            if update["id"] not in shopping_items:
+                update_errors.append({"id": ["Shopping item not found."]})
+            elif update["id"] in seen_ids:
+                update_errors.append({"id": ["Shopping item is repeated."]})
+            else:
+                update_errors.append({})
+            seen_ids.add(update["id"])
+
+        delete_errors = {}
+        for index, shopping_item_id in enumerate(deletes):
+            if shopping_item_id not in shopping_items:
+                delete_errors[index] = ["Shopping item not found."]
+            elif shopping_item_id in seen_ids:
+                delete_errors[index] = ["Shopping item is repeated."]
+            seen_ids.add(shopping_item_id)
+
+        create_errors = self._validate_names(
+            shopping_items, updates, update_errors, creates
+        )
+
+        if any(create_errors):
+            errors["create"] = create_errors
+        if any(update_errors):
+            errors["update"] = update_errors
+        if delete_errors:
+            errors["delete"] = delete_errors
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        attrs["shopping_items"] = shopping_items
+        return attrs
+
+    def _validate_names(self, shopping_items, updates, update_errors, creates):
+        """
+        Checks the names that updated and new shopping items end up with
+        against the unpurchased shopping items of the list, and against
+        each other, at once. Names of shopping items that are deleted or
+        updated are free for the others, as they are in the end. Only
+        unpurchased names conflict, like in the unique constraint. Errors
+        of the updates are added to `update_errors`, and those of the
+        creates are returned.
+        """
+        final_updates = []
+        for update, update_error in zip(updates, update_errors):
+            if update_error:
+                continue
+            shopping_item = shopping_items[update["id"]]
+            final_updates.append(
+                (
+                    update_error,
+                    update.get("name", shopping_item.name),
+                    update.get("purchased", shopping_item.purchased),
+                )
+            )
+
+        unpurchased_names = set(
+            ShoppingItem.objects.filter(
+                shopping_list_id=self.shopping_list_id,
+                purchased=False,
+                name__in={name for _, name, _ in final_updates}
+                | {
+                    create["name"]
+                    for create in creates
+                    if not create["purchased"]
+                },
+            )
+            .exclude(id__in=list(shopping_items))
+            .values_list("name", flat=True)
+        )
+
+        for update_error, name, purchased in final_updates:
+            if purchased:
+                continue
+            if name in unpurchased_names:
+                update_error["name"] = [DUPLICATE_ITEM_MESSAGE]
+            unpurchased_names.add(name)
+
+        create_errors = []
+        for create in creates:
+            if create["purchased"]:
+                create_errors.append({})
+            elif create["name"] in unpurchased_names:
+                create_errors.append({"name": [DUPLICATE_ITEM_MESSAGE]})
+            else:
+                create_errors.append({})
+                unpurchased_names.add(create["name"])
+        return create_errors
+
+    def apply_changes(self, shopping_items, updates, creates):
+        """
+        Applies the updates and creates, and returns the updated and the
+        created shopping items.
+        """
+        # Every updated and created shopping item gets its own revision
+        revision, preview = ShoppingList.allocate_revisions(
+            self.shopping_list_id,
+            len(updates) + len(creates),
+            item_count=len(creates),
+            unpurchased_count=sum(
+                not create["purchased"] for create in creates
+            ),
+        )
+
+        # Read once the shopping list is locked, so that the counts and the
+        # preview of the shopping list can't miss a concurrent change, and
+        # fields the updates leave alone keep their concurrent changes
+        rows = ShoppingItem.objects.filter(
+            shopping_list_id=self.shopping_list_id,
+            id__in=[update["id"] for update in updates],
+        ).values_list("id", "name", "purchased")
+        previous = {
+            shopping_item_id: (name, purchased)
+            for shopping_item_id, name, purchased in rows
+        }
+        if len(previous) < len(updates):
+            # Deleted since they were validated, which rolls back the
+            # revisions that were allocated
             raise serializers.ValidationError(
-                "There's already this item on the list"
+                {
+                    "update": [
+                        (
+                            {}
+                            if update["id"] in previous
+                            else {"id": ["Shopping item not found."]}
+                        )
+                        for update in updates
+                    ]
+                }
+            )
+
+        updated = []
+        for update in updates:
+            name, purchased = previous[update["id"]]
+            shopping_item = shopping_items[update["id"]]
+            shopping_item.name = update.get("name", name)
+            shopping_item.purchased = update.get("purchased", purchased)
+            shopping_item.revision = revision
+            revision += 1
+            updated.append(shopping_item)
+        ShoppingItem.objects.bulk_update(
+            updated, ["name", "purchased", "revision"]
+        )
+
+        created = ShoppingItem.objects.bulk_create(
+            ShoppingItem(
+                shopping_list_id=self.shopping_list_id,
+                revision=revision + offset,
+                **create,
             )
+            for offset, create in enumerate(creates)
+        )
+
+        ShoppingList.update_counts(
+            self.shopping_list_id,
+            unpurchased_count=sum(
+                previous[shopping_item.id][1] - shopping_item.purchased
+                for shopping_item in updated
+            ),
+        )
+        previous_names = set().union(
+            *(unpurchased(*previous[item.id]) for item in updated)
+        )
+        names = set().union(
+            *(
+                unpurchased(item.name, item.purchased)
+                for item in [*updated, *created]
+            )
+        )
+        ShoppingList.update_preview(
+            self.shopping_list_id,
+            preview,
+            removed=previous_names - names,
+            added=names - previous_names,
+        )
+        return updated, created
+
+    def save(self, **kwargs):
+        # The create, update and delete fields shadow the serializer's
+        # create() and update() methods, so the changes are applied here.
+        validated_data = self.validated_data
+        shopping_items = validated_data["shopping_items"]
+
+        with unique_unpurchased_items():
+            deleted = validated_data.get("delete", [])
+            ShoppingItem.objects.filter(
+                shopping_list_id=self.shopping_list_id, id__in=deleted
+            ).delete()
 
-        return super(ShoppingItemSerializer, self).create(validated_data)
+            updates = validated_data.get("update", [])
+            creates = validated_data.get("create", [])
+            if not updates and not creates:
+                updated, created = [], []
+            else:
+                updated, created = self.apply_changes(
+                    shopping_items, updates, creates
+                )
+
+            last_interaction_updater.touch(self.shopping_list_id)
+            # Bulk updates and creates don't send post_save
+            for event_type, changed in [
+                ("item_updated", updated),
+                ("item_created", created),
+            ]:
+                for shopping_item in changed:
+                    publish_on_commit(
+                        self.shopping_list_id,
+                        event_type,
+                        revision=shopping_item.revision,
+                        item=serialize_when_published(shopping_item),
+                    )
+
+        self.instance = {
+            "created": created,
+            "updated": updated,
+            "deleted": deleted,
+        }
+        return self.instance
+
+
+class ShoppingItemChangesSerializer(serializers.Serializer):
+    """
+    Reads the changes feed query of a shopping list, and represents the
+    changes since the requested revision.
+    """
+
+    since = serializers.IntegerField(
+        min_value=0, required=False, write_only=True
+    )
+    limit = serializers.IntegerField(
+        min_value=1, max_value=1000, default=CHANGES_LIMIT, write_only=True
+    )
+    revision = serializers.IntegerField(read_only=True)
+    has_more = serializers.BooleanField(read_only=True)
+    resync = serializers.BooleanField(read_only=True)
+    changed = ShoppingItemSerializer(many=True, read_only=True)
+    deleted = serializers.ListField(
+        child=serializers.UUIDField(), read_only=True
+    )
 
 
 class UnpurchasedItem(TypedDict):
@@ -42,36 +399,95 @@ class ShoppingListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ShoppingList
-        fields = ["id", "name", "unpurchased_items", "members"]
+        fields = [
+            "id",
+            "name",
+            "item_count",
+            "unpurchased_count",
+            "unpurchased_items",
+            "members",
+        ]
+
+    @classmethod
+    def eager_loading_lookups(cls):
+        return ["members"]
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Prefetches members, so that serializing any number of shopping
+        lists takes a constant number of queries. The unpurchased items
+        preview is stored on the shopping lists.
+        """
+        return queryset.prefetch_related(*cls.eager_loading_lookups())
 
     def get_unpurchased_items(self, obj) -> List[UnpurchasedItem]:
-        return [
-            {"name": shopping_item.name}
-            for shopping_item in obj.shopping_items.filter(purchased=False)
-        ][:3]
+        return [{"name": name} for name in obj.unpurchased_preview]
+
+
+class MemberIdsField(serializers.ListField):
+    """
+    Ids of users, validated with a single query no matter how many
+    there are.
+    """
+
+    child = serializers.IntegerField()
+    default_error_messages = {
+        "does_not_exist": 'Invalid pk "{pk_value}" - object does not exist.'
+    }
+
+    def to_internal_value(self, data):
+        user_ids = set(super().to_internal_value(data))
+        existing_user_ids = set(
+            User.objects.filter(pk__in=user_ids).values_list("pk", flat=True)
+        )
+        for user_id in sorted(user_ids - existing_user_ids):
+            self.fail("does_not_exist", pk_value=user_id)
+        return user_ids
 
 
 class AddMemberSerializer(serializers.ModelSerializer):
+    members = MemberIdsField(write_only=True)
+    added = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
     class Meta:
         model = ShoppingList
-        fields = ["members"]
+        fields = ["members", "added"]
 
     def update(self, instance, validated_data):
-        for member in validated_data["members"]:
-            instance.members.add(member)
-            instance.save()
+        current_member_ids = ShoppingListMember.objects.filter(
+            shoppinglist=instance, user_id__in=validated_data["members"]
+        ).values_list("user_id", flat=True)
+        instance.added = sorted(
+            validated_data["members"] - set(current_member_ids)
+        )
+
+        if instance.added:
+            instance.members.add(*instance.added)
 
         return instance
 
 
 class RemoveMemberSerializer(serializers.ModelSerializer):
+    members = MemberIdsField(write_only=True)
+    removed = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
     class Meta:
         model = ShoppingList
-        fields = ["members"]
+        fields = ["members", "removed"]
 
     def update(self, instance, validated_data):
-        for member in validated_data["members"]:
-            instance.members.remove(member)
-            instance.save()
+        instance.removed = sorted(
+            ShoppingListMember.objects.filter(
+                shoppinglist=instance, user_id__in=validated_data["members"]
+            ).values_list("user_id", flat=True)
+        )
+
+        if instance.removed:
+            instance.members.remove(*instance.removed)
 
         return instance
@@ -1,9 +1,249 @@
-from rest_framework.throttling import UserRateThrottle
+import threading
+from functools import lru_cache
 
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.throttling import SimpleRateThrottle
 
-class MinuteRateThrottle(UserRateThrottle):
+
+class CacheCounterStore:
+    """
+    Keeps the request counters of throttles in the cache configured by
+    SHOPPING_LIST_THROTTLE_CACHE.
+
+    Counters are incremented atomically on caches that implement incr()
+    atomically, such as memcached, Redis and the local memory cache.
+    Django's cache API can't increment several counters at once, so a
+    request takes a call to the cache per counter it increments, and one
+    to read the others.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.SHOPPING_LIST_THROTTLE_CACHE]
+
+    def count(self, increment, read):
+        """
+        Increments the counters in `increment`, which maps their keys to
+        their timeouts, and returns their new values followed by the
+        values of the counters in `read`.
+        """
+        values = self.cache.get_many(read)
+        return [
+            self.increment(key, timeout) for key, timeout in increment.items()
+        ] + [values.get(key, 0) for key in read]
+
+    def increment(self, key, timeout):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            pass
+        # add() leaves a counter created concurrently alone
+        if self.cache.add(key, 1, timeout):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.add(key, 1, timeout)
+            return 1
+
+    def decrement(self, keys):
+        for key in keys:
+            try:
+                self.cache.decr(key)
+            except ValueError:
+                pass
+
+
+class RedisCounterStore(CacheCounterStore):
+    """
+    Keeps the request counters of throttles in a cache using Django's
+    Redis backend, and counts a request in a single round trip.
+    """
+
+    def get_client(self):
+        cache = self.cache
+        if not isinstance(cache, RedisCache):
+            raise ImproperlyConfigured(
+                "RedisCounterStore needs SHOPPING_LIST_THROTTLE_CACHE to use "
+                "django.core.cache.backends.redis.RedisCache, not "
+                f"{type(cache).__module__}.{type(cache).__name__}."
+            )
+        # Django's Redis backend doesn't expose its client
+        return cache._cache.get_client(write=True)
+
+    def count(self, increment, read):
+        pipeline = self.get_client().pipeline()
+        for key, timeout in increment.items():
+            key = self.cache.make_and_validate_key(key)
+            pipeline.incr(key)
+            pipeline.expire(key, timeout)
+        for key in read:
+            pipeline.get(self.cache.make_and_validate_key(key))
+        results = pipeline.execute()
+        # Every increment is followed by the result of its expire
+        return results[: 2 * len(increment) : 2] + [
+            int(value or 0) for value in results[2 * len(increment) :]
+        ]
+
+
+class LocalCounterStore:
+    """
+    Keeps the request counters of throttles in the memory of the process,
+    for tests. Counters don't expire.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def count(self, increment, read):
+        with self._lock:
+            for key in increment:
+                self._counters[key] = self._counters.get(key, 0) + 1
+            return [self._counters.get(key, 0) for key in [*increment, *read]]
+
+    def decrement(self, keys):
+        with self._lock:
+            for key in keys:
+                self._counters[key] -= 1
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+@lru_cache(maxsize=None)
+def _get_store(path):
+    return import_string(path)()
+
+
+def get_store():
+    return _get_store(settings.SHOPPING_LIST_THROTTLE_STORE)
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Limits the rate of API calls of a user like UserRateThrottle, in
+    constant memory per user.
+
+    Requests are counted per fixed window of the throttle's duration. The
+    requests of the last duration are estimated from the counts of the
+    current and the previous window, assuming requests of the previous
+    window were spread evenly.
+
+    All sliding window throttles of a view are evaluated together, with
+    a single call to the counter store. A request that is denied by any
+    of them isn't counted.
+    """
+
+    cache_format = "throttle_%(scope)s_%(ident)s_%(window)d"
+
+    def get_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return super().get_ident(request)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        windows = getattr(request, "_throttle_windows", None)
+        if windows is None:
+            windows = request._throttle_windows = self.count_request(
+                request, view
+            )
+        self.now, self.previous, self.current, allowed = windows[self.scope]
+        return allowed
+
+    def count_request(self, request, view):
+        """
+        Counts the request for all sliding window throttles of the view,
+        and returns the time, the counts of the previous and the current
+        window, and whether the request is allowed, by scope.
+        """
+        throttles = [
+            throttle
+            for throttle in view.get_throttles()
+            if isinstance(throttle, SlidingWindowRateThrottle)
+            and throttle.rate is not None
+        ]
+        ident = self.get_ident(request)
+        now = self.timer()
+
+        def key(throttle, window):
+            return throttle.cache_format % {
+                "scope": throttle.scope,
+                "ident": ident,
+                "window": window,
+            }
+
+        # Counters are read until the end of the window after theirs
+        current_keys = {
+            key(throttle, now // throttle.duration): 2 * throttle.duration
+            for throttle in throttles
+        }
+        previous_keys = [
+            key(throttle, now // throttle.duration - 1)
+            for throttle in throttles
+        ]
+        counts = get_store().count(current_keys, previous_keys)
+
+        windows = {}
+        for throttle, current, previous in zip(
+            throttles, counts, counts[len(throttles) :]
+        ):
+            throttle.now, throttle.previous, throttle.current = (
+                now,
+                previous,
+                current,
+            )
+            windows[throttle.scope] = [
+                now,
+                previous,
+                current,
+                throttle.estimate() <= throttle.num_requests,
+            ]
+        if not all(allowed for *_, allowed in windows.values()):
+            get_store().decrement(current_keys)
+            for window in windows.values():
+                window[2] -= 1
+        return windows
+
+    def estimate(self):
+        elapsed = (self.now % self.duration) / self.duration
+        return self.previous * (1 - elapsed) + self.current
+
+    def wait(self):
+        """
+        Returns the seconds until a request would be allowed again,
+        assuming no further requests.
+        """
+        elapsed = self.now % self.duration
+        if self.current >= self.num_requests:
+            # Not before the current window has become the previous one
+            return (
+                self.duration
+                - elapsed
+                + self.duration * (1 - (self.num_requests - 1) / self.current)
+            )
+        if not self.previous:
+            return None
+        return max(
+            0.0,
+            self.duration
+            * (1 - (self.num_requests - 1 - self.current) / self.previous)
+            - elapsed,
+        )
+
+
+class MinuteRateThrottle(SlidingWindowRateThrottle):
     scope = "user_minute"
 
 
-class DailyRateThrottle(UserRateThrottle):
+class DailyRateThrottle(SlidingWindowRateThrottle):
     scope = "user_day"
@@ -1,20 +1,34 @@
-from drf_spectacular.utils import extend_schema
+from django.db.models import Count, Max, Sum, prefetch_related_objects
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import filters, generics, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from shopping_list.api.pagination import LargeResultsSetPagination
+from shopping_list import metrics
+from shopping_list.api.filters import ShoppingItemSearchFilter
+from shopping_list.api.mixins import ConditionalGetMixin
+from shopping_list.api.pagination import (OptInKeysetPagination,
+                                          ShoppingItemsPagination)
 from shopping_list.api.permissions import (
     AllShoppingItemsShoppingListMembersOnly,
     ShoppingItemShoppingListMemberOnly, ShoppingListMembersOnly)
 from shopping_list.api.serializers import (AddMemberSerializer,
+                                           BulkShoppingItemsSerializer,
                                            RemoveMemberSerializer,
+                                           ShoppingItemChangesSerializer,
                                            ShoppingItemSerializer,
                                            ShoppingListSerializer)
+from shopping_list.fragments import fragment_cache
+from shopping_list.interactions import last_interaction_updater
+from shopping_list.membership import get_shopping_list_ids
 from shopping_list.models import ShoppingItem, ShoppingList
+from shopping_list.sync import get_changes
 
 
-class ListAddShoppingList(generics.ListCreateAPIView):
+class ListAddShoppingList(ConditionalGetMixin, generics.ListCreateAPIView):
     """
     Returns the list of all shopping lists user is a member of.
     Each shopping list includes a few unpurchased shopping items.
@@ -23,21 +37,91 @@ class ListAddShoppingList(generics.ListCreateAPIView):
 
     queryset = ShoppingList.objects.all()
     serializer_class = ShoppingListSerializer
+    pagination_class = OptInKeysetPagination
 
     def perform_create(self, serializer):
         return serializer.save(members=[self.request.user])
 
-    def get_queryset(self):
-        return ShoppingList.objects.filter(members=self.request.user).order_by(
-            "-last_interaction"
+    def get_version(self, request, *args, **kwargs):
+        # The count changes when the user leaves a shopping list, or when
+        # one is deleted, which doesn't touch the remaining ones. Revisions
+        # change with the shopping items in the same transaction, while
+        # last_interaction may be written behind.
+        version = ShoppingList.objects.filter(members=request.user).aggregate(
+            last_modified=Max("last_interaction"),
+            count=Count("id"),
+            revisions=Sum("revision"),
+            members_versions=Sum("members_version"),
+        )
+        return version["last_modified"], (
+            version["count"],
+            version["revisions"],
+            version["members_versions"],
         )
 
+    def get_queryset(self):
+        queryset = ShoppingList.objects.filter(
+            members=self.request.user
+        ).order_by("-last_interaction")
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
 
-class ShoppingListDetail(generics.RetrieveUpdateDestroyAPIView):
-    queryset = ShoppingList.objects.all()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.serialize(page))
+
+        return Response(self.serialize(list(queryset)))
+
+    def serialize(self, shopping_lists):
+        """
+        Assembles the representation from cached fragments, and loads
+        related objects only for the shopping lists that aren't cached.
+        """
+        fragments = fragment_cache.get_many(shopping_lists)
+        missing = [
+            shopping_list
+            for shopping_list in shopping_lists
+            if shopping_list.pk not in fragments
+        ]
+
+        if missing:
+            prefetch_related_objects(
+                missing, *ShoppingListSerializer.eager_loading_lookups()
+            )
+            serializer = self.get_serializer(missing, many=True)
+            for shopping_list, fragment in zip(missing, serializer.data):
+                fragment_cache.set(shopping_list, fragment)
+                fragments[shopping_list.pk] = fragment
+
+        return [
+            fragments[shopping_list.pk] for shopping_list in shopping_lists
+        ]
+
+
+class ShoppingListDetail(
+    ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    queryset = ShoppingListSerializer.setup_eager_loading(
+        ShoppingList.objects.all()
+    )
     serializer_class = ShoppingListSerializer
     permission_classes = [ShoppingListMembersOnly]
 
+    def get_version(self, request, *args, **kwargs):
+        shopping_list = get_object_or_404(
+            ShoppingList.objects.only(
+                "id", "last_interaction", "revision", "members_version"
+            ),
+            pk=kwargs["pk"],
+        )
+        self.check_object_permissions(request, shopping_list)
+        return shopping_list.last_interaction, (
+            shopping_list.revision,
+            shopping_list.members_version,
+        )
+
 
 class ShoppingListAddMembers(APIView):
     permission_classes = [ShoppingListMembersOnly]
@@ -73,22 +157,85 @@ class ShoppingListRemoveMembers(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ListAddShoppingItem(generics.ListCreateAPIView):
+class ListAddShoppingItem(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = ShoppingItemSerializer
     permission_classes = [AllShoppingItemsShoppingListMembersOnly]
-    pagination_class = LargeResultsSetPagination
+    pagination_class = ShoppingItemsPagination
 
     filter_backends = (filters.OrderingFilter,)
     ordering_fields = ["name", "purchased"]
 
     def get_queryset(self):
         shopping_list = self.kwargs["pk"]
+        # Ties are broken by id, so that pages don't overlap
         queryset = ShoppingItem.objects.filter(
             shopping_list=shopping_list
-        ).order_by("purchased")
+        ).order_by("purchased", "id")
 
         return queryset
 
+    def get_version(self, request, *args, **kwargs):
+        # The revision changes with the shopping items in the same
+        # transaction, while last_interaction may be written behind
+        last_modified, revision = (
+            ShoppingList.objects.filter(pk=kwargs["pk"])
+            .values_list("last_interaction", "revision")
+            .first()
+        ) or (None, None)
+        return last_modified, (revision,)
+
+
+class BulkShoppingItems(APIView):
+    """
+    Creates, updates and deletes many shopping items of a shopping list
+    at once.
+    """
+
+    permission_classes = [AllShoppingItemsShoppingListMembersOnly]
+
+    @extend_schema(
+        request=BulkShoppingItemsSerializer,
+        responses=BulkShoppingItemsSerializer,
+    )
+    def post(self, request, pk, format=None):
+        serializer = BulkShoppingItemsSerializer(
+            data=request.data, context={"request": request}
+        )
+
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ShoppingItemChanges(APIView):
+    """
+    Returns the shopping items of a shopping list that were created,
+    updated or deleted since the revision given as `since`. Without it,
+    or when deletions since then were pruned, a snapshot of the shopping
+    items is returned in pages, along with the revision to sync from
+    next time.
+    """
+
+    permission_classes = [AllShoppingItemsShoppingListMembersOnly]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("since", int),
+            OpenApiParameter("limit", int),
+        ],
+        responses=ShoppingItemChangesSerializer,
+    )
+    def get(self, request, pk, format=None):
+        serializer = ShoppingItemChangesSerializer(data=request.query_params)
+
+        if serializer.is_valid():
+            changes = get_changes(pk, **serializer.validated_data)
+            return Response(ShoppingItemChangesSerializer(changes).data)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
 
 class ShoppingItemDetail(generics.RetrieveUpdateDestroyAPIView):
     queryset = ShoppingItem.objects.all()
@@ -96,18 +243,37 @@ class ShoppingItemDetail(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [ShoppingItemShoppingListMemberOnly]
     lookup_url_kwarg = "item_pk"
 
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        last_interaction_updater.touch(instance.shopping_list_id)
+
 
 class SearchShoppingItems(generics.ListAPIView):
     serializer_class = ShoppingItemSerializer
+    pagination_class = OptInKeysetPagination
 
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (ShoppingItemSearchFilter,)
     search_fields = ["name"]
 
     def get_queryset(self):
-        users_shopping_lists = ShoppingList.objects.filter(
-            members=self.request.user
-        )
         queryset = ShoppingItem.objects.filter(
-            shopping_list__in=users_shopping_lists
+            shopping_list__in=get_shopping_list_ids(self.request)
         ).order_by("-purchased")
         return queryset
+
+
+class Metrics(APIView):
+    """
+    Returns the request metrics of the process in the Prometheus text
+    format. Admins only.
+    """
+
+    permission_classes = [IsAdminUser]
+    throttle_classes = []
+
+    @extend_schema(exclude=True)
+    def get(self, request):
+        return HttpResponse(
+            metrics.exposition(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -6,4 +6,5 @@ class ShoppingListConfig(AppConfig):
     name = "shopping_list"
 
     def ready(self):
+        import shopping_list.checks
         import shopping_list.receivers
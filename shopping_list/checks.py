@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_replica_pin_cache(app_configs, **kwargs):
+    """
+    Reads of clients that wrote are pinned to the default database in
+    SHOPPING_LIST_REPLICA_PIN_CACHE, which every process must see for
+    clients to read their own writes from whichever process they reach.
+    """
+    if not settings.SHOPPING_LIST_READ_REPLICAS:
+        return []
+    cache = caches[settings.SHOPPING_LIST_REPLICA_PIN_CACHE]
+    if not isinstance(cache, (LocMemCache, DummyCache)):
+        return []
+    return [
+        Error(
+            "SHOPPING_LIST_REPLICA_PIN_CACHE must be a cache shared by all "
+            "processes when SHOPPING_LIST_READ_REPLICAS is set.",
+            hint=(
+                f"The {settings.SHOPPING_LIST_REPLICA_PIN_CACHE!r} cache uses "
+                f"{type(cache).__name__}, which doesn't share entries "
+                "between processes. Use a Redis or Memcached cache."
+            ),
+            id="shopping_list.E001",
+        )
+    ]
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """
+    Receives the events of a shopping list on the event loop it was
+    created on, whichever thread they are published from.
+
+    A subscriber that falls more than `max_size` events behind gets None
+    instead of the next event, and has to sync from scratch.
+    """
+
+    def __init__(self, shopping_list_id, max_size=100):
+        self.shopping_list_id = shopping_list_id
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(max_size)
+
+    def deliver(self, event):
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def get(self, timeout=None):
+        """
+        Waits for the next event, and raises TimeoutError if none comes
+        within `timeout` seconds.
+        """
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class InMemoryBroker:
+    """
+    Fans the events of shopping lists out to the subscribers in this
+    process. Deployments with several processes need a broker that
+    passes events between them, with the same publish(), subscribe(),
+    unsubscribe() and has_subscribers() methods.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, shopping_list_id):
+        subscription = Subscription(shopping_list_id)
+        with self._lock:
+            self._subscriptions[shopping_list_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions[subscription.shopping_list_id]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.shopping_list_id]
+
+    def has_subscribers(self, shopping_list_id):
+        return shopping_list_id in self._subscriptions
+
+    def publish(self, shopping_list_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(shopping_list_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+
+@lru_cache(maxsize=None)
+def _get_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return _get_broker(settings.SHOPPING_LIST_EVENT_BROKER)
+
+
+def publish_on_commit(shopping_list_id, event_type, **data):
+    """
+    Publishes an event of a shopping list once the current transaction
+    is committed, so subscribers never hear of changes that are rolled
+    back, or that they can't read yet.
+
+    The event is only built if the shopping list has subscribers by then.
+    Callable values of `data` are called to build it, so that events
+    nobody receives aren't serialized.
+    """
+
+    def publish():
+        broker = get_broker()
+        if not broker.has_subscribers(shopping_list_id):
+            return
+        event = {
+            "type": event_type,
+            **{
+                key: value() if callable(value) else value
+                for key, value in data.items()
+            },
+        }
+        broker.publish(shopping_list_id, event)
+
+    transaction.on_commit(publish)
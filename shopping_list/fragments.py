@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class FragmentCache:
+    """
+    Keeps the serialized representations of the most recently read
+    shopping lists in memory, up to SHOPPING_LIST_FRAGMENT_CACHE_SIZE.
+
+    Fragments are stored with the version of the shopping list they were
+    built from. A shopping list is read together with its version, so an
+    outdated fragment is never served, and simply ages out of the cache.
+    Related objects are loaded after the shopping list itself, so a
+    fragment is never older than its version.
+    """
+
+    def __init__(self, max_size=None):
+        self._max_size = max_size
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return settings.SHOPPING_LIST_FRAGMENT_CACHE_SIZE
+
+    @staticmethod
+    def version(shopping_list):
+        # last_interaction is touched when the name, the members or the
+        # shopping items change, revision right away on item changes and
+        # members_version when a member is renamed.
+        return (
+            shopping_list.last_interaction,
+            shopping_list.revision,
+            shopping_list.members_version,
+        )
+
+    def get_many(self, shopping_lists):
+        """
+        Returns the current fragments of the given shopping lists that are
+        in the cache, by shopping list id.
+        """
+        fragments = {}
+        with self._lock:
+            for shopping_list in shopping_lists:
+                cached = self._fragments.get(shopping_list.pk)
+                if cached is not None and cached[0] == self.version(
+                    shopping_list
+                ):
+                    self._fragments.move_to_end(shopping_list.pk)
+                    fragments[shopping_list.pk] = cached[1]
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return fragments
+
+    def set(self, shopping_list, fragment):
+        with self._lock:
+            self._fragments[shopping_list.pk] = (
+                self.version(shopping_list),
+                fragment,
+            )
+            self._fragments.move_to_end(shopping_list.pk)
+            while len(self._fragments) > self.max_size:
+                self._fragments.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._fragments),
+        }
+
+
+fragment_cache = FragmentCache()
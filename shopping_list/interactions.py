@@ -0,0 +1,84 @@
+import threading
+import weakref
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from shopping_list.models import ShoppingList
+
+
+class LastInteractionUpdater:
+    """
+    Coalesces updates of ShoppingList.last_interaction.
+
+    Shopping lists touched during a transaction are collected and
+    flushed with a single UPDATE once the transaction is committed.
+    Outside of a transaction the update is flushed right away. With
+    SHOPPING_LIST_INTERACTION_WRITE_BEHIND disabled every touch is
+    written synchronously, which tests rely on, as they never commit.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _pending(self):
+        pending = getattr(self._local, "pending", None)
+        pending = pending and pending()
+        if pending is None:
+            pending = PendingInteractions(self)
+            self._local.pending = weakref.ref(pending)
+        return pending
+
+    def touch(self, shopping_list_id):
+        if not settings.SHOPPING_LIST_INTERACTION_WRITE_BEHIND:
+            self._update([shopping_list_id])
+            return
+
+        # Every touch schedules a flush of all of them, so that a flush
+        # discarded together with a rolled back savepoint can't leave
+        # shopping lists behind. Flushing nothing doesn't cost a query.
+        transaction.on_commit(self._pending().add(shopping_list_id))
+
+    def _update(self, shopping_list_ids):
+        ShoppingList.objects.filter(id__in=shopping_list_ids).update(
+            last_interaction=timezone.now()
+        )
+
+
+class PendingInteractions:
+    """
+    Shopping lists touched since the last flush of a thread.
+
+    Only the on_commit callbacks of the touches hold on to them, and
+    they're discarded together with the savepoint or transaction they
+    were made in when it's rolled back. The touches, and these pending
+    interactions once none is left, are then collected as garbage.
+    """
+
+    def __init__(self, updater):
+        self.updater = updater
+        self.touches = weakref.WeakSet()
+
+    def add(self, shopping_list_id):
+        touch = Touch(self, shopping_list_id)
+        self.touches.add(touch)
+        return touch
+
+    def flush(self):
+        shopping_list_ids = {touch.shopping_list_id for touch in self.touches}
+        self.touches.clear()
+        if shopping_list_ids:
+            self.updater._update(list(shopping_list_ids))
+
+
+class Touch:
+    def __init__(self, pending, shopping_list_id):
+        self.pending = pending
+        self.shopping_list_id = shopping_list_id
+
+    def __call__(self):
+        self.pending.flush()
+
+
+last_interaction_updater = LastInteractionUpdater()
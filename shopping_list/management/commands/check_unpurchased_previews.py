@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from shopping_list.models import (ShoppingItem, ShoppingList,
+                                  unpurchased_preview)
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks the unpurchased previews of all shopping lists against "
+        "their shopping items, and optionally repairs them."
+    )
+
+    batch_size = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Repair the previews that are out of date.",
+        )
+
+    def handle(self, *args, repair=False, **options):
+        pks = list(
+            ShoppingList.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        outdated = 0
+        for start in range(0, len(pks), self.batch_size):
+            outdated += self.check_batch(
+                pks[start : start + self.batch_size], repair
+            )
+
+        if repair:
+            self.stdout.write(
+                self.style.SUCCESS(f"Repaired {outdated} previews")
+            )
+        elif outdated:
+            raise CommandError(f"Found {outdated} outdated previews")
+        else:
+            self.stdout.write(self.style.SUCCESS("All previews are current"))
+
+    def check_batch(self, pks, repair):
+        with transaction.atomic():
+            shopping_lists = ShoppingList.objects.filter(pk__in=pks).only(
+                "pk", "unpurchased_preview"
+            )
+            if repair:
+                # Keeps the shopping items of the batch from changing
+                shopping_lists = shopping_lists.select_for_update()
+            shopping_lists = list(shopping_lists)
+
+            names = defaultdict(list)
+            for shopping_list_id, name in ShoppingItem.objects.filter(
+                shopping_list__in=pks, purchased=False
+            ).values_list("shopping_list_id", "name"):
+                names[shopping_list_id].append(name)
+
+            outdated = []
+            for shopping_list in shopping_lists:
+                preview = unpurchased_preview(names[shopping_list.pk])
+                if shopping_list.unpurchased_preview != preview:
+                    self.stdout.write(
+                        f"{shopping_list.pk}: "
+                        f"{shopping_list.unpurchased_preview} instead of "
+                        f"{preview}"
+                    )
+                    shopping_list.unpurchased_preview = preview
+                    outdated.append(shopping_list)
+
+            if repair:
+                ShoppingList.objects.bulk_update(
+                    outdated, ["unpurchased_preview"]
+                )
+        return len(outdated)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from shopping_list.models import ShoppingItemTombstone, ShoppingList
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the tombstones of shopping items deleted longer ago than "
+        "SHOPPING_LIST_TOMBSTONE_RETENTION. Clients that synced before a "
+        "pruned deletion are asked to sync again."
+    )
+
+    batch_size = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention",
+            type=int,
+            help="Seconds tombstones are kept for. Defaults to "
+            "SHOPPING_LIST_TOMBSTONE_RETENTION.",
+        )
+
+    def handle(self, *args, retention=None, **options):
+        if retention is None:
+            retention = settings.SHOPPING_LIST_TOMBSTONE_RETENTION
+        cutoff = timezone.now() - timedelta(seconds=retention)
+
+        shopping_list_ids = list(
+            ShoppingItemTombstone.objects.filter(deleted_at__lt=cutoff)
+            .order_by("shopping_list")
+            .values_list("shopping_list", flat=True)
+            .distinct()
+        )
+        pruned = 0
+        for start in range(0, len(shopping_list_ids), self.batch_size):
+            pruned += self.prune(
+                shopping_list_ids[start : start + self.batch_size], cutoff
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Pruned {pruned} tombstones of "
+                f"{len(shopping_list_ids)} shopping lists"
+            )
+        )
+
+    def prune(self, shopping_list_ids, cutoff):
+        with transaction.atomic():
+            tombstones = ShoppingItemTombstone.objects.filter(
+                shopping_list__in=shopping_list_ids, deleted_at__lt=cutoff
+            )
+            pruned_revisions = list(
+                tombstones.values("shopping_list").annotate(
+                    revision=Max("revision")
+                )
+            )
+            for pruned_revision in pruned_revisions:
+                ShoppingList.objects.filter(
+                    pk=pruned_revision["shopping_list"]
+                ).update(
+                    pruned_revision=Greatest(
+                        "pruned_revision", Value(pruned_revision["revision"])
+                    )
+                )
+            pruned, _ = tombstones.delete()
+        return pruned
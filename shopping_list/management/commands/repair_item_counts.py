@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from shopping_list.models import ShoppingItem, ShoppingList
+
+
+def count_items(condition=Q()):
+    """
+    Counts the shopping items of the shopping list of the outer query
+    that match the condition.
+    """
+    shopping_items = (
+        ShoppingItem.objects.filter(condition, shopping_list=OuterRef("pk"))
+        .order_by()
+        .values("shopping_list")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(shopping_items), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the item counts of all shopping lists, and repairs "
+        "the ones that drifted from their shopping items."
+    )
+
+    batch_size = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the shopping lists whose counts drifted.",
+        )
+
+    def handle(self, *args, dry_run=False, **options):
+        with transaction.atomic():
+            drifted = (
+                ShoppingList.objects.annotate(
+                    actual_item_count=count_items(),
+                    actual_unpurchased_count=count_items(Q(purchased=False)),
+                )
+                .exclude(
+                    item_count=F("actual_item_count"),
+                    unpurchased_count=F("actual_unpurchased_count"),
+                )
+                .values_list(
+                    "pk",
+                    "item_count",
+                    "actual_item_count",
+                    "unpurchased_count",
+                    "actual_unpurchased_count",
+                )
+            )
+            drifted = list(drifted)
+            for pk, items, actual, unpurchased, actual_unpurchased in drifted:
+                self.stdout.write(
+                    f"{pk}: {items} items instead of {actual}, {unpurchased} "
+                    f"unpurchased instead of {actual_unpurchased}"
+                )
+            if dry_run:
+                self.stdout.write(
+                    f"Found {len(drifted)} shopping lists with drifted counts"
+                )
+                return
+
+            # Recomputed in the update, which waits for concurrent changes
+            # of the shopping items of a list
+            pks = [pk for pk, *_ in drifted]
+            repaired = 0
+            for start in range(0, len(pks), self.batch_size):
+                repaired += ShoppingList.objects.filter(
+                    pk__in=pks[start : start + self.batch_size]
+                ).update(
+                    item_count=count_items(),
+                    unpurchased_count=count_items(Q(purchased=False)),
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Repaired the counts of {repaired} shopping lists"
+            )
+        )
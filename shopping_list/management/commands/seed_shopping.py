@@ -0,0 +1,342 @@
+import random
+import time
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from shopping_list.models import (ShoppingItem, ShoppingList, User,
+                                  unpurchased_preview)
+
+ShoppingListMember = ShoppingList.members.through
+
+# The Unix time in milliseconds of the first seeded shopping item id,
+# 2024-01-01, so that the same seed generates the same ids
+SEED_MILLISECONDS = 1_704_067_200_000
+
+PRODUCTS = [
+    "Apples",
+    "Bananas",
+    "Bread",
+    "Butter",
+    "Carrots",
+    "Cheese",
+    "Chicken",
+    "Coffee",
+    "Cucumbers",
+    "Eggs",
+    "Flour",
+    "Garlic",
+    "Ham",
+    "Honey",
+    "Jam",
+    "Lemons",
+    "Lettuce",
+    "Milk",
+    "Mushrooms",
+    "Noodles",
+    "Oats",
+    "Olive oil",
+    "Onions",
+    "Oranges",
+    "Pasta",
+    "Pears",
+    "Pepper",
+    "Potatoes",
+    "Rice",
+    "Salmon",
+    "Salt",
+    "Soap",
+    "Spinach",
+    "Sugar",
+    "Tea",
+    "Tomatoes",
+    "Tuna",
+    "Vinegar",
+    "Water",
+    "Yogurt",
+]
+
+
+def sample_size(rng, distribution, mean):
+    """
+    Draws the size of a shopping list or of its members from a
+    distribution with the given mean.
+    """
+    if distribution == "fixed":
+        return round(mean)
+    if distribution == "uniform":
+        return rng.randint(0, round(2 * mean))
+    # Many small shopping lists and a long tail of large ones
+    return round(rng.expovariate(1 / mean)) if mean else 0
+
+
+def item_name(position):
+    """
+    Returns the name of the shopping item at the given position of its
+    shopping list, which is unique within it.
+    """
+    product = PRODUCTS[position % len(PRODUCTS)]
+    batch = position // len(PRODUCTS)
+    return f"{product} {batch + 1}" if batch else product
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates users and shopping lists with members and shopping "
+        "items in bulk, for testing at scale. The same seed generates the "
+        "same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help='Database to seed. Defaults to the "default" database.',
+        )
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--shopping-lists", type=int, default=10000)
+        parser.add_argument(
+            "--items-per-list",
+            type=float,
+            default=50,
+            help="Mean number of shopping items of a shopping list.",
+        )
+        parser.add_argument(
+            "--members-per-list",
+            type=float,
+            default=3,
+            help="Mean number of members of a shopping list.",
+        )
+        parser.add_argument(
+            "--distribution",
+            choices=["exponential", "uniform", "fixed"],
+            default="exponential",
+            help="Distribution of the shopping items and the members of "
+            "shopping lists around their means.",
+        )
+        parser.add_argument(
+            "--purchased-ratio",
+            type=float,
+            default=0.3,
+            help="Probability of a shopping item being purchased.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows inserted per statement, and shopping items per "
+            "transaction.",
+        )
+        parser.add_argument(
+            "--orm",
+            action="store_true",
+            help="Insert rows with bulk_create() instead of COPY on "
+            "PostgreSQL and executemany() elsewhere.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.orm = options["orm"]
+        self.verbosity = options["verbosity"]
+        self.database = options["database"]
+        self.uuid7_last = (SEED_MILLISECONDS, self.rng.getrandbits(11))
+
+        user_ids = self.create_users(options["users"], options["seed"])
+        totals = self.create_shopping_lists(user_ids, options)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(user_ids)} users and {totals[0]} shopping "
+                f"lists with {totals[1]} members and {totals[2]} shopping "
+                f"items in {time.monotonic() - started:.1f}s"
+            )
+        )
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def uuid7(self):
+        """
+        Returns a UUID of version 7 like models.uuid7(), but counting from
+        SEED_MILLISECONDS with random bits of the seed, so that seeded
+        shopping items sort in the order they were generated.
+        """
+        milliseconds, counter = self.uuid7_last
+        counter += 1
+        if counter > 0xFFF:
+            milliseconds, counter = milliseconds + 1, 0
+        self.uuid7_last = (milliseconds, counter)
+        return uuid.UUID(
+            int=milliseconds << 80
+            | 0x7 << 76
+            | counter << 64
+            | 0b10 << 62
+            | self.rng.getrandbits(62)
+        )
+
+    def create_users(self, count, seed):
+        prefix = f"seed{seed}_"
+        users = User.objects.using(self.database)
+        if users.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Users of seed {seed} already exist")
+
+        # Nobody logs in as a generated user
+        password = make_password(None)
+        users.bulk_create(
+            (
+                User(username=f"{prefix}{i}", password=password)
+                for i in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return list(
+            users.filter(username__startswith=prefix)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+    def create_shopping_lists(self, user_ids, options):
+        """
+        Generates the shopping lists with their members and shopping items
+        and inserts them in transactions of about a batch of shopping
+        items. Returns the numbers of shopping lists, members and
+        shopping items.
+        """
+        now = timezone.now()
+        totals = [0, 0, 0]
+        shopping_lists, members, shopping_items = [], [], []
+        for i in range(options["shopping_lists"]):
+            shopping_list_id = self.uuid()
+            item_count = sample_size(
+                self.rng, options["distribution"], options["items_per_list"]
+            )
+            unpurchased_names = []
+            for position in range(item_count):
+                name = item_name(position)
+                purchased = self.rng.random() < options["purchased_ratio"]
+                if not purchased:
+                    unpurchased_names.append(name)
+                # Every shopping item was created in a revision of its own
+                shopping_items.append(
+                    (
+                        self.uuid7(),
+                        name,
+                        purchased,
+                        shopping_list_id,
+                        position + 1,
+                    )
+                )
+
+            member_count = sample_size(
+                self.rng, options["distribution"], options["members_per_list"]
+            )
+            member_ids = self.rng.sample(
+                user_ids, min(max(member_count, 1), len(user_ids))
+            )
+            members.extend(
+                (shopping_list_id, user_id) for user_id in member_ids
+            )
+
+            shopping_lists.append(
+                (
+                    shopping_list_id,
+                    f"Shopping list {i}",
+                    now,
+                    item_count,
+                    item_count,
+                    len(unpurchased_names),
+                    unpurchased_preview(unpurchased_names),
+                    # Nothing was deleted, and nobody was renamed
+                    0,
+                    0,
+                )
+            )
+            if len(shopping_items) >= self.batch_size:
+                self.flush(shopping_lists, members, shopping_items, totals)
+        self.flush(shopping_lists, members, shopping_items, totals)
+        return totals
+
+    def flush(self, shopping_lists, members, shopping_items, totals):
+        with transaction.atomic(using=self.database):
+            self.insert(
+                ShoppingList,
+                [
+                    "id",
+                    "name",
+                    "last_interaction",
+                    "revision",
+                    "item_count",
+                    "unpurchased_count",
+                    "unpurchased_preview",
+                    "pruned_revision",
+                    "members_version",
+                ],
+                shopping_lists,
+            )
+            self.insert(
+                ShoppingListMember, ["shoppinglist_id", "user_id"], members
+            )
+            self.insert(
+                ShoppingItem,
+                ["id", "name", "purchased", "shopping_list_id", "revision"],
+                shopping_items,
+            )
+        totals[0] += len(shopping_lists)
+        totals[1] += len(members)
+        totals[2] += len(shopping_items)
+        if self.verbosity >= 2:
+            self.stdout.write(
+                f"{totals[0]} shopping lists, {totals[2]} shopping items"
+            )
+        shopping_lists.clear()
+        members.clear()
+        shopping_items.clear()
+
+    def insert(self, model, attnames, rows):
+        """
+        Inserts rows of values of the given fields of a model, without
+        creating model instances unless --orm is given.
+        """
+        if self.orm:
+            model.objects.using(self.database).bulk_create(
+                (model(**dict(zip(attnames, row))) for row in rows),
+                batch_size=self.batch_size,
+            )
+            return
+
+        connection = connections[self.database]
+        fields = [model._meta.get_field(attname) for attname in attnames]
+        rows = (
+            [
+                field.get_db_prep_save(value, connection)
+                for field, value in zip(fields, row)
+            ]
+            for row in rows
+        )
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(
+            connection.ops.quote_name(field.column) for field in fields
+        )
+        with connection.cursor() as cursor:
+            # COPY is only exposed by psycopg 3
+            if connection.vendor == "postgresql" and hasattr(
+                cursor.cursor, "copy"
+            ):
+                with cursor.cursor.copy(
+                    f"COPY {table} ({columns}) FROM STDIN"
+                ) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                return
+
+            rows = list(rows)
+            placeholders = ", ".join(["%s"] * len(fields))
+            sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+            for start in range(0, len(rows), self.batch_size):
+                cursor.executemany(sql, rows[start : start + self.batch_size])
@@ -0,0 +1,189 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from shopping_list.models import ShoppingList
+
+ShoppingListMember = ShoppingList.members.through
+
+
+class MembershipIndex:
+    """
+    Keeps the set of shopping list ids of every user in Django's cache
+    framework, so that membership checks don't hit the database.
+
+    Each index is stored together with the version stamp of the user it
+    was built for. Changing the members of a shopping list bumps the
+    version of the affected users, which makes every process that shares
+    the cache rebuild their index on the next lookup. Processes don't
+    share a local-memory cache, so with one the indexes are only kept for
+    a few seconds: that's how long a removed member may stay authorized
+    by the other processes.
+    """
+
+    key_prefix = "shopping-list-membership"
+
+    def __init__(self, cache=None):
+        self._cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        if self._cache is not None:
+            return self._cache
+        return caches[settings.SHOPPING_LIST_MEMBERSHIP_CACHE]
+
+    @property
+    def timeout(self):
+        timeout = settings.SHOPPING_LIST_MEMBERSHIP_CACHE_TIMEOUT
+        if isinstance(self.cache, LocMemCache):
+            return min(
+                timeout, settings.SHOPPING_LIST_MEMBERSHIP_LOCAL_CACHE_TIMEOUT
+            )
+        return timeout
+
+    def _version_key(self, user_id):
+        return f"{self.key_prefix}:version:{user_id}"
+
+    def _index_key(self, user_id):
+        return f"{self.key_prefix}:index:{user_id}"
+
+    def _get_version(self, user_id, cached):
+        version = cached.get(self._version_key(user_id))
+        if version is None:
+            # A version stamp that can't collide with the stamp of an index
+            # built before the previous version key was evicted.
+            self.cache.add(self._version_key(user_id), time.time_ns(), None)
+            version = self.cache.get(self._version_key(user_id))
+        return version
+
+    def shopping_list_ids(self, user_id):
+        cached = self.cache.get_many(
+            [self._version_key(user_id), self._index_key(user_id)]
+        )
+        version = self._get_version(user_id, cached)
+        index = cached.get(self._index_key(user_id))
+
+        if index is not None and index[0] == version:
+            self.hits += 1
+            return index[1]
+
+        self.misses += 1
+        shopping_list_ids = frozenset(
+            ShoppingListMember.objects.filter(user_id=user_id).values_list(
+                "shoppinglist_id", flat=True
+            )
+        )
+        self.cache.set(
+            self._index_key(user_id),
+            (version, shopping_list_ids),
+            self.timeout,
+        )
+        return shopping_list_ids
+
+    def is_member(self, user_id, shopping_list_id):
+        return shopping_list_id in self.shopping_list_ids(user_id)
+
+    async def _aget_version(self, user_id, cached):
+        version = cached.get(self._version_key(user_id))
+        if version is None:
+            await self.cache.aadd(
+                self._version_key(user_id), time.time_ns(), None
+            )
+            version = await self.cache.aget(self._version_key(user_id))
+        return version
+
+    async def ashopping_list_ids(self, user_id):
+        """
+        Async variant of shopping_list_ids(), for async views.
+        """
+        cached = await self.cache.aget_many(
+            [self._version_key(user_id), self._index_key(user_id)]
+        )
+        version = await self._aget_version(user_id, cached)
+        index = cached.get(self._index_key(user_id))
+
+        if index is not None and index[0] == version:
+            self.hits += 1
+            return index[1]
+
+        self.misses += 1
+        members = ShoppingListMember.objects.filter(user_id=user_id)
+        shopping_list_ids = frozenset(
+            [
+                shopping_list_id
+                async for shopping_list_id in members.values_list(
+                    "shoppinglist_id", flat=True
+                )
+            ]
+        )
+        await self.cache.aset(
+            self._index_key(user_id),
+            (version, shopping_list_ids),
+            self.timeout,
+        )
+        return shopping_list_ids
+
+    def invalidate(self, user_ids):
+        for user_id in user_ids:
+            try:
+                self.cache.incr(self._version_key(user_id))
+            except ValueError:
+                # Without a version key no index can be trusted anyway.
+                pass
+
+    def invalidate_on_commit(self, user_ids):
+        """
+        Invalidates the indexes right away for the current transaction,
+        and once more after commit, so that other processes can't cache
+        what they read from the database before the change was committed.
+        """
+        user_ids = list(user_ids)
+        self.invalidate(user_ids)
+        transaction.on_commit(lambda: self.invalidate(user_ids))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+membership_index = MembershipIndex()
+
+
+def get_shopping_list_ids(request):
+    """
+    Returns the ids of the shopping lists the user of the request is a
+    member of. The index is memoized on the request, so several
+    permission checks during the same request cost one cache lookup.
+    """
+    shopping_list_ids = getattr(request, "_shopping_list_ids", None)
+    if shopping_list_ids is None:
+        shopping_list_ids = membership_index.shopping_list_ids(request.user.pk)
+        request._shopping_list_ids = shopping_list_ids
+    return shopping_list_ids
+
+
+def is_shopping_list_member(request, shopping_list_id):
+    return shopping_list_id in get_shopping_list_ids(request)
+
+
+async def aget_shopping_list_ids(request):
+    shopping_list_ids = getattr(request, "_shopping_list_ids", None)
+    if shopping_list_ids is None:
+        shopping_list_ids = await membership_index.ashopping_list_ids(
+            request.user.pk
+        )
+        request._shopping_list_ids = shopping_list_ids
+    return shopping_list_ids
+
+
+async def ais_shopping_list_member(request, shopping_list_id):
+    return shopping_list_id in await aget_shopping_list_ids(request)
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Metrics of the request being handled in the current context. Carried
+# into the threads that run the queries of async views by sync_to_async.
+current_request = ContextVar("current_request", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.duration = None
+
+    def stop(self):
+        self.duration = time.perf_counter() - self.start
+
+
+class Histogram:
+    """
+    Counts observations per set of label values in cumulative buckets,
+    like a Prometheus histogram.
+    """
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = sorted(buckets)
+        self._series = defaultdict(
+            lambda: [[0] * (len(self.buckets) + 1), 0.0]
+        )
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        """
+        Records a value for the label values, a tuple of label name and
+        value pairs.
+        """
+        bucket = len(self.buckets)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                bucket = index
+                break
+        with self._lock:
+            series = self._series[labels]
+            series[0][bucket] += 1
+            series[1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def exposition(self):
+        """
+        Returns the lines of the histogram in the Prometheus text format.
+        """
+        with self._lock:
+            series = {
+                labels: (list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            }
+
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{format_labels(labels + (('le', bound),))} {cumulative}"
+                )
+            lines.append(
+                f"{self.name}_sum{format_labels(labels)} "
+                f"{format_value(total)}"
+            )
+            lines.append(
+                f"{self.name}_count{format_labels(labels)} {cumulative}"
+            )
+        return lines
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"'
+        % (
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for name, value in labels
+    )
+
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+QUERY_BUCKETS = [0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89]
+
+request_duration = Histogram(
+    "shopping_list_request_duration_seconds",
+    "Time to respond to requests.",
+    LATENCY_BUCKETS,
+)
+request_db_duration = Histogram(
+    "shopping_list_request_db_duration_seconds",
+    "Time spent in database queries per request.",
+    LATENCY_BUCKETS,
+)
+request_render_duration = Histogram(
+    "shopping_list_request_render_duration_seconds",
+    "Time spent rendering response bodies per request.",
+    LATENCY_BUCKETS,
+)
+request_queries = Histogram(
+    "shopping_list_request_queries",
+    "Database queries per request.",
+    QUERY_BUCKETS,
+)
+histograms = [
+    request_duration,
+    request_db_duration,
+    request_render_duration,
+    request_queries,
+]
+
+
+def observe(labels, request_metrics):
+    request_duration.observe(labels, request_metrics.duration)
+    request_db_duration.observe(labels, request_metrics.db_time)
+    request_render_duration.observe(labels, request_metrics.render_time)
+    request_queries.observe(labels, request_metrics.queries)
+
+
+def exposition():
+    lines = []
+    for histogram in histograms:
+        lines += histogram.exposition()
+    return "\n".join(lines) + "\n"
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper that counts the queries of the current
+    request and the time spent in them.
+    """
+    request_metrics = current_request.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.queries += 1
+        request_metrics.db_time += time.perf_counter() - start
+
+
+@contextmanager
+def rendering():
+    """
+    Adds the time spent in the block to the render time of the current
+    request.
+    """
+    request_metrics = current_request.get()
+    if request_metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics.render_time += time.perf_counter() - start
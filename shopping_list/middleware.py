@@ -0,0 +1,110 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from shopping_list import metrics, routers
+
+METHODS = {"GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"}
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, the number of queries, the time spent in them
+    and the time spent rendering the response body of every request,
+    per view, method and status class. With SHOPPING_LIST_SERVER_TIMING
+    enabled, they're also sent in a Server-Timing header.
+
+    Queries are counted by shopping_list.metrics.record_query, which the
+    app installs on every database connection.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        return self.process_response(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        return self.process_response(request, response, request_metrics)
+
+    def process_response(self, request, response, request_metrics):
+        request_metrics.stop()
+        resolver_match = request.resolver_match
+        labels = (
+            (
+                "view",
+                resolver_match.view_name if resolver_match else "unmatched",
+            ),
+            (
+                "method",
+                request.method if request.method in METHODS else "other",
+            ),
+            ("status", f"{response.status_code // 100}xx"),
+        )
+        metrics.observe(labels, request_metrics)
+
+        if settings.SHOPPING_LIST_SERVER_TIMING:
+            response.headers["Server-Timing"] = (
+                f"db;dur={request_metrics.db_time * 1000:.1f};"
+                f'desc="{request_metrics.queries} queries", '
+                f"render;dur={request_metrics.render_time * 1000:.1f}, "
+                f"total;dur={request_metrics.duration * 1000:.1f}"
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Routes the reads of GET, HEAD and OPTIONS requests to the read
+    replicas in SHOPPING_LIST_READ_REPLICAS, through ReplicaRouter, until
+    they write. A client that wrote reads from the default database for
+    the next SHOPPING_LIST_REPLICA_PIN_TIMEOUT seconds.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        routing = routers.start_routing(request)
+        token = routers.current_routing.set(routing)
+        try:
+            return self.get_response(request)
+        finally:
+            routers.current_routing.reset(token)
+            routers.finish_routing(request, routing)
+
+    async def __acall__(self, request):
+        routing = await routers.astart_routing(request)
+        token = routers.current_routing.set(routing)
+        try:
+            return await self.get_response(request)
+        finally:
+            routers.current_routing.reset(token)
+            await routers.afinish_routing(request, routing)
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:29
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def purchase_duplicates(apps, schema_editor):
+    """
+    Marks all but one of the unpurchased shopping items with the same
+    name on a shopping list as purchased. Updates could store duplicates
+    before the constraint below existed.
+    """
+    ShoppingItem = apps.get_model("shopping_list", "ShoppingItem")
+
+    duplicates = (
+        ShoppingItem.objects.filter(purchased=False)
+        .values("shopping_list", "name")
+        .annotate(count=Count("pk"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    # Loaded first, as the shopping items are updated while going through
+    for duplicate in list(duplicates):
+        shopping_item_ids = list(
+            ShoppingItem.objects.filter(
+                shopping_list=duplicate["shopping_list"],
+                name=duplicate["name"],
+                purchased=False,
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        ShoppingItem.objects.filter(pk__in=shopping_item_ids[1:]).update(
+            purchased=True
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shoppingitem",
+            index=models.Index(
+                fields=["shopping_list", "purchased"], name="item_list_purchased_idx"
+            ),
+        ),
+        migrations.RunPython(purchase_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="shoppingitem",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("purchased", False)),
+                fields=("shopping_list", "name"),
+                name="unique_unpurchased_item_name",
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+from django.db import migrations
+
+SQLITE_CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE shopping_list_shoppingitem_fts USING fts5(
+        name,
+        item_id,
+        shopping_list_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER shopping_list_shoppingitem_fts_insert
+    AFTER INSERT ON shopping_list_shoppingitem
+    BEGIN
+        INSERT INTO shopping_list_shoppingitem_fts
+            (name, item_id, shopping_list_id)
+        VALUES (new.name, new.id, new.shopping_list_id);
+    END
+    """,
+    """
+    CREATE TRIGGER shopping_list_shoppingitem_fts_update
+    AFTER UPDATE OF id, name, shopping_list_id ON shopping_list_shoppingitem
+    BEGIN
+        DELETE FROM shopping_list_shoppingitem_fts
+        WHERE shopping_list_shoppingitem_fts
+            MATCH 'item_id : "' || old.id || '"';
+        INSERT INTO shopping_list_shoppingitem_fts
+            (name, item_id, shopping_list_id)
+        VALUES (new.name, new.id, new.shopping_list_id);
+    END
+    """,
+    """
+    CREATE TRIGGER shopping_list_shoppingitem_fts_delete
+    AFTER DELETE ON shopping_list_shoppingitem
+    BEGIN
+        DELETE FROM shopping_list_shoppingitem_fts
+        WHERE shopping_list_shoppingitem_fts
+            MATCH 'item_id : "' || old.id || '"';
+    END
+    """,
+    """
+    INSERT INTO shopping_list_shoppingitem_fts
+        (name, item_id, shopping_list_id)
+    SELECT name, id, shopping_list_id FROM shopping_list_shoppingitem
+    """,
+]
+
+SQLITE_DROP_SEARCH_INDEX = [
+    "DROP TRIGGER shopping_list_shoppingitem_fts_insert",
+    "DROP TRIGGER shopping_list_shoppingitem_fts_update",
+    "DROP TRIGGER shopping_list_shoppingitem_fts_delete",
+    "DROP TABLE shopping_list_shoppingitem_fts",
+]
+
+# Must match the expression of SearchVector("name", config="simple")
+POSTGRESQL_CREATE_SEARCH_INDEX = [
+    """
+    CREATE INDEX shopping_list_shoppingitem_name_tsv
+    ON shopping_list_shoppingitem
+    USING gin (to_tsvector('simple'::regconfig, COALESCE(name, '')))
+    """,
+]
+
+POSTGRESQL_DROP_SEARCH_INDEX = [
+    "DROP INDEX shopping_list_shoppingitem_name_tsv",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shopping_list", "0002_add_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(
+                {
+                    "sqlite": SQLITE_CREATE_SEARCH_INDEX,
+                    "postgresql": POSTGRESQL_CREATE_SEARCH_INDEX,
+                }
+            ),
+            run_for_vendor(
+                {
+                    "sqlite": SQLITE_DROP_SEARCH_INDEX,
+                    "postgresql": POSTGRESQL_DROP_SEARCH_INDEX,
+                }
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0003_shopping_item_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shoppingitem",
+            index=models.Index(
+                fields=["shopping_list", "purchased", "id"],
+                name="item_list_purchased_id_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="shoppingitem",
+            name="item_list_purchased_idx",
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# SQLite rebuilds the table of shopping items to add a column, which
+# drops the triggers that keep the search index in sync with it.
+SQLITE_CREATE_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER shopping_list_shoppingitem_fts_insert
+    AFTER INSERT ON shopping_list_shoppingitem
+    BEGIN
+        INSERT INTO shopping_list_shoppingitem_fts
+            (name, item_id, shopping_list_id)
+        VALUES (new.name, new.id, new.shopping_list_id);
+    END
+    """,
+    """
+    CREATE TRIGGER shopping_list_shoppingitem_fts_update
+    AFTER UPDATE OF id, name, shopping_list_id ON shopping_list_shoppingitem
+    BEGIN
+        DELETE FROM shopping_list_shoppingitem_fts
+        WHERE shopping_list_shoppingitem_fts
+            MATCH 'item_id : "' || old.id || '"';
+        INSERT INTO shopping_list_shoppingitem_fts
+            (name, item_id, shopping_list_id)
+        VALUES (new.name, new.id, new.shopping_list_id);
+    END
+    """,
+    """
+    CREATE TRIGGER shopping_list_shoppingitem_fts_delete
+    AFTER DELETE ON shopping_list_shoppingitem
+    BEGIN
+        DELETE FROM shopping_list_shoppingitem_fts
+        WHERE shopping_list_shoppingitem_fts
+            MATCH 'item_id : "' || old.id || '"';
+    END
+    """,
+]
+
+SQLITE_DROP_SEARCH_TRIGGERS = [
+    "DROP TRIGGER shopping_list_shoppingitem_fts_insert",
+    "DROP TRIGGER shopping_list_shoppingitem_fts_update",
+    "DROP TRIGGER shopping_list_shoppingitem_fts_delete",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite":
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0004_add_keyset_pagination_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShoppingItemTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("item_id", models.UUIDField()),
+                ("revision", models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(
+            run_on_sqlite(SQLITE_DROP_SEARCH_TRIGGERS),
+            run_on_sqlite(SQLITE_CREATE_SEARCH_TRIGGERS),
+        ),
+        migrations.AddField(
+            model_name="shoppingitem",
+            name="revision",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            run_on_sqlite(SQLITE_CREATE_SEARCH_TRIGGERS),
+            run_on_sqlite(SQLITE_DROP_SEARCH_TRIGGERS),
+        ),
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="revision",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="shoppingitem",
+            index=models.Index(
+                fields=["shopping_list", "revision"],
+                name="item_list_revision_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="shoppingitemtombstone",
+            name="shopping_list",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="shopping_item_tombstones",
+                to="shopping_list.shoppinglist",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shoppingitemtombstone",
+            index=models.Index(
+                fields=["shopping_list", "revision"],
+                name="tombstone_list_revision_idx",
+            ),
+        ),
+    ]
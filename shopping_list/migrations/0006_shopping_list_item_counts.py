@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_items(apps, schema_editor):
+    ShoppingList = apps.get_model("shopping_list", "ShoppingList")
+    ShoppingItem = apps.get_model("shopping_list", "ShoppingItem")
+
+    def count(condition=Q()):
+        shopping_items = (
+            ShoppingItem.objects.filter(
+                condition, shopping_list=OuterRef("pk")
+            )
+            .order_by()
+            .values("shopping_list")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return Coalesce(Subquery(shopping_items), 0)
+
+    ShoppingList.objects.update(
+        item_count=count(), unpurchased_count=count(Q(purchased=False))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0005_shopping_item_changes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="item_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="unpurchased_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:17
+
+from itertools import groupby, islice
+
+from django.db import migrations, models
+
+# The preview size when the migration was written, so that the migration
+# doesn't change with SHOPPING_LIST_PREVIEW_SIZE
+PREVIEW_SIZE = 3
+
+
+def fill_previews(apps, schema_editor):
+    ShoppingList = apps.get_model("shopping_list", "ShoppingList")
+    ShoppingItem = apps.get_model("shopping_list", "ShoppingItem")
+
+    unpurchased_names = (
+        ShoppingItem.objects.filter(purchased=False)
+        .order_by("shopping_list_id", "name")
+        .values_list("shopping_list_id", "name")
+        .iterator(chunk_size=2000)
+    )
+    shopping_lists = []
+    for shopping_list_id, names in groupby(
+        unpurchased_names, key=lambda item: item[0]
+    ):
+        shopping_lists.append(
+            ShoppingList(
+                pk=shopping_list_id,
+                unpurchased_preview=[
+                    name for _, name in islice(names, PREVIEW_SIZE)
+                ],
+            )
+        )
+        if len(shopping_lists) == 500:
+            ShoppingList.objects.bulk_update(
+                shopping_lists, ["unpurchased_preview"]
+            )
+            shopping_lists = []
+    ShoppingList.objects.bulk_update(shopping_lists, ["unpurchased_preview"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0006_shopping_list_item_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="unpurchased_preview",
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.RunPython(fill_previews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:27
+
+from django.db import migrations, models
+
+import shopping_list.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0007_shopping_list_unpurchased_preview"),
+    ]
+
+    operations = [
+        # The default is only applied by Django, and altering the field
+        # would remake the table on SQLite, without its search triggers
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="shoppingitem",
+                    name="id",
+                    field=models.UUIDField(
+                        default=shopping_list.models.uuid7,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+            ],
+        ),
+    ]
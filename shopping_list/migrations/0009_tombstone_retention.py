@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0008_shopping_item_time_ordered_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppingitemtombstone",
+            name="deleted_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="pruned_revision",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0009_tombstone_retention"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shoppinglist",
+            name="members_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,94 @@
+from django.db import migrations
+
+
+def sqlite_search_index(shopping_list_id_column):
+    """
+    Returns the statements that create the search index of shopping items
+    with the given definition of its shopping_list_id column, and fill it.
+    """
+    return [
+        f"""
+        CREATE VIRTUAL TABLE shopping_list_shoppingitem_fts USING fts5(
+            name,
+            item_id,
+            {shopping_list_id_column},
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER shopping_list_shoppingitem_fts_insert
+        AFTER INSERT ON shopping_list_shoppingitem
+        BEGIN
+            INSERT INTO shopping_list_shoppingitem_fts
+                (name, item_id, shopping_list_id)
+            VALUES (new.name, new.id, new.shopping_list_id);
+        END
+        """,
+        """
+        CREATE TRIGGER shopping_list_shoppingitem_fts_update
+        AFTER UPDATE OF id, name, shopping_list_id
+        ON shopping_list_shoppingitem
+        BEGIN
+            DELETE FROM shopping_list_shoppingitem_fts
+            WHERE shopping_list_shoppingitem_fts
+                MATCH 'item_id : "' || old.id || '"';
+            INSERT INTO shopping_list_shoppingitem_fts
+                (name, item_id, shopping_list_id)
+            VALUES (new.name, new.id, new.shopping_list_id);
+        END
+        """,
+        """
+        CREATE TRIGGER shopping_list_shoppingitem_fts_delete
+        AFTER DELETE ON shopping_list_shoppingitem
+        BEGIN
+            DELETE FROM shopping_list_shoppingitem_fts
+            WHERE shopping_list_shoppingitem_fts
+                MATCH 'item_id : "' || old.id || '"';
+        END
+        """,
+        """
+        INSERT INTO shopping_list_shoppingitem_fts
+            (name, item_id, shopping_list_id)
+        SELECT name, id, shopping_list_id FROM shopping_list_shoppingitem
+        """,
+    ]
+
+
+SQLITE_DROP_SEARCH_INDEX = [
+    "DROP TRIGGER shopping_list_shoppingitem_fts_insert",
+    "DROP TRIGGER shopping_list_shoppingitem_fts_update",
+    "DROP TRIGGER shopping_list_shoppingitem_fts_delete",
+    "DROP TABLE shopping_list_shoppingitem_fts",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite":
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shopping_list", "0010_shopping_list_members_version"),
+    ]
+
+    # Searches match the ids of the shopping lists searched, so that only
+    # the shopping items of those lists are ranked
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(
+                SQLITE_DROP_SEARCH_INDEX
+                + sqlite_search_index("shopping_list_id")
+            ),
+            run_on_sqlite(
+                SQLITE_DROP_SEARCH_INDEX
+                + sqlite_search_index("shopping_list_id UNINDEXED")
+            ),
+        ),
+    ]
@@ -1,8 +1,63 @@
+import heapq
+import secrets
+import threading
+import time
 import uuid
+from collections import defaultdict
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models.functions import Collate
+from django.utils import timezone
+
+from shopping_list.signals import shopping_items_deleted
+
+_uuid7_lock = threading.Lock()
+_uuid7_last = (0, 0)
+
+
+def uuid7():
+    """
+    Returns a UUID of version 7, which starts with the Unix time in
+    milliseconds. UUIDs made by a process within the same millisecond
+    are ordered by a counter, so they sort in the order they were made.
+    """
+    global _uuid7_last
+    with _uuid7_lock:
+        milliseconds = time.time_ns() // 1_000_000
+        last_milliseconds, counter = _uuid7_last
+        if milliseconds <= last_milliseconds:
+            milliseconds, counter = last_milliseconds, counter + 1
+            if counter > 0xFFF:
+                milliseconds, counter = milliseconds + 1, 0
+        else:
+            # Leaves room for the counter to grow
+            counter = secrets.randbits(11)
+        _uuid7_last = (milliseconds, counter)
+    return uuid.UUID(
+        int=milliseconds << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+
+
+def unpurchased_preview(names):
+    """
+    Returns the names shown in the unpurchased preview of a shopping list
+    with unpurchased items of the given names.
+    """
+    return heapq.nsmallest(settings.SHOPPING_LIST_PREVIEW_SIZE, names)
+
+
+def unpurchased(name, purchased):
+    """
+    Returns the name of a shopping item among the names of unpurchased
+    shopping items, which are unique per shopping list.
+    """
+    return set() if purchased else {name}
 
 
 class ShoppingList(models.Model):
@@ -12,22 +67,327 @@ class ShoppingList(models.Model):
         settings.AUTH_USER_MODEL, related_name="shopping_lists"
     )
     last_interaction = models.DateTimeField(auto_now=True)
+    # Last revision given to a change of the shopping items of the list
+    revision = models.PositiveBigIntegerField(default=0, editable=False)
+    # Maintained together with the shopping items. Shopping items written
+    # with bulk_create() or raw SQL aren't counted, and the counts can be
+    # repaired with the repair_item_counts management command.
+    item_count = models.IntegerField(default=0, editable=False)
+    unpurchased_count = models.IntegerField(default=0, editable=False)
+    # Names of the first SHOPPING_LIST_PREVIEW_SIZE unpurchased shopping
+    # items in alphabetical order, maintained together with the shopping
+    # items. See the check_unpurchased_previews management command.
+    unpurchased_preview = models.JSONField(default=list, editable=False)
+    # Last revision of the tombstones pruned by the prune_tombstones
+    # management command. Clients that synced before it have to sync again.
+    pruned_revision = models.PositiveBigIntegerField(default=0, editable=False)
+    # Bumped when a member is renamed, as shopping lists show the usernames
+    # of their members, without reordering them by last_interaction
+    members_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # Only ever changed while the shopping list is locked for changes of
+    # its shopping items, so that saving a shopping list doesn't undo them
+    derived_fields = [
+        "revision",
+        "item_count",
+        "unpurchased_count",
+        "unpurchased_preview",
+        "pruned_revision",
+        "members_version",
+    ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred_fields = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.derived_fields
+                and field.attname not in deferred_fields
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def allocate_revisions(cls, shopping_list_id, count=1, **counts):
+        """
+        Reserves `count` consecutive revisions of a shopping list, and
+        returns the first one and the unpurchased preview of the shopping
+        list. `counts` are added to the item counters of the shopping list
+        in the same update.
+
+        Has to run in the transaction that writes the changes. The shopping
+        list stays locked until it is committed, so changes of a shopping
+        list are committed in the order of their revisions.
+        """
+        shopping_lists = cls.objects.filter(pk=shopping_list_id)
+        shopping_lists.update(
+            revision=models.F("revision") + count,
+            **cls._count_updates(counts),
+        )
+        revision, preview = shopping_lists.values_list(
+            "revision", "unpurchased_preview"
+        ).get()
+        return revision - count + 1, preview
+
+    @classmethod
+    def update_counts(cls, shopping_list_id, **counts):
+        """
+        Adds `counts` to the item counters of a shopping list.
+        """
+        counts = cls._count_updates(counts)
+        if counts:
+            cls.objects.filter(pk=shopping_list_id).update(**counts)
+
+    @classmethod
+    def update_preview(cls, shopping_list_id, preview, removed, added):
+        """
+        Updates the unpurchased preview of a shopping list, as read by
+        allocate_revisions(), once the names in `removed` are no longer
+        and the names in `added` are now names of unpurchased items.
+
+        Has to run once the shopping items are written. The names of
+        unpurchased items are unique per shopping list, so the preview
+        is only read from the shopping items when a name is removed from
+        a full preview, and then only its first names are read, through
+        the unique_unpurchased_item_name index.
+        """
+        size = settings.SHOPPING_LIST_PREVIEW_SIZE
+        if removed.intersection(preview) and len(preview) >= size:
+            name = models.F("name")
+            if connection.vendor == "postgresql":
+                # Ordered by code point, like Python and SQLite's BINARY
+                # collation
+                name = Collate(name, "C")
+            names = (
+                ShoppingItem.objects.filter(
+                    shopping_list_id=shopping_list_id, purchased=False
+                )
+                .order_by(name)
+                .values_list("name", flat=True)[:size]
+            )
+        else:
+            names = set(preview).difference(removed).union(added)
+
+        updated_preview = unpurchased_preview(names)
+        if updated_preview != preview:
+            cls.objects.filter(pk=shopping_list_id).update(
+                unpurchased_preview=updated_preview
+            )
+
+    @staticmethod
+    def _count_updates(counts):
+        return {
+            field: models.F(field) + delta
+            for field, delta in counts.items()
+            if delta
+        }
+
+
+class ShoppingItemQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Leaves a tombstone for every deleted shopping item, for clients
+        that sync the changes of a shopping list.
+        """
+        with transaction.atomic():
+            shopping_items = defaultdict(list)
+            unpurchased_names = defaultdict(set)
+            rows = self.values_list(
+                "id", "shopping_list_id", "name", "purchased"
+            )
+            for shopping_item_id, shopping_list_id, name, purchased in rows:
+                shopping_items[shopping_list_id].append(shopping_item_id)
+                unpurchased_names[shopping_list_id] |= unpurchased(
+                    name, purchased
+                )
+
+            tombstones = []
+            previews = {}
+            for shopping_list_id, shopping_item_ids in shopping_items.items():
+                revision, previews[shopping_list_id] = (
+                    ShoppingList.allocate_revisions(
+                        shopping_list_id,
+                        len(shopping_item_ids),
+                        item_count=-len(shopping_item_ids),
+                        unpurchased_count=-len(
+                            unpurchased_names[shopping_list_id]
+                        ),
+                    )
+                )
+                tombstones += [
+                    ShoppingItemTombstone(
+                        shopping_list_id=shopping_list_id,
+                        item_id=shopping_item_id,
+                        revision=revision + offset,
+                    )
+                    for offset, shopping_item_id in enumerate(
+                        shopping_item_ids
+                    )
+                ]
+            ShoppingItemTombstone.objects.bulk_create(tombstones)
+
+            # Only the shopping items that got a tombstone are deleted
+            deleted = self.model.objects.filter(
+                pk__in=[tombstone.item_id for tombstone in tombstones]
+            )
+            result = super(ShoppingItemQuerySet, deleted).delete()
+            for shopping_list_id, preview in previews.items():
+                ShoppingList.update_preview(
+                    shopping_list_id,
+                    preview,
+                    removed=unpurchased_names[shopping_list_id],
+                    added=set(),
+                )
+            shopping_items_deleted.send(
+                sender=self.model, tombstones=tombstones
+            )
+            return result
+
 
 class ShoppingItem(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    # Ordered by creation, which breaks ties between shopping items
+    id = models.UUIDField(primary_key=True, default=uuid7)
     name = models.CharField(max_length=100)
     purchased = models.BooleanField()
     shopping_list = models.ForeignKey(
         ShoppingList, on_delete=models.CASCADE, related_name="shopping_items"
     )
+    # Revision of the shopping list the item was last changed in
+    revision = models.PositiveBigIntegerField(default=0, editable=False)
+
+    objects = ShoppingItemQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Changes of a shopping list are looked up by revision
+            models.Index(
+                fields=["shopping_list", "revision"],
+                name="item_list_revision_idx",
+            ),
+            # Shopping items of a list are ordered by purchased, and ties
+            # are broken by id
+            models.Index(
+                fields=["shopping_list", "purchased", "id"],
+                name="item_list_purchased_id_idx",
+            ),
+        ]
+        constraints = [
+            # A shopping list can't have the same item twice until purchased
+            models.UniqueConstraint(
+                fields=["shopping_list", "name"],
+                condition=models.Q(purchased=False),
+                name="unique_unpurchased_item_name",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "revision"}
+
+        with transaction.atomic():
+            if self._state.adding:
+                self.revision, preview = ShoppingList.allocate_revisions(
+                    self.shopping_list_id,
+                    item_count=1,
+                    unpurchased_count=int(not self.purchased),
+                )
+                super().save(*args, **kwargs)
+                ShoppingList.update_preview(
+                    self.shopping_list_id,
+                    preview,
+                    removed=set(),
+                    added=unpurchased(self.name, self.purchased),
+                )
+                return
+
+            self.revision, preview = ShoppingList.allocate_revisions(
+                self.shopping_list_id
+            )
+            previous = self.name, self.purchased
+            if update_fields is None or {"name", "purchased"}.intersection(
+                update_fields
+            ):
+                # Changes of the shopping items of a list wait for the
+                # shopping list, which is locked now
+                previous = (
+                    ShoppingItem.objects.filter(pk=self.pk)
+                    .values_list("name", "purchased")
+                    .get()
+                )
+            super().save(*args, **kwargs)
+
+            was_purchased = previous[1]
+            ShoppingList.update_counts(
+                self.shopping_list_id,
+                unpurchased_count=was_purchased - self.purchased,
+            )
+            previous_names = unpurchased(*previous)
+            names = unpurchased(self.name, self.purchased)
+            ShoppingList.update_preview(
+                self.shopping_list_id,
+                preview,
+                removed=previous_names - names,
+                added=names - previous_names,
+            )
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            revision, preview = ShoppingList.allocate_revisions(
+                self.shopping_list_id,
+                item_count=-1,
+                unpurchased_count=-int(not self.purchased),
+            )
+            tombstone = ShoppingItemTombstone.objects.create(
+                shopping_list_id=self.shopping_list_id,
+                item_id=self.id,
+                revision=revision,
+            )
+            result = super().delete(*args, **kwargs)
+            ShoppingList.update_preview(
+                self.shopping_list_id,
+                preview,
+                removed=unpurchased(self.name, self.purchased),
+                added=set(),
+            )
+            shopping_items_deleted.send(
+                sender=self.__class__, tombstones=[tombstone]
+            )
+            return result
+
+
+class ShoppingItemTombstone(models.Model):
+    """
+    Marks a deleted shopping item, so that clients can sync the deletion.
+    """
+
+    shopping_list = models.ForeignKey(
+        ShoppingList,
+        on_delete=models.CASCADE,
+        related_name="shopping_item_tombstones",
+    )
+    item_id = models.UUIDField()
+    revision = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["shopping_list", "revision"],
+                name="tombstone_list_revision_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.item_id)
+
 
 class User(AbstractUser):
     pass
@@ -1,11 +1,165 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
 from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
 
-from shopping_list.models import ShoppingItem, ShoppingList
+from shopping_list.api.authentication import token_cache
+from shopping_list.api.serializers import serialize_when_published
+from shopping_list.events import publish_on_commit
+from shopping_list.interactions import last_interaction_updater
+from shopping_list.membership import membership_index
+from shopping_list.metrics import record_query
+from shopping_list.models import ShoppingItem, ShoppingList, User
+from shopping_list.signals import shopping_items_deleted
 
 
 @receiver(post_save, sender=ShoppingItem)
-def interaction_with_shopping_list(sender, instance, **kwargs):
-    ShoppingList.objects.get(id=instance.shopping_list.id).save(
-        update_fields=["last_interaction"]
+def interaction_with_shopping_list(sender, instance, created, **kwargs):
+    last_interaction_updater.touch(instance.shopping_list_id)
+    publish_on_commit(
+        instance.shopping_list_id,
+        "item_created" if created else "item_updated",
+        revision=instance.revision,
+        item=serialize_when_published(instance),
     )
+
+
+@receiver(shopping_items_deleted, sender=ShoppingItem)
+def shopping_items_deleted_from_list(sender, tombstones, **kwargs):
+    for tombstone in tombstones:
+        publish_on_commit(
+            tombstone.shopping_list_id,
+            "item_deleted",
+            revision=tombstone.revision,
+            item={"id": str(tombstone.item_id)},
+        )
+
+
+@receiver(post_delete, sender=ShoppingList)
+def shopping_list_deleted(sender, instance, **kwargs):
+    publish_on_commit(instance.pk, "shopping_list_deleted")
+
+
+def publish_members_changed(shopping_list_id, action, member_ids):
+    # Subscribers that are no longer members are disconnected
+    added = action == "post_add"
+    publish_on_commit(
+        shopping_list_id,
+        "members_changed",
+        added=sorted(member_ids) if added else [],
+        removed=[] if added else sorted(member_ids),
+    )
+
+
+@receiver(m2m_changed, sender=ShoppingList.members.through)
+def shopping_list_members_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if reverse:
+        # The members were changed from the user side,
+        # e.g. user.shopping_lists.add(shopping_list)
+        if action == "pre_clear":
+            instance._cleared_shopping_list_ids = list(
+                instance.shopping_lists.values_list("pk", flat=True)
+            )
+        elif action in ("post_add", "post_remove"):
+            membership_index.invalidate_on_commit([instance.pk])
+            for shopping_list_id in pk_set:
+                last_interaction_updater.touch(shopping_list_id)
+                publish_members_changed(
+                    shopping_list_id, action, [instance.pk]
+                )
+        elif action == "post_clear":
+            membership_index.invalidate_on_commit([instance.pk])
+            for shopping_list_id in instance.__dict__.pop(
+                "_cleared_shopping_list_ids", []
+            ):
+                last_interaction_updater.touch(shopping_list_id)
+                publish_members_changed(
+                    shopping_list_id, action, [instance.pk]
+                )
+        return
+
+    if action == "pre_clear":
+        instance._cleared_member_ids = list(
+            instance.members.values_list("pk", flat=True)
+        )
+    elif action in ("post_add", "post_remove"):
+        membership_index.invalidate_on_commit(pk_set)
+        last_interaction_updater.touch(instance.pk)
+        publish_members_changed(instance.pk, action, pk_set)
+    elif action == "post_clear":
+        member_ids = instance.__dict__.pop("_cleared_member_ids", [])
+        membership_index.invalidate_on_commit(member_ids)
+        last_interaction_updater.touch(instance.pk)
+        publish_members_changed(instance.pk, action, member_ids)
+
+
+@receiver(pre_save, sender=User)
+def member_renaming(sender, instance, update_fields, **kwargs):
+    # Shopping lists show the usernames of their members
+    instance._renamed = (
+        not instance._state.adding
+        and (update_fields is None or "username" in update_fields)
+        and User.objects.filter(pk=instance.pk)
+        .exclude(username=instance.username)
+        .exists()
+    )
+
+
+@receiver(post_save, sender=User)
+def member_changed(sender, instance, **kwargs):
+    if instance.__dict__.pop("_renamed", False):
+        ShoppingList.objects.filter(members=instance).update(
+            members_version=F("members_version") + 1
+        )
+
+
+@receiver(pre_delete, sender=User)
+def member_deleted(sender, instance, **kwargs):
+    # Memberships are deleted by cascade, which sends no m2m_changed
+    shopping_lists = ShoppingList.objects.filter(members=instance)
+    shopping_list_ids = list(shopping_lists.values_list("pk", flat=True))
+    if not shopping_list_ids:
+        return
+    ShoppingList.objects.filter(pk__in=shopping_list_ids).update(
+        members_version=F("members_version") + 1
+    )
+    for shopping_list_id in shopping_list_ids:
+        publish_members_changed(shopping_list_id, "post_remove", [instance.pk])
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance, **kwargs):
+    token_cache.revoke_on_commit([instance.key])
+
+
+@receiver(post_save, sender=User)
+def token_user_changed(sender, instance, created, update_fields, **kwargs):
+    # Deactivated users must not be authenticated by their cached tokens.
+    # Logins only update last_login, which tokens don't depend on.
+    if created or update_fields == frozenset(["last_login"]):
+        return
+    token_cache.revoke_on_commit(
+        Token.objects.filter(user=instance).values_list("key", flat=True)
+    )
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Connections are reopened on the same wrapper
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SHOPPING_LIST_SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
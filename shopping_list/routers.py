@@ -0,0 +1,142 @@
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+# Routing of the request being handled in the current context. Carried
+# into the threads that run the queries of async views by sync_to_async.
+current_routing = ContextVar("current_routing", default=None)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class Routing:
+    """
+    Where the reads of a request go: to a replica until the request
+    writes, or to the default database if `replica` is None.
+    """
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        self.wrote = False
+
+
+def pin_key(request):
+    """
+    Returns the cache key that pins the reads of the client of a request
+    to the default database, or None for anonymous clients. Clients are
+    told apart by their credentials, which are hashed.
+    """
+    credentials = request.headers.get("Authorization") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not credentials:
+        return None
+    digest = hashlib.sha256(credentials.encode()).hexdigest()
+    return f"replica-pin:{digest}"
+
+
+def start_routing(request):
+    """
+    Returns the routing of a request. Reads of GET, HEAD and OPTIONS
+    requests go to a random replica, unless their client wrote within
+    the last SHOPPING_LIST_REPLICA_PIN_TIMEOUT seconds.
+    """
+    replicas = settings.SHOPPING_LIST_READ_REPLICAS
+    if not replicas or request.method not in SAFE_METHODS:
+        return Routing()
+    key = pin_key(request)
+    if key and caches[settings.SHOPPING_LIST_REPLICA_PIN_CACHE].get(key):
+        return Routing()
+    return Routing(random.choice(replicas))
+
+
+async def astart_routing(request):
+    """
+    Async variant of start_routing(), for async middleware.
+    """
+    replicas = settings.SHOPPING_LIST_READ_REPLICAS
+    if not replicas or request.method not in SAFE_METHODS:
+        return Routing()
+    cache = caches[settings.SHOPPING_LIST_REPLICA_PIN_CACHE]
+    key = pin_key(request)
+    if key and await cache.aget(key):
+        return Routing()
+    return Routing(random.choice(replicas))
+
+
+def finish_routing(request, routing):
+    """
+    Pins the reads of the client of a request that wrote to the default
+    database, so that it reads its own writes.
+    """
+    if not routing.wrote or not settings.SHOPPING_LIST_READ_REPLICAS:
+        return
+    key = pin_key(request)
+    if key:
+        caches[settings.SHOPPING_LIST_REPLICA_PIN_CACHE].set(
+            key, True, settings.SHOPPING_LIST_REPLICA_PIN_TIMEOUT
+        )
+
+
+async def afinish_routing(request, routing):
+    """
+    Async variant of finish_routing(), for async middleware.
+    """
+    if not routing.wrote or not settings.SHOPPING_LIST_READ_REPLICAS:
+        return
+    key = pin_key(request)
+    if key:
+        await caches[settings.SHOPPING_LIST_REPLICA_PIN_CACHE].aset(
+            key, True, settings.SHOPPING_LIST_REPLICA_PIN_TIMEOUT
+        )
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of a request to the replica chosen for it by
+    ReplicaRoutingMiddleware, and everything else to the default database.
+
+    Credentials and memberships are always read from the default
+    database: a token that was just created must authenticate, and the
+    membership index that permission classes check is cached until the
+    members change, so it must not be built from a replica that lags.
+    """
+
+    primary_models = {
+        "authtoken.token",
+        "sessions.session",
+        "shopping_list.shoppinglist_members",
+    }
+
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        if (
+            routing is None
+            or routing.replica is None
+            or routing.wrote
+            or model._meta.label_lower in self.primary_models
+        ):
+            return DEFAULT_DB_ALIAS
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.SHOPPING_LIST_READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the default database
+        if db in settings.SHOPPING_LIST_READ_REPLICAS:
+            return False
+        return None
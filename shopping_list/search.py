@@ -0,0 +1,150 @@
+import re
+import uuid
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from shopping_list.models import ShoppingItem
+
+SEARCH_TERM_WORDS = re.compile(r"\w+")
+
+
+def search_words(terms):
+    """
+    Splits search terms into words, dropping characters that have a
+    meaning in the query syntax of the search indexes.
+    """
+    return [
+        word.lower()
+        for term in terms
+        for word in SEARCH_TERM_WORDS.findall(term)
+    ]
+
+
+class SearchBackend:
+    """
+    Finds shopping items whose names contain words starting with every
+    one of the search terms.
+    """
+
+    def ranked_ids(self, words, shopping_list_ids, limit):
+        """
+        Returns the ids of the best `limit` matching shopping items of the
+        given shopping lists, best match first.
+        """
+        raise NotImplementedError
+
+    def search(self, queryset, terms, shopping_list_ids, limit):
+        """
+        Narrows down a queryset of shopping items to the best matches,
+        ordered by the `search_rank` annotation.
+        """
+        words = search_words(terms)
+        if not words or not shopping_list_ids:
+            return queryset.none()
+
+        item_ids = self.ranked_ids(words, shopping_list_ids, limit)
+        if not item_ids:
+            return queryset.none()
+
+        return (
+            queryset.filter(id__in=item_ids)
+            .annotate(
+                search_rank=Case(
+                    *[
+                        When(id=item_id, then=Value(rank))
+                        for rank, item_id in enumerate(item_ids)
+                    ],
+                    output_field=IntegerField(),
+                )
+            )
+            .order_by("search_rank")
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Uses the FTS5 table shopping_list_shoppingitem_fts, which triggers
+    keep in sync with the shopping items.
+
+    The ids of the shopping lists are matched along with the words, so
+    that only the shopping items of those lists are found and ranked.
+    Items are ranked by their names alone.
+    """
+
+    query = (
+        "SELECT item_id FROM shopping_list_shoppingitem_fts "
+        "WHERE shopping_list_shoppingitem_fts MATCH %s "
+        "AND rank MATCH 'bm25(1.0, 0.0, 0.0)' "
+        "ORDER BY rank LIMIT %s"
+    )
+
+    def match(self, words, shopping_list_ids):
+        return "shopping_list_id : ({}) AND name : ({})".format(
+            " OR ".join(
+                f'"{shopping_list_id.hex}"'
+                for shopping_list_id in shopping_list_ids
+            ),
+            " ".join(f'"{word}"*' for word in words),
+        )
+
+    def ranked_ids(self, words, shopping_list_ids, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.query, [self.match(words, shopping_list_ids), limit]
+            )
+            return [uuid.UUID(item_id) for (item_id,) in cursor]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    Uses the GIN index on the `simple` text search vector of the names
+    of the shopping items.
+    """
+
+    def ranked_ids(self, words, shopping_list_ids, limit):
+        from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                    SearchVector)
+
+        vector = SearchVector("name", config="simple")
+        query = SearchQuery(
+            " & ".join(f"{word}:*" for word in words),
+            config="simple",
+            search_type="raw",
+        )
+        return list(
+            ShoppingItem.objects.filter(shopping_list_id__in=shopping_list_ids)
+            .annotate(search_vector=vector)
+            .filter(search_vector=query)
+            .order_by(SearchRank(vector, query).desc(), "name")
+            .values_list("id", flat=True)[:limit]
+        )
+
+
+class FallbackSearchBackend(SearchBackend):
+    """
+    Scans the names of the shopping items, for databases without a
+    search index.
+    """
+
+    def ranked_ids(self, words, shopping_list_ids, limit):
+        condition = Q()
+        for word in words:
+            condition &= Q(name__icontains=word)
+        return list(
+            ShoppingItem.objects.filter(
+                condition, shopping_list_id__in=shopping_list_ids
+            )
+            .order_by("name")
+            .values_list("id", flat=True)[:limit]
+        )
+
+
+SEARCH_BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend():
+    return SEARCH_BACKENDS.get(connection.vendor, FallbackSearchBackend)()
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Sent with the tombstones of shopping items once they are deleted
+shopping_items_deleted = Signal()
@@ -0,0 +1,71 @@
+from shopping_list.models import (ShoppingItem, ShoppingItemTombstone,
+                                  ShoppingList)
+
+CHANGES_LIMIT = 500
+
+
+def get_changes(shopping_list_id, since=None, limit=CHANGES_LIMIT):
+    """
+    Returns the shopping items of a shopping list that were created or
+    updated, and the ids of the ones that were deleted, after the revision
+    `since`, oldest change first. Without `since` a snapshot of the
+    shopping items is returned, in the same pages as changes.
+
+    The returned revision is the one to ask for changes since next time.
+    At most `limit` changes are returned at once, and `has_more` tells
+    whether there are more after the returned revision. `resync` tells
+    that deletions after `since` were pruned, and that a snapshot is
+    returned instead, which replaces the shopping items of the client.
+    """
+    # Read first, as changes committed in the meantime are only returned
+    # again the next time
+    revision, pruned_revision = (
+        ShoppingList.objects.filter(pk=shopping_list_id)
+        .values_list("revision", "pruned_revision")
+        .get()
+    )
+    resync = since is not None and since < pruned_revision
+    if resync:
+        since = None
+
+    revisions = {
+        "shopping_list_id": shopping_list_id,
+        "revision__lte": revision,
+    }
+    if since is not None:
+        revisions["revision__gt"] = since
+    changed = ShoppingItem.objects.filter(**revisions).order_by("revision")[
+        : limit + 1
+    ]
+    # A snapshot has nothing to delete
+    deleted = (
+        []
+        if since is None
+        else ShoppingItemTombstone.objects.filter(**revisions)
+        .order_by("revision")
+        .values_list("revision", "item_id")[: limit + 1]
+    )
+    changes = sorted(
+        [(shopping_item.revision, shopping_item) for shopping_item in changed]
+        + list(deleted),
+        key=lambda change: change[0],
+    )
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if has_more:
+        revision = changes[-1][0]
+
+    return {
+        "revision": revision,
+        "has_more": has_more,
+        "resync": resync,
+        "changed": [
+            change for _, change in changes if isinstance(change, ShoppingItem)
+        ],
+        "deleted": [
+            change
+            for _, change in changes
+            if not isinstance(change, ShoppingItem)
+        ],
+    }
@@ -1,6 +1,9 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
+from shopping_list.api.authentication import token_cache
+from shopping_list.fragments import fragment_cache
 from shopping_list.models import ShoppingItem, ShoppingList, User
 
 
@@ -50,3 +53,22 @@ def create_shopping_list():
         return shopping_list
 
     return _create_shopping_list
+
+
+@pytest.fixture(autouse=True)
+def synchronous_last_interaction(settings):
+    # Tests run inside a transaction which is never committed
+    settings.SHOPPING_LIST_INTERACTION_WRITE_BEHIND = False
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # The membership index lives in the cache, which outlives the test
+    # database, where primary keys of users can be reused.
+    cache.clear()
+    fragment_cache.clear()
+    token_cache.clear()
+    yield
+    cache.clear()
+    fragment_cache.clear()
+    token_cache.clear()
@@ -0,0 +1,133 @@
+import uuid
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from shopping_list.models import ShoppingItem, User
+
+
+@pytest.mark.django_db
+def test_async_shopping_lists_match_sync_ones(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    for name in ["Groceries", "Books", "Tools", "Clothes"]:
+        shopping_list = create_shopping_list(user, name)
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name="Eggs", purchased=False
+        )
+
+    for page in [1, 2]:
+        sync_response = client.get(
+            reverse("all_shopping_lists"), {"page": page}
+        )
+        async_response = client.get(
+            reverse("async_all_shopping_lists"), {"page": page}
+        )
+
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.json()["results"] == (
+            sync_response.json()["results"]
+        )
+        assert async_response.json()["count"] == 4
+
+
+@pytest.mark.django_db
+def test_async_shopping_items_match_sync_ones(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    for i, name in enumerate(["Eggs", "Milk", "Bread", "Chocolate"]):
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=i % 2 == 0
+        )
+    params = {"ordering": "-name", "page_size": 3, "page": 2}
+
+    sync_response = client.get(
+        reverse("list_add_shopping_item", args=[shopping_list.id]), params
+    )
+    async_response = client.get(
+        reverse("async_list_shopping_items", args=[shopping_list.id]), params
+    )
+
+    assert async_response.status_code == status.HTTP_200_OK
+    assert async_response.json()["results"] == sync_response.json()["results"]
+    assert async_response.json()["previous"] == sync_response.json()[
+        "previous"
+    ].replace("/api/", "/api/async/")
+
+
+@pytest.mark.django_db
+def test_async_details_match_sync_ones(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_item = create_shopping_item(user)
+    shopping_list_id = shopping_item.shopping_list_id
+
+    for name, args in [
+        ("shopping_list_detail", [shopping_list_id]),
+        ("shopping_item_detail", [shopping_list_id, shopping_item.id]),
+    ]:
+        sync_response = client.get(reverse(name, args=args))
+        async_response = client.get(reverse(f"async_{name}", args=args))
+
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.json() == sync_response.json()
+
+
+@pytest.mark.django_db
+def test_async_views_authenticate_with_token(
+    create_user, create_shopping_list
+):
+    user = create_user()
+    create_shopping_list(user)
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    url = reverse("async_all_shopping_lists")
+
+    response = client.get(url, HTTP_AUTHORIZATION=f"Token {token.key}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["count"] == 1
+
+    response = client.get(url, HTTP_AUTHORIZATION=f"token {token.key}")
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.get(url, HTTP_AUTHORIZATION="Token invalid")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json() == {"detail": "Invalid token."}
+
+    response = client.get(url)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.headers["WWW-Authenticate"] == "Token"
+
+
+@pytest.mark.django_db
+def test_async_views_are_for_members_only(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    shopping_item = create_shopping_item(create_user())
+    shopping_list_id = shopping_item.shopping_list_id
+    another_user = User.objects.create_user("another", "a@b.com", "kekek")
+    client = create_authenticated_client(another_user)
+
+    for name, args in [
+        ("async_shopping_list_detail", [shopping_list_id]),
+        ("async_list_shopping_items", [shopping_list_id]),
+        ("async_shopping_item_detail", [shopping_list_id, shopping_item.id]),
+    ]:
+        response = client.get(reverse(name, args=args))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    response = client.get(
+        reverse("async_shopping_list_detail", args=[uuid.uuid4()])
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,8 +1,15 @@
+import time
+
 import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from shopping_list.api.authentication import TokenCache
 from shopping_list.models import User
 
 
@@ -28,3 +35,99 @@ def test_call_with_token_authentication():
     response = client.get(url)
 
     assert response.status_code == status.HTTP_200_OK
+
+
+def token_queries(queries):
+    return [
+        query["sql"]
+        for query in queries.captured_queries
+        if "authtoken_token" in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_users_of_tokens_are_cached():
+    user = User.objects.create_user("kek", password="kekek")
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    url = reverse("all_shopping_lists")
+
+    with CaptureQueriesContext(connection) as uncached_queries:
+        assert client.get(url).status_code == status.HTTP_200_OK
+    with CaptureQueriesContext(connection) as cached_queries:
+        response = client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(token_queries(uncached_queries)) == 1
+    assert token_queries(cached_queries) == []
+
+
+@pytest.mark.django_db
+def test_deleted_tokens_are_evicted():
+    user = User.objects.create_user("kek", password="kekek")
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    url = reverse("all_shopping_lists")
+    assert client.get(url).status_code == status.HTTP_200_OK
+
+    token.delete()
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_tokens_of_deactivated_users_are_evicted():
+    user = User.objects.create_user("kek", password="kekek")
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    url = reverse("all_shopping_lists")
+    assert client.get(url).status_code == status.HTTP_200_OK
+
+    user.is_active = False
+    user.save()
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_token_cache_is_bounded_and_expires(monkeypatch):
+    token_cache = TokenCache(max_size=2, timeout=60, cache=caches["default"])
+    users = [User(pk=pk, username=f"user{pk}") for pk in range(3)]
+    for user in users:
+        key = f"key{user.pk}"
+        token_cache.set(key, user, token_cache.stamp(key))
+
+    assert token_cache.get("key0") is None
+    assert token_cache.get("key1") == users[1]
+    assert token_cache.get("key1") is not users[1]
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert token_cache.get("key2") is None
+
+
+def test_tokens_are_revoked_in_every_process_sharing_the_cache():
+    processes = [
+        TokenCache(timeout=60, cache=caches["default"]) for _ in range(2)
+    ]
+    user = User(pk=1, username="kek")
+    for token_cache in processes:
+        token_cache.set("key", user, token_cache.stamp("key"))
+    assert processes[1].get("key") == user
+
+    processes[0].revoke(["key"])
+
+    assert [token_cache.get("key") for token_cache in processes] == [
+        None,
+        None,
+    ]
+
+
+def test_tokens_are_kept_briefly_in_process_local_caches(settings):
+    settings.SHOPPING_LIST_TOKEN_LOCAL_CACHE_TIMEOUT = 5
+
+    assert TokenCache(timeout=60, cache=caches["default"]).timeout == 5
@@ -0,0 +1,238 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from shopping_list.models import ShoppingItem, ShoppingItemTombstone, User
+
+
+def changes_url(shopping_list):
+    return reverse("shopping_item_changes", args=[shopping_list.id])
+
+
+@pytest.mark.django_db
+def test_all_items_are_returned_without_revision(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    for name in ["Eggs", "Milk"]:
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=False
+        )
+    client = create_authenticated_client(user)
+
+    response = client.get(changes_url(shopping_list))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["name"] for item in response.data["changed"]] == [
+        "Eggs",
+        "Milk",
+    ]
+    assert response.data["deleted"] == []
+    assert response.data["revision"] == 2
+    assert response.data["has_more"] is False
+
+
+@pytest.mark.django_db
+def test_only_changes_since_revision_are_returned(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    eggs, milk, bread = [
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=False
+        )
+        for name in ["Eggs", "Milk", "Bread"]
+    ]
+    client = create_authenticated_client(user)
+    revision = client.get(changes_url(shopping_list)).data["revision"]
+
+    client.patch(
+        reverse("shopping_item_detail", args=[shopping_list.id, milk.id]),
+        {"purchased": True},
+        format="json",
+    )
+    client.delete(
+        reverse("shopping_item_detail", args=[shopping_list.id, bread.id])
+    )
+    ShoppingItem.objects.filter(id=eggs.id).delete()
+    response = client.get(changes_url(shopping_list), {"since": revision})
+
+    assert [item["id"] for item in response.data["changed"]] == [str(milk.id)]
+    assert response.data["changed"][0]["purchased"] is True
+    assert response.data["deleted"] == [str(bread.id), str(eggs.id)]
+    assert response.data["revision"] == revision + 3
+
+    response = client.get(
+        changes_url(shopping_list), {"since": response.data["revision"]}
+    )
+
+    assert response.data["changed"] == []
+    assert response.data["deleted"] == []
+
+
+@pytest.mark.django_db
+def test_bulk_changes_are_returned_in_pages(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    client = create_authenticated_client(user)
+    client.post(
+        reverse("bulk_shopping_items", args=[shopping_list.id]),
+        {
+            "create": [
+                {"name": name, "purchased": False}
+                for name in ["Eggs", "Milk", "Bread"]
+            ]
+        },
+        format="json",
+    )
+
+    response = client.get(changes_url(shopping_list), {"since": 0, "limit": 2})
+
+    assert [item["name"] for item in response.data["changed"]] == [
+        "Eggs",
+        "Milk",
+    ]
+    assert response.data["has_more"] is True
+
+    response = client.get(
+        changes_url(shopping_list),
+        {"since": response.data["revision"], "limit": 2},
+    )
+
+    assert [item["name"] for item in response.data["changed"]] == ["Bread"]
+    assert response.data["has_more"] is False
+
+
+@pytest.mark.django_db
+def test_changes_cost_does_not_depend_on_list_size(
+    create_user,
+    create_authenticated_client,
+    create_shopping_list,
+    django_assert_num_queries,
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    ShoppingItem.objects.bulk_create(
+        ShoppingItem(
+            shopping_list=shopping_list, name=f"Item {i}", purchased=False
+        )
+        for i in range(100)
+    )
+    client = create_authenticated_client(user)
+    revision = client.get(changes_url(shopping_list)).data["revision"]
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+
+    # Session, user, revision of the list, changes and tombstones
+    with django_assert_num_queries(5):
+        response = client.get(changes_url(shopping_list), {"since": revision})
+
+    assert [item["name"] for item in response.data["changed"]] == ["Milk"]
+
+
+@pytest.mark.django_db
+def test_changes_are_not_returned_to_non_members(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    another_user = User.objects.create_user("another", "a@b.com", "kekek")
+    client = create_authenticated_client(another_user)
+
+    response = client.get(changes_url(shopping_list), {"since": 0})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_invalid_revision_returns_bad_request(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    client = create_authenticated_client(user)
+
+    response = client.get(changes_url(shopping_list), {"since": -1})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "since" in response.data
+
+
+@pytest.mark.django_db
+def test_snapshot_is_returned_in_pages(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    for name in ["Eggs", "Milk", "Bread"]:
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=False
+        )
+    client = create_authenticated_client(user)
+
+    response = client.get(changes_url(shopping_list), {"limit": 2})
+
+    assert [item["name"] for item in response.data["changed"]] == [
+        "Eggs",
+        "Milk",
+    ]
+    assert response.data["has_more"] is True
+
+    response = client.get(
+        changes_url(shopping_list),
+        {"since": response.data["revision"], "limit": 2},
+    )
+
+    assert [item["name"] for item in response.data["changed"]] == ["Bread"]
+    assert response.data["has_more"] is False
+
+
+@pytest.mark.django_db
+def test_clients_resync_after_deletions_are_pruned(
+    settings, create_user, create_authenticated_client, create_shopping_list
+):
+    settings.SHOPPING_LIST_TOMBSTONE_RETENTION = 60
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    eggs, milk, bread = [
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=False
+        )
+        for name in ["Eggs", "Milk", "Bread"]
+    ]
+    client = create_authenticated_client(user)
+    eggs_id, milk_id = eggs.id, milk.id
+    eggs.delete()
+    synced = client.get(changes_url(shopping_list)).data["revision"]
+    milk.delete()
+    ShoppingItemTombstone.objects.filter(item_id=eggs_id).update(
+        deleted_at=timezone.now() - timedelta(minutes=2)
+    )
+
+    out = StringIO()
+    call_command("prune_tombstones", stdout=out)
+
+    assert "Pruned 1 tombstones of 1 shopping lists" in out.getvalue()
+    assert list(
+        ShoppingItemTombstone.objects.values_list("item_id", flat=True)
+    ) == [milk_id]
+
+    response = client.get(changes_url(shopping_list), {"since": synced})
+
+    assert response.data["resync"] is False
+    assert response.data["deleted"] == [str(milk_id)]
+
+    response = client.get(changes_url(shopping_list), {"since": 1})
+
+    assert response.data["resync"] is True
+    assert [item["id"] for item in response.data["changed"]] == [str(bread.id)]
+    assert response.data["deleted"] == []
@@ -0,0 +1,180 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from shopping_list.models import ShoppingItem, ShoppingList, User
+
+
+@pytest.mark.django_db
+def test_unchanged_shopping_lists_are_not_modified(
+    create_user,
+    create_authenticated_client,
+    create_shopping_item,
+    django_assert_num_queries,
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    create_shopping_item(user)
+    url = reverse("all_shopping_lists")
+
+    response = client.get(url)
+    etag = response.headers["ETag"]
+
+    # Session, user and version of the shopping lists
+    with django_assert_num_queries(3):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_shopping_lists_are_modified_by_new_items(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_item = create_shopping_item(user)
+    url = reverse("all_shopping_lists")
+    etag = client.get(url).headers["ETag"]
+
+    ShoppingItem.objects.create(
+        name="Milk", purchased=False, shopping_list=shopping_item.shopping_list
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_shopping_lists_are_modified_by_leaving_one(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    create_shopping_list(user, "Groceries")
+    books = create_shopping_list(user, "Books")
+    url = reverse("all_shopping_lists")
+    etag = client.get(url).headers["ETag"]
+
+    # Leaving a shopping list touches only that one
+    books.members.remove(user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == 1
+
+
+@pytest.mark.django_db
+def test_pages_of_shopping_lists_have_their_own_etag(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    for name in ["Groceries", "Books", "Tools", "Clothes"]:
+        create_shopping_list(user, name)
+    url = reverse("all_shopping_lists")
+    etag = client.get(url).headers["ETag"]
+
+    response = client.get(url, {"page": 2}, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_shopping_lists_left_are_not_hidden_by_if_modified_since(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    create_shopping_list(user, "Groceries")
+    books = create_shopping_list(user, "Books")
+    url = reverse("all_shopping_lists")
+    response = client.get(url)
+    last_modified = response.headers["Last-Modified"]
+
+    # Leaving the shopping list modified last keeps the time of the rest
+    books.members.remove(user)
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [
+        shopping_list["name"] for shopping_list in response.data["results"]
+    ] == ["Groceries"]
+
+
+@pytest.mark.django_db
+def test_not_modified_is_not_returned_to_non_members(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    url = reverse("shopping_list_detail", args=[shopping_list.id])
+    etag = create_authenticated_client(user).get(url).headers["ETag"]
+
+    another_user = User.objects.create_user("another", "a@b.com", "kekek")
+    client = create_authenticated_client(another_user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_shopping_items_are_modified_by_deleted_item(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_item = create_shopping_item(user)
+    url = reverse(
+        "list_add_shopping_item", args=[shopping_item.shopping_list.id]
+    )
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+        status.HTTP_304_NOT_MODIFIED
+    )
+
+    client.delete(
+        reverse(
+            "shopping_item_detail",
+            args=[shopping_item.shopping_list.id, shopping_item.id],
+        )
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name",
+    ["all_shopping_lists", "shopping_list_detail", "list_add_shopping_item"],
+)
+def test_changed_items_modify_resources_without_last_interaction(
+    url_name, create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_item = create_shopping_item(user)
+    shopping_list = shopping_item.shopping_list
+    args = [shopping_list.id] if url_name != "all_shopping_lists" else []
+    url = reverse(url_name, args=args)
+    etag = client.get(url).headers["ETag"]
+    last_interaction = ShoppingList.objects.get().last_interaction
+
+    client.patch(
+        reverse(
+            "shopping_item_detail", args=[shopping_list.id, shopping_item.id]
+        ),
+        {"purchased": True},
+        format="json",
+    )
+    # As if the write-behind update of last_interaction was lost
+    ShoppingList.objects.update(last_interaction=last_interaction)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+from django.db import connection
+
+from shopping_list.models import ShoppingItem, ShoppingList
+
+WRITERS = 8
+READERS = 4
+ITEMS = 25
+
+
+@pytest.mark.django_db
+def test_sqlite_connections_are_tuned():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone() == ("wal",)
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone() == (20000,)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_writers_of_a_shopping_list_wait_for_each_other(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    errors = []
+    writing = threading.Event()
+
+    def add_shopping_items(writer):
+        try:
+            for i in range(ITEMS):
+                shopping_item = ShoppingItem.objects.create(
+                    shopping_list=shopping_list,
+                    name=f"Item {writer} {i}",
+                    purchased=False,
+                )
+                shopping_item.purchased = True
+                shopping_item.save()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def read_shopping_items():
+        try:
+            while writing.is_set():
+                list(ShoppingItem.objects.filter(shopping_list=shopping_list))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    writing.set()
+    readers = [
+        threading.Thread(target=read_shopping_items) for _ in range(READERS)
+    ]
+    writers = [
+        threading.Thread(target=add_shopping_items, args=[writer])
+        for writer in range(WRITERS)
+    ]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    writing.clear()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    shopping_list = ShoppingList.objects.get()
+    assert shopping_list.item_count == WRITERS * ITEMS
+    assert shopping_list.unpurchased_count == 0
+    assert shopping_list.revision == 2 * WRITERS * ITEMS
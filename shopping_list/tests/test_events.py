@@ -0,0 +1,239 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+
+from shopping_list.events import InMemoryBroker, get_broker, publish_on_commit
+from shopping_list.models import ShoppingItem, User
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        get_broker(), "has_subscribers", lambda shopping_list_id: True
+    )
+    monkeypatch.setattr(
+        get_broker(),
+        "publish",
+        lambda shopping_list_id, event: events.append(
+            (shopping_list_id, event)
+        ),
+    )
+    return events
+
+
+def test_broker_delivers_events_published_from_other_threads():
+    broker = InMemoryBroker()
+
+    async def subscribe():
+        subscription = broker.subscribe("groceries")
+        other_subscription = broker.subscribe("books")
+        thread = threading.Thread(
+            target=broker.publish, args=("groceries", {"type": "test"})
+        )
+        thread.start()
+        event = await subscription.get(timeout=1)
+        thread.join()
+        with pytest.raises(asyncio.TimeoutError):
+            await other_subscription.get(timeout=0.01)
+        broker.unsubscribe(subscription)
+        broker.unsubscribe(other_subscription)
+        return event
+
+    assert asyncio.run(subscribe()) == {"type": "test"}
+    assert not broker._subscriptions
+
+
+def test_subscribers_falling_behind_are_asked_to_resync():
+    broker = InMemoryBroker()
+
+    async def subscribe():
+        subscription = broker.subscribe("groceries")
+        for revision in range(101):
+            broker.publish("groceries", {"revision": revision})
+        # Delivered on the next iteration of the event loop
+        await asyncio.sleep(0)
+        return await subscription.get(timeout=1)
+
+    assert asyncio.run(subscribe()) is None
+
+
+@pytest.mark.django_db
+def test_changes_of_shopping_items_are_published_on_commit(
+    create_user,
+    create_shopping_list,
+    published,
+    django_capture_on_commit_callbacks,
+):
+    shopping_list = create_shopping_list(create_user())
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        shopping_item = ShoppingItem.objects.create(
+            shopping_list=shopping_list, name="Eggs", purchased=False
+        )
+        shopping_item.purchased = True
+        shopping_item.save()
+        shopping_item_id = str(shopping_item.id)
+        shopping_item.delete()
+    assert not published
+
+    for callback in callbacks:
+        callback()
+    assert [
+        (event["type"], event["revision"], event["item"]["id"])
+        for shopping_list_id, event in published
+    ] == [
+        ("item_created", 1, shopping_item_id),
+        ("item_updated", 2, shopping_item_id),
+        ("item_deleted", 3, shopping_item_id),
+    ]
+    assert published[1] == (
+        shopping_list.id,
+        {
+            "type": "item_updated",
+            "revision": 2,
+            "item": {
+                "id": shopping_item_id,
+                "name": "Eggs",
+                "purchased": True,
+                "shopping_list": shopping_list.id,
+            },
+        },
+    )
+
+
+@pytest.mark.django_db
+def test_events_are_only_built_for_subscribers(
+    monkeypatch, django_capture_on_commit_callbacks
+):
+    built = []
+
+    def item():
+        built.append("Eggs")
+        return {"name": "Eggs"}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        publish_on_commit("groceries", "item_created", item=item)
+    assert not built
+
+    published = []
+    monkeypatch.setattr(
+        get_broker(), "has_subscribers", lambda shopping_list_id: True
+    )
+    monkeypatch.setattr(
+        get_broker(),
+        "publish",
+        lambda shopping_list_id, event: published.append(event),
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        publish_on_commit("groceries", "item_created", item=item)
+    assert built == ["Eggs"]
+    assert published == [{"type": "item_created", "item": {"name": "Eggs"}}]
+
+
+@pytest.mark.django_db
+def test_changes_of_members_are_published(
+    create_user,
+    create_shopping_list,
+    published,
+    django_capture_on_commit_callbacks,
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    another_user = User.objects.create_user("another", "a@b.com", "kekek")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        shopping_list.members.add(another_user)
+        another_user.shopping_lists.remove(shopping_list)
+
+    assert published == [
+        (
+            shopping_list.id,
+            {
+                "type": "members_changed",
+                "added": [another_user.pk],
+                "removed": [],
+            },
+        ),
+        (
+            shopping_list.id,
+            {
+                "type": "members_changed",
+                "added": [],
+                "removed": [another_user.pk],
+            },
+        ),
+    ]
+
+
+@pytest.mark.django_db
+def test_members_are_streamed_changes_until_removed(
+    create_user, create_shopping_item
+):
+    user = create_user()
+    shopping_item = create_shopping_item(user)
+    shopping_list_id = shopping_item.shopping_list_id
+    client = AsyncClient()
+    client.force_login(user)
+    broker = get_broker()
+
+    async def receive():
+        response = await client.get(
+            reverse("async_shopping_list_events", args=[shopping_list_id])
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["Content-Type"] == "text/event-stream"
+        events = response.streaming_content
+        assert await anext(events) == b": subscribed\n\n"
+
+        broker.publish(
+            shopping_list_id,
+            {
+                "type": "item_deleted",
+                "revision": 3,
+                "item": {"id": shopping_item.id},
+            },
+        )
+        broker.publish(
+            shopping_list_id,
+            {"type": "members_changed", "added": [], "removed": [user.pk]},
+        )
+        return [event async for event in events]
+
+    deleted, removed = async_to_sync(receive)()
+
+    assert deleted.endswith(b"\n\n")
+    id_line, event_line, data_line = deleted.decode().split("\n")[:3]
+    assert id_line == "id: 3"
+    assert event_line == "event: item_deleted"
+    assert json.loads(data_line.removeprefix("data: ")) == {
+        "revision": 3,
+        "item": {"id": str(shopping_item.id)},
+    }
+    assert removed.startswith(b"event: members_changed\n")
+    assert shopping_list_id not in broker._subscriptions
+
+
+@pytest.mark.django_db
+def test_only_members_can_subscribe_to_events(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    another_user = User.objects.create_user("another", "a@b.com", "kekek")
+    client = AsyncClient()
+    client.force_login(another_user)
+
+    async def subscribe():
+        return await client.get(
+            reverse("async_shopping_list_events", args=[shopping_list.id])
+        )
+
+    response = async_to_sync(subscribe)()
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -230,3 +230,88 @@ def test_order_shopping_items_by_purchased_and_names(
     assert response.data["results"][1]["name"] == "Dates"
     assert response.data["results"][2]["name"] == "Apples"
     assert response.data["results"][3]["name"] == "Coconut"
+
+
+@pytest.mark.django_db
+def test_search_matches_prefixes_of_words(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    for name in ["Skim Milk", "Milkshake", "Buttermilk", "Chocolate"]:
+        ShoppingItem.objects.create(
+            name=name, purchased=False, shopping_list=shopping_list
+        )
+
+    url = reverse("search_shopping_items") + "?search=mil&page_size=10"
+    response = client.get(url)
+
+    assert response.data["count"] == 2
+    assert {item["name"] for item in response.data["results"]} == {
+        "Skim Milk",
+        "Milkshake",
+    }
+
+
+@pytest.mark.django_db
+def test_search_results_are_ranked_and_limited(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    ShoppingItem.objects.create(
+        name="Milk chocolate with hazelnuts and almonds",
+        purchased=False,
+        shopping_list=shopping_list,
+    )
+    ShoppingItem.objects.create(
+        name="Milk", purchased=False, shopping_list=shopping_list
+    )
+    ShoppingItem.objects.create(
+        name="Milk milk milk", purchased=True, shopping_list=shopping_list
+    )
+
+    url = reverse("search_shopping_items") + "?search=milk&limit=2"
+    response = client.get(url)
+
+    assert response.data["count"] == 2
+    assert response.data["results"][0]["name"] == "Milk milk milk"
+    assert response.data["results"][1]["name"] == "Milk"
+
+
+@pytest.mark.django_db
+def test_search_index_follows_changes_of_shopping_items(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    url = reverse("search_shopping_items") + "?search=milk"
+
+    milk, eggs = ShoppingItem.objects.bulk_create(
+        [
+            ShoppingItem(
+                name="Milk", purchased=False, shopping_list=shopping_list
+            ),
+            ShoppingItem(
+                name="Eggs", purchased=False, shopping_list=shopping_list
+            ),
+        ]
+    )
+    assert response_names(client.get(url)) == ["Milk"]
+
+    eggs.name = "Milk powder"
+    eggs.save()
+    assert response_names(client.get(url)) == ["Milk", "Milk powder"]
+
+    milk.delete()
+    assert response_names(client.get(url)) == ["Milk powder"]
+
+    shopping_list.delete()
+    assert response_names(client.get(url)) == []
+
+
+def response_names(response):
+    return [item["name"] for item in response.data["results"]]
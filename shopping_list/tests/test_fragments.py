@@ -0,0 +1,161 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shopping_list.fragments import FragmentCache, fragment_cache
+from shopping_list.models import ShoppingItem, ShoppingList, User
+
+
+def unpurchased_names(response):
+    return [
+        item["name"]
+        for item in response.data["results"][0]["unpurchased_items"]
+    ]
+
+
+@pytest.mark.django_db
+def test_shopping_lists_are_served_from_fragments(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    create_shopping_item(user, "Eggs")
+    url = reverse("all_shopping_lists")
+
+    with CaptureQueriesContext(connection) as uncached_queries:
+        uncached = client.get(url)
+    hits = fragment_cache.stats()["hits"]
+    with CaptureQueriesContext(connection) as cached_queries:
+        cached = client.get(url)
+
+    assert cached.data == uncached.data
+    # Members aren't loaded
+    assert len(cached_queries) == len(uncached_queries) - 1
+    assert fragment_cache.stats()["hits"] == hits + 1
+
+
+@pytest.mark.django_db
+def test_fragments_follow_changes_of_shopping_items(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_item = create_shopping_item(user, "Eggs")
+    url = reverse("all_shopping_lists")
+    client.get(url)
+
+    ShoppingItem.objects.create(
+        shopping_list=shopping_item.shopping_list,
+        name="Bread",
+        purchased=False,
+    )
+
+    assert unpurchased_names(client.get(url)) == ["Bread", "Eggs"]
+
+
+@pytest.mark.django_db
+def test_fragments_follow_changes_of_members(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    url = reverse("all_shopping_lists")
+    client.get(url)
+
+    another_user = User.objects.create_user("another", "a@b.com", "kekek")
+    another_user.shopping_lists.add(shopping_list)
+    response = client.get(url)
+
+    assert len(response.data["results"][0]["members"]) == 2
+
+    another_user.username = "renamed"
+    another_user.save()
+    response = client.get(url)
+
+    assert "renamed" in [
+        member["username"] for member in response.data["results"][0]["members"]
+    ]
+
+
+@pytest.mark.django_db
+def test_saving_members_does_not_reorder_shopping_lists(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    books = create_shopping_list(user, "Books")
+    groceries = create_shopping_list(user, "Groceries")
+    another_user = User.objects.create_user("another", "a@b.com", "kekek")
+    another_user.shopping_lists.add(books)
+    ShoppingList.objects.filter(pk=books.pk).update(
+        last_interaction=groceries.last_interaction - timedelta(days=1)
+    )
+    url = reverse("all_shopping_lists")
+    etag = client.get(url).headers["ETag"]
+
+    another_user.set_password("changed")
+    another_user.save()
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    another_user.username = "renamed"
+    another_user.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert [result["name"] for result in response.data["results"]] == [
+        "Groceries",
+        "Books",
+    ]
+    assert "renamed" in [
+        member["username"] for member in response.data["results"][1]["members"]
+    ]
+
+
+@pytest.mark.django_db
+def test_deleted_members_are_removed_from_cached_shopping_lists(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    groceries = create_shopping_list(user)
+    another_user = User.objects.create_user("another", "a@b.com", "kekek")
+    another_user.shopping_lists.add(groceries)
+    url = reverse("all_shopping_lists")
+    etag = client.get(url).headers["ETag"]
+
+    another_user.delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert [
+        member["username"] for member in response.data["results"][0]["members"]
+    ] == [user.username]
+
+
+@pytest.mark.django_db
+def test_least_recently_used_fragments_are_evicted():
+    cache = FragmentCache(max_size=2)
+    groceries, books, tools = [
+        ShoppingList.objects.create(name=name)
+        for name in ["Groceries", "Books", "Tools"]
+    ]
+
+    cache.set(groceries, {"name": "Groceries"})
+    cache.set(books, {"name": "Books"})
+    cache.get_many([groceries])
+    cache.set(tools, {"name": "Tools"})
+
+    assert cache.get_many([groceries, books, tools]) == {
+        groceries.pk: {"name": "Groceries"},
+        tools.pk: {"name": "Tools"},
+    }
+    assert cache.stats() == {
+        "hits": 3,
+        "misses": 1,
+        "hit_rate": 0.75,
+        "size": 2,
+    }
@@ -0,0 +1,241 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from shopping_list.api.pagination import KeysetPagination
+from shopping_list.api.serializers import (ShoppingListSerializer,
+                                           unique_unpurchased_items)
+from shopping_list.models import ShoppingItem, ShoppingList, User
+from shopping_list.search import SQLiteSearchBackend
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="Query plans of SQLite are checked"
+)
+
+
+@pytest.mark.django_db
+def test_shopping_items_of_list_are_ordered_with_index(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+
+    queryset = ShoppingItem.objects.filter(
+        shopping_list=shopping_list
+    ).order_by("purchased", "id")
+
+    plan = queryset.explain()
+
+    assert "USING INDEX item_list_purchased_id_idx" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.django_db
+def test_keyset_pages_of_shopping_items_start_with_index(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    item = ShoppingItem.objects.create(
+        name="Milk", purchased=False, shopping_list=shopping_list
+    )
+    queryset = ShoppingItem.objects.filter(
+        shopping_list=shopping_list
+    ).order_by("purchased")
+    paginator = KeysetPagination()
+    paginator.ordering = paginator.get_ordering(queryset)
+
+    plan = (
+        queryset.filter(paginator.after(queryset, [item.purchased, item.id]))
+        .order_by("purchased", "id")
+        .explain()
+    )
+
+    assert "USING INDEX item_list_purchased_id_idx" in plan
+    assert "(purchased,id)>(?,?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.django_db
+def test_duplicate_item_check_uses_partial_unique_index(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+
+    queryset = ShoppingItem.objects.filter(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+
+    plan = queryset.explain()
+
+    assert "USING INDEX unique_unpurchased_item_name" in plan
+    assert "(shopping_list_id=? AND name=?)" in plan
+
+
+@pytest.mark.django_db
+def test_unpurchased_items_preview_uses_partial_unique_index(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+
+    queryset = ShoppingItem.objects.filter(
+        shopping_list__in=[shopping_list.id], purchased=False
+    ).order_by("name")
+
+    plan = queryset.explain()
+
+    assert "USING INDEX unique_unpurchased_item_name" in plan
+
+
+@pytest.mark.django_db
+def test_users_shopping_lists_are_found_through_members_index():
+    user = User.objects.create(username="kek")
+
+    queryset = ShoppingListSerializer.setup_eager_loading(
+        ShoppingList.objects.filter(members=user)
+    ).order_by("-last_interaction")
+
+    plan = queryset.explain()
+
+    assert "shopping_list_shoppinglist_members USING" in plan
+    assert "(user_id=?)" in plan
+    assert "SCAN shopping_list_shoppinglist" not in plan
+
+
+@pytest.mark.django_db
+def test_search_index_matches_only_items_of_searched_lists(
+    create_user, create_shopping_list
+):
+    groceries = create_shopping_list(create_user())
+    ShoppingItem.objects.create(
+        shopping_list=groceries, name="Milk", purchased=False
+    )
+    other_user = User.objects.create_user("other", "o@b.com", "kekek")
+    ShoppingItem.objects.bulk_create(
+        ShoppingItem(
+            shopping_list=create_shopping_list(other_user, "Dairy"),
+            name=f"Milk {i}",
+            purchased=False,
+        )
+        for i in range(20)
+    )
+    backend = SQLiteSearchBackend()
+    match = backend.match(["milk"], [groceries.id])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM shopping_list_shoppingitem_fts "
+            "WHERE shopping_list_shoppingitem_fts MATCH %s",
+            [match],
+        )
+        (matches,) = cursor.fetchone()
+        cursor.execute("EXPLAIN QUERY PLAN " + backend.query, [match, 10])
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+
+    assert matches == 1
+    assert "VIRTUAL TABLE INDEX" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.django_db
+def test_unpurchased_item_names_are_unique_per_list(
+    create_user, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=True
+    )
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+    ShoppingItem.objects.create(
+        shopping_list=create_shopping_list(user, "Books"),
+        name="Milk",
+        purchased=False,
+    )
+
+    with pytest.raises(IntegrityError):
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name="Milk", purchased=False
+        )
+
+
+@pytest.mark.django_db
+def test_unpurchasing_duplicate_item_raises_bad_request(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+    purchased_milk = ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=True
+    )
+    url = reverse(
+        "shopping_item_detail",
+        kwargs={"pk": shopping_list.id, "item_pk": purchased_milk.id},
+    )
+
+    response = client.patch(url, {"purchased": False}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == ["There's already this item on the list"]
+    assert ShoppingItem.objects.get(id=purchased_milk.id).purchased is True
+
+
+@pytest.mark.django_db
+def test_only_duplicate_items_are_reported_as_duplicates(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+
+    with pytest.raises(ValidationError):
+        with unique_unpurchased_items():
+            ShoppingItem.objects.create(
+                shopping_list=shopping_list, name="Milk", purchased=False
+            )
+    with pytest.raises(IntegrityError, match="NOT NULL"):
+        with unique_unpurchased_items():
+            ShoppingItem.objects.create(
+                shopping_list=shopping_list, name=None, purchased=False
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_duplicate_items_are_purchased_before_constraint_is_added():
+    executor = MigrationExecutor(connection)
+    executor.migrate([("shopping_list", "0001_initial")])
+    apps = executor.loader.project_state(
+        [("shopping_list", "0001_initial")]
+    ).apps
+    OldShoppingList = apps.get_model("shopping_list", "ShoppingList")
+    OldShoppingItem = apps.get_model("shopping_list", "ShoppingItem")
+    shopping_list = OldShoppingList.objects.create(name="Groceries")
+    for name, purchased in [
+        ("Milk", False),
+        ("Milk", False),
+        ("Milk", False),
+        ("Milk", True),
+        ("Eggs", False),
+    ]:
+        OldShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=purchased
+        )
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+    shopping_items = ShoppingItem.objects.filter(
+        shopping_list_id=shopping_list.pk
+    )
+    assert shopping_items.count() == 5
+    assert sorted(
+        shopping_items.filter(purchased=False).values_list("name", flat=True)
+    ) == ["Eggs", "Milk"]
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from shopping_list.models import ShoppingItem, ShoppingList
+
+
+@pytest.mark.django_db
+def test_last_interaction_updates_are_coalesced_until_commit(
+    settings,
+    create_user,
+    create_shopping_list,
+    django_capture_on_commit_callbacks,
+):
+    settings.SHOPPING_LIST_INTERACTION_WRITE_BEHIND = True
+    user = create_user()
+    groceries = create_shopping_list(user, "Groceries")
+    books = create_shopping_list(user, "Books")
+    long_ago = timezone.now() - timedelta(days=10)
+    ShoppingList.objects.update(last_interaction=long_ago)
+
+    with CaptureQueriesContext(connection) as queries:
+        with django_capture_on_commit_callbacks(execute=True):
+            for name in ["Eggs", "Milk", "Chocolate"]:
+                ShoppingItem.objects.create(
+                    shopping_list=groceries, name=name, purchased=False
+                )
+            ShoppingItem.objects.create(
+                shopping_list=books, name="War and Peace", purchased=False
+            )
+
+            groceries.refresh_from_db()
+            assert groceries.last_interaction == long_ago
+
+    last_interaction_updates = [
+        query
+        for query in queries.captured_queries
+        if query["sql"].startswith('UPDATE "shopping_list_shoppinglist"')
+        and '"last_interaction"' in query["sql"]
+    ]
+    assert len(last_interaction_updates) == 1
+    for shopping_list in ShoppingList.objects.all():
+        assert shopping_list.last_interaction > long_ago
+
+
+@pytest.mark.django_db
+def test_last_interaction_is_updated_right_away_when_synchronous(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    long_ago = timezone.now() - timedelta(days=10)
+    ShoppingList.objects.update(last_interaction=long_ago)
+
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Eggs", purchased=False
+    )
+
+    shopping_list.refresh_from_db()
+    assert shopping_list.last_interaction > long_ago
+
+
+@pytest.mark.django_db
+def test_rolled_back_interactions_are_not_flushed_by_the_next_commit(
+    settings,
+    create_user,
+    create_shopping_list,
+    django_capture_on_commit_callbacks,
+):
+    settings.SHOPPING_LIST_INTERACTION_WRITE_BEHIND = True
+    user = create_user()
+    with django_capture_on_commit_callbacks(execute=True):
+        groceries = create_shopping_list(user, "Groceries")
+        books = create_shopping_list(user, "Books")
+    long_ago = timezone.now() - timedelta(days=10)
+    ShoppingList.objects.update(last_interaction=long_ago)
+
+    with pytest.raises(IntegrityError):
+        with transaction.atomic():
+            ShoppingItem.objects.create(
+                shopping_list=groceries, name="Eggs", purchased=False
+            )
+            ShoppingItem.objects.create(
+                shopping_list=groceries, name="Eggs", purchased=False
+            )
+    with django_capture_on_commit_callbacks(execute=True):
+        ShoppingItem.objects.create(
+            shopping_list=books, name="War and Peace", purchased=False
+        )
+
+    groceries.refresh_from_db()
+    books.refresh_from_db()
+    assert groceries.last_interaction == long_ago
+    assert books.last_interaction > long_ago
@@ -0,0 +1,124 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from shopping_list.models import ShoppingItem, ShoppingList
+
+
+def counts(shopping_list):
+    shopping_list.refresh_from_db()
+    return shopping_list.item_count, shopping_list.unpurchased_count
+
+
+@pytest.mark.django_db
+def test_counts_follow_changes_of_shopping_items(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+
+    response = client.post(
+        reverse("list_add_shopping_item", args=[shopping_list.id]),
+        {"name": "Milk", "purchased": False},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    milk_url = reverse(
+        "shopping_item_detail", args=[shopping_list.id, response.data["id"]]
+    )
+    assert counts(shopping_list) == (1, 1)
+
+    client.patch(milk_url, {"purchased": True}, format="json")
+    assert counts(shopping_list) == (1, 0)
+
+    client.patch(milk_url, {"name": "Oat milk"}, format="json")
+    assert counts(shopping_list) == (1, 0)
+
+    response = client.post(
+        reverse("bulk_shopping_items", args=[shopping_list.id]),
+        {
+            "create": [
+                {"name": "Eggs", "purchased": False},
+                {"name": "Bread", "purchased": True},
+            ],
+            "update": [{"id": response.data["id"], "purchased": False}],
+        },
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert counts(shopping_list) == (3, 2)
+
+    client.delete(milk_url)
+    assert counts(shopping_list) == (2, 1)
+
+    ShoppingItem.objects.filter(shopping_list=shopping_list).delete()
+    assert counts(shopping_list) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_counts_are_served_with_shopping_lists(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_item = create_shopping_item(user)
+    ShoppingItem.objects.create(
+        shopping_list=shopping_item.shopping_list, name="Eggs", purchased=True
+    )
+
+    response = client.get(reverse("all_shopping_lists"))
+
+    assert response.data["results"][0]["item_count"] == 2
+    assert response.data["results"][0]["unpurchased_count"] == 1
+
+
+@pytest.mark.django_db
+def test_saving_a_shopping_list_keeps_its_counts(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    outdated = ShoppingList.objects.get(pk=shopping_list.pk)
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Eggs", purchased=False
+    )
+
+    outdated.name = "Weekly groceries"
+    outdated.save()
+
+    shopping_list.refresh_from_db()
+    assert shopping_list.name == "Weekly groceries"
+    assert counts(shopping_list) == (1, 1)
+    assert shopping_list.revision == 1
+
+
+@pytest.mark.django_db
+def test_repair_item_counts(create_user, create_shopping_list):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    accurate_list = create_shopping_list(user, "Books")
+    ShoppingItem.objects.create(
+        shopping_list=accurate_list, name="Dune", purchased=False
+    )
+    # Bulk created shopping items aren't counted
+    ShoppingItem.objects.bulk_create(
+        ShoppingItem(
+            shopping_list=shopping_list, name=name, purchased=purchased
+        )
+        for name, purchased in [("Milk", False), ("Eggs", True)]
+    )
+
+    out = StringIO()
+    call_command("repair_item_counts", "--dry-run", stdout=out)
+    assert f"{shopping_list.pk}: 0 items instead of 2" in out.getvalue()
+    assert str(accurate_list.pk) not in out.getvalue()
+    assert counts(shopping_list) == (0, 0)
+
+    out = StringIO()
+    call_command("repair_item_counts", stdout=out)
+    assert "Repaired the counts of 1 shopping lists" in out.getvalue()
+    assert counts(shopping_list) == (2, 1)
+    assert counts(accurate_list) == (1, 1)
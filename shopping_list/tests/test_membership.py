@@ -0,0 +1,129 @@
+import time
+
+import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from shopping_list.membership import MembershipIndex, membership_index
+from shopping_list.models import ShoppingList, User
+
+
+@pytest.mark.django_db
+def test_membership_index_is_served_from_cache(
+    create_user, create_shopping_list, django_assert_num_queries
+):
+    index = MembershipIndex(cache=LocMemCache("membership", {}))
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+
+    with django_assert_num_queries(1):
+        assert index.shopping_list_ids(user.pk) == {shopping_list.id}
+    with django_assert_num_queries(0):
+        assert index.is_member(user.pk, shopping_list.id)
+
+    assert index.stats()["hits"] == 1
+    assert index.stats()["misses"] == 1
+    assert index.stats()["hit_rate"] == 0.5
+
+
+@pytest.mark.django_db
+def test_membership_index_is_invalidated_when_members_change(
+    create_user, create_shopping_list
+):
+    user = create_user()
+    user2 = User.objects.create_user("User2", "user2@kekek.kek", "kekek")
+    shopping_list = create_shopping_list(user)
+
+    assert not membership_index.is_member(user2.pk, shopping_list.id)
+
+    shopping_list.members.add(user2)
+    assert membership_index.is_member(user2.pk, shopping_list.id)
+
+    shopping_list.members.remove(user2)
+    assert not membership_index.is_member(user2.pk, shopping_list.id)
+
+    user2.shopping_lists.add(shopping_list)
+    assert membership_index.is_member(user2.pk, shopping_list.id)
+
+    shopping_list.members.clear()
+    assert not membership_index.is_member(user.pk, shopping_list.id)
+    assert not membership_index.is_member(user2.pk, shopping_list.id)
+
+
+@pytest.mark.django_db
+def test_membership_index_is_shared_between_processes(
+    tmp_path, create_user, create_shopping_list
+):
+    location = str(tmp_path)
+    caches_settings = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": location,
+        }
+    }
+    # Every process has its own cache client talking to the shared store
+    index_process1 = MembershipIndex(cache=FileBasedCache(location, {}))
+    index_process2 = MembershipIndex(cache=FileBasedCache(location, {}))
+
+    with override_settings(CACHES=caches_settings):
+        user = create_user()
+        shopping_list = create_shopping_list(user)
+        other_shopping_list = ShoppingList.objects.create(name="Books")
+
+        assert index_process1.shopping_list_ids(user.pk) == {shopping_list.id}
+        assert index_process2.shopping_list_ids(user.pk) == {shopping_list.id}
+        assert index_process2.stats()["hits"] == 1
+
+        # Members are changed by a third process
+        other_shopping_list.members.add(user)
+
+        assert index_process1.shopping_list_ids(user.pk) == {
+            shopping_list.id,
+            other_shopping_list.id,
+        }
+        assert index_process1.stats()["misses"] == 2
+        assert index_process2.shopping_list_ids(user.pk) == {
+            shopping_list.id,
+            other_shopping_list.id,
+        }
+        assert index_process2.stats()["hits"] == 2
+
+
+@pytest.mark.django_db
+def test_membership_index_times_out_quickly_in_process_local_cache(
+    tmp_path, settings, create_user
+):
+    settings.SHOPPING_LIST_MEMBERSHIP_LOCAL_CACHE_TIMEOUT = 5
+    user = create_user()
+    local_cache = LocMemCache("membership", {})
+    local_index = MembershipIndex(cache=local_cache)
+    shared_index = MembershipIndex(cache=FileBasedCache(str(tmp_path), {}))
+
+    local_index.shopping_list_ids(user.pk)
+
+    assert local_index.timeout == 5
+    assert shared_index.timeout == 60 * 60
+    key = local_cache.make_and_validate_key(local_index._index_key(user.pk))
+    assert local_cache._expire_info[key] - time.time() <= 5
+
+
+@pytest.mark.django_db
+def test_search_follows_membership_changes(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    list_creator = User.objects.create_user("creator", "c@kekek.kek", "kek")
+    shopping_item = create_shopping_item(list_creator, "Milk")
+    url = reverse("search_shopping_items") + "?search=milk"
+
+    assert len(client.get(url).data["results"]) == 0
+
+    shopping_item.shopping_list.members.add(user)
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == 1
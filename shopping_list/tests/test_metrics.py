@@ -0,0 +1,120 @@
+import uuid
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from shopping_list import metrics
+from shopping_list.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    for histogram in metrics.histograms:
+        histogram.clear()
+
+
+def series(histogram, view, method="GET", status_class="2xx"):
+    labels = (("view", view), ("method", method), ("status", status_class))
+    return histogram._series.get(labels)
+
+
+@pytest.mark.django_db
+def test_queries_and_timings_are_recorded_per_view(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    create_shopping_item(user)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("all_shopping_lists"))
+
+    assert response.status_code == status.HTTP_200_OK
+    counts, total = series(metrics.request_queries, "all_shopping_lists")
+    assert sum(counts) == 1
+    assert total == len(queries)
+    for histogram in [
+        metrics.request_duration,
+        metrics.request_db_duration,
+        metrics.request_render_duration,
+    ]:
+        counts, total = series(histogram, "all_shopping_lists")
+        assert sum(counts) == 1
+        assert total > 0
+
+    client.get(reverse("shopping_list_detail", args=[uuid.uuid4()]))
+    counts, _ = series(
+        metrics.request_duration, "shopping_list_detail", status_class="4xx"
+    )
+    assert sum(counts) == 1
+
+
+@pytest.mark.django_db
+def test_queries_of_async_views_are_recorded(
+    create_user, create_shopping_item
+):
+    user = create_user()
+    create_shopping_item(user)
+    client = AsyncClient()
+    client.force_login(user)
+
+    async def get():
+        return await client.get(reverse("async_all_shopping_lists"))
+
+    response = async_to_sync(get)()
+
+    assert response.status_code == status.HTTP_200_OK
+    counts, total = series(metrics.request_queries, "async_all_shopping_lists")
+    assert sum(counts) == 1
+    assert total > 0
+
+
+@pytest.mark.django_db
+def test_server_timing_header(
+    create_user, create_authenticated_client, settings
+):
+    client = create_authenticated_client(create_user())
+
+    response = client.get(reverse("all_shopping_lists"))
+    assert "Server-Timing" not in response.headers
+
+    settings.SHOPPING_LIST_SERVER_TIMING = True
+    response = client.get(reverse("all_shopping_lists"))
+    db, render, total = response.headers["Server-Timing"].split(", ")
+    assert db.startswith("db;dur=")
+    assert db.endswith(' queries"')
+    assert render.startswith("render;dur=")
+    assert total.startswith("total;dur=")
+
+
+@pytest.mark.django_db
+def test_only_admins_can_read_metrics(
+    create_user, create_authenticated_client
+):
+    client = create_authenticated_client(create_user())
+    client.get(reverse("all_shopping_lists"))
+
+    response = client.get(reverse("metrics"))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    admin = User.objects.create_superuser("admin", "admin@kekek.com", "pass")
+    client = create_authenticated_client(admin)
+    response = client.get(reverse("metrics"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    assert "# TYPE shopping_list_request_duration_seconds histogram\n" in body
+    assert (
+        "shopping_list_request_queries_count"
+        '{view="all_shopping_lists",method="GET",status="2xx"} 1\n'
+    ) in body
+    assert (
+        "shopping_list_request_queries_bucket"
+        '{view="metrics",method="GET",status="4xx",le="+Inf"} 1\n'
+    ) in body
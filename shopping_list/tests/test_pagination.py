@@ -0,0 +1,143 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from shopping_list.models import ShoppingItem, ShoppingList
+
+
+def walk_pages(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        pages.append([item["name"] for item in response.data["results"]])
+        url = response.data["next"]
+    return pages
+
+
+@pytest.mark.django_db
+def test_shopping_items_are_paginated_with_cursor(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    for i in range(12):
+        ShoppingItem.objects.create(
+            name=f"Item {i}", purchased=i % 2 == 0, shopping_list=shopping_list
+        )
+
+    url = (
+        reverse("list_add_shopping_item", args=[shopping_list.id])
+        + "?pagination=cursor"
+    )
+    pages = walk_pages(client, url)
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    expected = ShoppingItem.objects.order_by("purchased", "id")
+    assert sum(pages, []) == [item.name for item in expected]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_is_stable_under_concurrent_writes(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    for i in range(6):
+        ShoppingItem.objects.create(
+            name=f"Item {i}", purchased=False, shopping_list=shopping_list
+        )
+
+    url = (
+        reverse("list_add_shopping_item", args=[shopping_list.id])
+        + "?pagination=cursor&ordering=name&page_size=3"
+    )
+    first_page = client.get(url).data
+    ShoppingItem.objects.create(
+        name="Item 0 again", purchased=False, shopping_list=shopping_list
+    )
+    second_page = client.get(first_page["next"]).data
+
+    assert [item["name"] for item in first_page["results"]] == [
+        "Item 0",
+        "Item 1",
+        "Item 2",
+    ]
+    assert [item["name"] for item in second_page["results"]] == [
+        "Item 3",
+        "Item 4",
+        "Item 5",
+    ]
+
+
+@pytest.mark.django_db
+def test_shopping_lists_are_paginated_with_cursor(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    for name in ["Groceries", "Books", "Tools", "Toys"]:
+        create_shopping_list(user, name)
+
+    url = reverse("all_shopping_lists") + "?pagination=cursor"
+    pages = walk_pages(client, url)
+
+    expected = ShoppingList.objects.order_by("-last_interaction", "id")
+    assert pages == [
+        [shopping_list.name for shopping_list in expected[:3]],
+        [expected[3].name],
+    ]
+
+
+@pytest.mark.django_db
+def test_search_results_are_paginated_with_cursor(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    for name in ["Milk", "Skim milk", "Milk chocolate", "Oat milk"]:
+        ShoppingItem.objects.create(
+            name=name, purchased=False, shopping_list=shopping_list
+        )
+
+    url = reverse("search_shopping_items") + "?search=milk&pagination=cursor"
+    pages = walk_pages(client, url)
+
+    assert [len(page) for page in pages] == [3, 1]
+    assert pages[0][0] == "Milk"
+    assert set(sum(pages, [])) == {
+        "Milk",
+        "Skim milk",
+        "Milk chocolate",
+        "Oat milk",
+    }
+
+
+@pytest.mark.django_db
+def test_page_number_pagination_stays_the_default(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+
+    response = client.get(
+        reverse("list_add_shopping_item", args=[shopping_list.id])
+    )
+
+    assert response.data["count"] == 0
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_not_found(
+    create_user, create_authenticated_client
+):
+    client = create_authenticated_client(create_user())
+
+    response = client.get(reverse("all_shopping_lists") + "?cursor=kekek")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,90 @@
+import datetime
+import decimal
+import io
+import math
+import uuid
+
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from shopping_list.api.parsers import ORJSONParser
+from shopping_list.api.renderers import ORJSONRenderer
+
+pytest.importorskip("orjson")
+
+
+def test_rendered_json_matches_json_renderer():
+    data = {
+        "id": uuid.uuid4(),
+        "created": datetime.datetime(
+            2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+        ),
+        "day": datetime.date(2024, 5, 1),
+        "price": decimal.Decimal("1.50"),
+        "name": gettext_lazy("Milk"),
+        "note": "Käse\u2028und\u2029Brot",
+        "errors": {0: ["Shopping item not found."]},
+        "items": [{"name": "Eggs", "purchased": False, "count": None}],
+    }
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_data_orjson_cannot_render_is_rendered_like_json_renderer():
+    data = {"big": 2**70, "time": datetime.time(12, 30, 15, 123456)}
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    aware = {"time": datetime.time(12, 30, tzinfo=datetime.timezone.utc)}
+    with pytest.raises(ValueError, match="timezone-aware times"):
+        ORJSONRenderer().render(aware)
+
+
+def test_non_finite_floats_are_rendered_as_null():
+    with pytest.raises(ValueError):
+        JSONRenderer().render({"price": math.nan})
+
+    assert ORJSONRenderer().render({"price": math.nan}) == b'{"price":null}'
+
+
+def test_indented_json_is_rendered_like_json_renderer():
+    data = {"id": uuid.uuid4(), "names": ["Eggs", "Milk"]}
+    media_type = "application/json; indent=4"
+
+    assert ORJSONRenderer().render(data, media_type) == (
+        JSONRenderer().render(data, media_type)
+    )
+
+
+def test_parsed_json_matches_json_parser():
+    body = '{"name": "Käse", "purchased": false, "count": 1.5}'.encode()
+
+    assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+        io.BytesIO(body)
+    )
+
+
+def test_invalid_json_is_a_parse_error():
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(b'{"value": NaN}'))
+
+
+@pytest.mark.django_db
+def test_malformed_json_request_returns_bad_request(
+    create_user, create_authenticated_client
+):
+    client = create_authenticated_client(create_user())
+
+    response = client.post(
+        reverse("all_shopping_lists"),
+        '{"name": ',
+        content_type="application/json",
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"].startswith("JSON parse error")
@@ -0,0 +1,152 @@
+import pytest
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connections
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from shopping_list.checks import check_replica_pin_cache
+from shopping_list.membership import ShoppingListMember
+from shopping_list.models import ShoppingItem, ShoppingList, User
+
+
+@pytest.fixture
+def replica(db, settings, tmp_path):
+    """
+    Adds a replica of the default database in an SQLite file of its own,
+    which is only changed by replicate().
+    """
+    connections.settings["replica"] = {
+        **connections["default"].settings_dict,
+        "NAME": str(tmp_path / "replica.sqlite3"),
+    }
+    with connections["replica"].schema_editor() as schema_editor:
+        for model in apps.get_models():
+            if model._meta.managed and not model._meta.proxy:
+                schema_editor.create_model(model)
+    settings.SHOPPING_LIST_READ_REPLICAS = ["replica"]
+    yield "replica"
+    connections["replica"].close()
+    del connections["replica"]
+    del connections.settings["replica"]
+
+
+def replicate(*objs):
+    for obj in objs:
+        type(obj).objects.using("replica").bulk_create([obj])
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+    )
+    return client
+
+
+@pytest.mark.django_db
+def test_reads_go_to_the_replica_until_the_client_writes(
+    replica, create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    replicate(
+        user,
+        shopping_list,
+        *ShoppingListMember.objects.filter(shoppinglist=shopping_list),
+    )
+    client = token_client(user)
+    url = reverse("shopping_list_detail", args=[shopping_list.id])
+
+    # Not replicated yet
+    ShoppingList.objects.filter(pk=shopping_list.pk).update(name="Food")
+    assert client.get(url).data["name"] == "Groceries"
+
+    response = client.patch(url, {"name": "Weekly groceries"}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert ShoppingList.objects.using(replica).get().name == "Groceries"
+
+    # The client reads its own writes, other clients read the replica
+    assert client.get(url).data["name"] == "Weekly groceries"
+    other_client = create_authenticated_client(user)
+    assert other_client.get(url).data["name"] == "Groceries"
+
+    # Until the pin times out
+    cache.clear()
+    assert client.get(url).data["name"] == "Groceries"
+
+
+@pytest.mark.django_db
+def test_members_are_checked_on_the_default_database(
+    replica, create_user, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+    member = User.objects.create_user("member", "member@kekek.com", "pass")
+    replicate(
+        user,
+        member,
+        shopping_list,
+        *ShoppingListMember.objects.filter(shoppinglist=shopping_list),
+    )
+    response = token_client(user).put(
+        reverse("shopping_list_add_members", args=[shopping_list.id]),
+        {"members": [member.pk]},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    # The membership hasn't reached the replica yet
+    client = token_client(member)
+    response = client.get(
+        reverse("shopping_list_detail", args=[shopping_list.id])
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = client.get(reverse("all_shopping_lists"))
+    assert [result["id"] for result in response.data["results"]] == [
+        str(shopping_list.id)
+    ]
+
+
+@pytest.mark.django_db
+def test_writes_go_to_the_default_database(
+    replica, create_user, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+
+    response = token_client(user).post(
+        reverse("list_add_shopping_item", args=[shopping_list.id]),
+        {"name": "Milk", "purchased": False},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert ShoppingItem.objects.filter(name="Milk").exists()
+    assert not ShoppingItem.objects.using(replica).exists()
+
+
+@pytest.mark.django_db
+def test_reads_go_to_the_default_database_without_replicas(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    shopping_list = create_shopping_list(user)
+
+    response = create_authenticated_client(user).get(
+        reverse("shopping_list_detail", args=[shopping_list.id])
+    )
+
+    assert response.data["name"] == "Groceries"
+
+
+def test_replica_pins_need_a_shared_cache(settings):
+    settings.SHOPPING_LIST_READ_REPLICAS = []
+    assert check_replica_pin_cache(None) == []
+
+    settings.SHOPPING_LIST_READ_REPLICAS = ["replica"]
+    (error,) = check_replica_pin_cache(None)
+    assert error.id == "shopping_list.E001"
+    assert "LocMemCache" in error.hint
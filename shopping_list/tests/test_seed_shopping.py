@@ -0,0 +1,92 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Max
+
+from shopping_list.models import ShoppingItem, ShoppingList, User
+from shopping_list.search import get_search_backend
+
+
+def seed(*args, **options):
+    out = StringIO()
+    call_command(
+        "seed_shopping",
+        *args,
+        users=20,
+        shopping_lists=30,
+        items_per_list=10,
+        members_per_list=3,
+        batch_size=50,
+        stdout=out,
+        **options,
+    )
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("args", [[], ["--orm"]])
+def test_seeded_shopping_lists_are_consistent(args):
+    out = seed(*args)
+
+    item_count = ShoppingItem.objects.count()
+    assert "Created 20 users and 30 shopping lists" in out
+    assert f"{item_count} shopping items" in out
+    assert User.objects.count() == 20
+    assert not ShoppingList.objects.filter(members=None).exists()
+
+    out = StringIO()
+    call_command("repair_item_counts", "--dry-run", stdout=out)
+    assert "Found 0 shopping lists with drifted counts" in out.getvalue()
+    call_command("check_unpurchased_previews", stdout=StringIO())
+
+    for shopping_list in ShoppingList.objects.annotate(
+        last_revision=Max("shopping_items__revision")
+    ):
+        assert shopping_list.revision == (shopping_list.last_revision or 0)
+
+    shopping_list_ids = list(ShoppingList.objects.values_list("pk", flat=True))
+    found = get_search_backend().search(
+        ShoppingItem.objects.all(), ["milk"], shopping_list_ids, 1000
+    )
+    assert set(found) == set(ShoppingItem.objects.filter(name="Milk"))
+
+
+@pytest.mark.django_db
+def test_the_same_seed_generates_the_same_data():
+    def seeded():
+        return list(
+            ShoppingItem.objects.order_by("pk").values_list(
+                "pk", "name", "purchased", "shopping_list", "revision"
+            )
+        )
+
+    seed("--seed", "7", "--distribution", "uniform")
+    first = seeded()
+    ShoppingList.objects.all().delete()
+    User.objects.all().delete()
+    seed("--seed", "7", "--distribution", "uniform")
+
+    assert first
+    assert seeded() == first
+
+
+@pytest.mark.django_db
+def test_seeded_shopping_items_are_ordered_by_creation():
+    seed("--seed", "3", "--distribution", "uniform")
+
+    assert ShoppingItem.objects.exists()
+    for shopping_list in ShoppingList.objects.all():
+        items = list(shopping_list.shopping_items.order_by("id"))
+        assert all(item.id.version == 7 for item in items)
+        assert [item.revision for item in items] == sorted(
+            item.revision for item in items
+        )
+
+
+@pytest.mark.django_db
+def test_seeds_are_generated_once():
+    seed()
+
+    with pytest.raises(CommandError, match="Users of seed 0 already exist"):
+        seed()
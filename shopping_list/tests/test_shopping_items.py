@@ -1,7 +1,14 @@
+import uuid
+from types import SimpleNamespace
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 
+from shopping_list.api.serializers import BulkShoppingItemsSerializer
 from shopping_list.models import ShoppingItem, ShoppingList, User
 
 
@@ -485,3 +492,301 @@ def test_adding_duplicate_item_raises_bad_request(
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert len(shopping_list.shopping_items.all()) == 1
+
+
+@pytest.mark.django_db
+def test_rejected_duplicate_item_leaves_shopping_list_unchanged(
+    create_user,
+    create_authenticated_client,
+    create_shopping_list,
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+    shopping_list.refresh_from_db()
+
+    response = client.post(
+        reverse("list_add_shopping_item", args=[shopping_list.id]),
+        {"name": "Milk", "purchased": False},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == ["There's already this item on the list"]
+    unchanged = ShoppingList.objects.get(pk=shopping_list.pk)
+    assert unchanged.revision == shopping_list.revision
+    assert unchanged.item_count == 1
+    assert unchanged.unpurchased_count == 1
+    assert unchanged.unpurchased_preview == ["Milk"]
+
+
+@pytest.mark.django_db
+def test_purchased_items_may_share_the_name_of_an_unpurchased_one(
+    create_user,
+    create_authenticated_client,
+    create_shopping_list,
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+    milk = {"name": "Milk", "purchased": True}
+
+    response = client.post(
+        reverse("list_add_shopping_item", args=[shopping_list.id]),
+        milk,
+        format="json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = client.post(
+        reverse("bulk_shopping_items", args=[shopping_list.id]),
+        {"create": [milk, milk]},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert shopping_list.shopping_items.filter(name="Milk").count() == 4
+
+
+@pytest.mark.django_db
+def test_shopping_item_membership_check_does_not_depend_on_members(
+    create_user,
+    create_authenticated_client,
+    create_shopping_item,
+    django_assert_num_queries,
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_item = create_shopping_item(user, "Milk")
+    shopping_list = shopping_item.shopping_list
+    url = reverse(
+        "shopping_item_detail",
+        kwargs={"pk": shopping_list.id, "item_pk": shopping_item.id},
+    )
+
+    client.get(url)  # Warms up the membership index
+    with CaptureQueriesContext(connection) as single_member_queries:
+        client.get(url)
+
+    shopping_list.members.add(
+        *User.objects.bulk_create(
+            User(username=f"member{i}", password="kekek") for i in range(50)
+        )
+    )
+    with django_assert_num_queries(len(single_member_queries)):
+        response = client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_list_items_of_missing_shopping_list_are_forbidden(
+    create_user, create_authenticated_client
+):
+    client = create_authenticated_client(create_user())
+    url = reverse("list_add_shopping_item", kwargs={"pk": uuid.uuid4()})
+
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_shopping_items_are_created_updated_and_deleted_in_bulk(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    milk = ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+    eggs = ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Eggs", purchased=False
+    )
+
+    url = reverse("bulk_shopping_items", args=[shopping_list.id])
+    data = {
+        "create": [
+            {"name": f"Item {i}", "purchased": False} for i in range(50)
+        ],
+        "update": [{"id": str(milk.id), "purchased": True}],
+        "delete": [str(eggs.id)],
+    }
+    response = client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["created"]) == 50
+    assert response.data["updated"][0]["purchased"] is True
+    assert response.data["deleted"] == [str(eggs.id)]
+    assert shopping_list.shopping_items.count() == 51
+    assert ShoppingItem.objects.get(id=milk.id).purchased is True
+    assert not ShoppingItem.objects.filter(id=eggs.id).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_shopping_items_report_errors_per_item(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+    other_list_item = ShoppingItem.objects.create(
+        shopping_list=create_shopping_list(user, "Books"),
+        name="War and Peace",
+        purchased=False,
+    )
+
+    url = reverse("bulk_shopping_items", args=[shopping_list.id])
+    data = {
+        "create": [
+            {"name": "Eggs", "purchased": False},
+            {"name": "Milk", "purchased": False},
+            {"name": "Eggs", "purchased": False},
+        ],
+        "update": [{"id": str(other_list_item.id), "purchased": True}],
+        "delete": [str(uuid.uuid4())],
+    }
+    response = client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    create_errors = response.data["create"]
+    assert create_errors[0] == {}
+    assert create_errors[1]["name"] == [
+        "There's already this item on the list"
+    ]
+    assert create_errors[2]["name"] == [
+        "There's already this item on the list"
+    ]
+    assert response.data["update"][0]["id"] == ["Shopping item not found."]
+    assert response.data["delete"][0] == ["Shopping item not found."]
+    assert shopping_list.shopping_items.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_shopping_items_check_names_they_end_up_with(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    milk, eggs, bread = (
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=False
+        )
+        for name in ["Milk", "Eggs", "Bread"]
+    )
+    url = reverse("bulk_shopping_items", args=[shopping_list.id])
+
+    response = client.post(
+        url,
+        {
+            "update": [
+                {"id": str(eggs.id), "name": "Bread"},
+                {"id": str(bread.id), "name": "Milk"},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {
+        "update": [{}, {"name": ["There's already this item on the list"]}]
+    }
+
+    # Names of deleted, purchased and renamed shopping items are free
+    response = client.post(
+        url,
+        {
+            "delete": [str(milk.id)],
+            "update": [
+                {"id": str(eggs.id), "purchased": True},
+                {"id": str(bread.id), "name": "Eggs"},
+            ],
+            "create": [
+                {"name": "Milk", "purchased": False},
+                {"name": "Bread", "purchased": False},
+            ],
+        },
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(
+        shopping_list.shopping_items.filter(purchased=False).values_list(
+            "name", flat=True
+        )
+    ) == ["Bread", "Eggs", "Milk"]
+
+
+@pytest.mark.django_db
+def test_bulk_shopping_items_keep_changes_made_since_validation(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    milk, eggs = (
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=False
+        )
+        for name in ["Milk", "Eggs"]
+    )
+    request = SimpleNamespace(
+        parser_context={"kwargs": {"pk": shopping_list.id}}
+    )
+
+    def validated(*updates):
+        serializer = BulkShoppingItemsSerializer(
+            data={"update": list(updates)}, context={"request": request}
+        )
+        assert serializer.is_valid()
+        return serializer
+
+    serializer = validated(
+        {"id": str(milk.id), "purchased": True},
+        {"id": str(eggs.id), "name": "Brown eggs"},
+    )
+    # Another member deletes a shopping item in the meantime
+    eggs.delete()
+
+    with pytest.raises(ValidationError) as error:
+        serializer.save()
+    assert error.value.detail == {
+        "update": [{}, {"id": ["Shopping item not found."]}]
+    }
+    milk.refresh_from_db()
+    assert milk.purchased is False
+
+    serializer = validated({"id": str(milk.id), "purchased": True})
+    # Another member renames the shopping item in the meantime
+    milk.name = "Oat milk"
+    milk.save()
+    serializer.save()
+
+    milk.refresh_from_db()
+    assert (milk.name, milk.purchased) == ("Oat milk", True)
+
+
+@pytest.mark.django_db
+def test_bulk_shopping_items_restricted_if_not_member_of_list(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    client = create_authenticated_client(create_user())
+    shopping_list_creator = User.objects.create_user(
+        "Creator", "creator@kekek.kek", "kekek"
+    )
+    shopping_list = create_shopping_list(shopping_list_creator)
+
+    url = reverse("bulk_shopping_items", args=[shopping_list.id])
+    data = {"create": [{"name": "Milk", "purchased": False}]}
+    response = client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert shopping_list.shopping_items.count() == 0
@@ -2,6 +2,8 @@ from datetime import timedelta
 from unittest import mock
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -365,9 +367,8 @@ def test_add_members_to_shopping_list_by_list_member(
     url = reverse("shopping_list_add_members", args=[shopping_list.id])
     response = client.put(url, data, format="json")
 
-    assert len(response.data["members"]) == 3
-    assert user2.id in response.data["members"]
-    assert user3.id in response.data["members"]
+    assert response.data["added"] == [user2.id, user3.id]
+    assert shopping_list.members.count() == 3
 
 
 @pytest.mark.django_db
@@ -431,9 +432,8 @@ def test_remove_members_by_list_member(
     url = reverse("shopping_list_remove_members", args=[shopping_list.id])
     response = client.put(url, data, format="json")
 
-    assert len(response.data["members"]) == 1
-    assert user2.id not in response.data["members"]
-    assert user3.id not in response.data["members"]
+    assert response.data["removed"] == [user2.id, user3.id]
+    assert list(shopping_list.members.all()) == [user]
 
 
 @pytest.mark.django_db
@@ -474,3 +474,125 @@ def test_remove_members_with_wrong_data(
     response = client.put(url, data, format="json")
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_number_of_queries_does_not_depend_on_number_of_lists(
+    create_user,
+    create_authenticated_client,
+    create_shopping_list,
+    django_assert_num_queries,
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    url = reverse("all_shopping_lists")
+
+    def create_populated_shopping_list(name):
+        shopping_list = create_shopping_list(user, name)
+        shopping_list.members.add(
+            User.objects.create(username=f"{name} member", password="kekek")
+        )
+        for item_name in ["Eggs", "Milk", "Chocolate", "Mango"]:
+            ShoppingItem.objects.create(
+                shopping_list=shopping_list, name=item_name, purchased=False
+            )
+
+    create_populated_shopping_list("Groceries")
+    with CaptureQueriesContext(connection) as single_list_queries:
+        response = client.get(url)
+    assert len(response.data["results"]) == 1
+
+    create_populated_shopping_list("Books")
+    create_populated_shopping_list("Tools")
+    with django_assert_num_queries(len(single_list_queries)):
+        response = client.get(url)
+
+    assert len(response.data["results"]) == 3
+    for shopping_list in response.data["results"]:
+        assert len(shopping_list["members"]) == 2
+        assert [
+            item["name"] for item in shopping_list["unpurchased_items"]
+        ] == [
+            "Chocolate",
+            "Eggs",
+            "Mango",
+        ]
+
+
+@pytest.mark.django_db
+def test_number_of_queries_for_shopping_list_detail_does_not_depend_on_items(
+    create_user,
+    create_authenticated_client,
+    create_shopping_list,
+    django_assert_num_queries,
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    url = reverse("shopping_list_detail", args=[shopping_list.id])
+
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Eggs", purchased=False
+    )
+    client.get(url)  # Warms up the membership index
+    with CaptureQueriesContext(connection) as few_items_queries:
+        client.get(url)
+
+    for i in range(10):
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=f"Item {i}", purchased=False
+        )
+    with django_assert_num_queries(len(few_items_queries)):
+        response = client.get(url)
+
+    assert len(response.data["unpurchased_items"]) == 3
+
+
+@pytest.mark.django_db
+def test_add_members_reports_only_new_members(
+    create_user,
+    create_authenticated_client,
+    create_shopping_list,
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    user2 = User.objects.create(username="user2", password="kekek")
+
+    data = {"members": [user.id, user2.id]}
+
+    url = reverse("shopping_list_add_members", args=[shopping_list.id])
+    response = client.put(url, data, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"added": [user2.id]}
+
+
+@pytest.mark.django_db
+def test_number_of_queries_to_add_members_does_not_depend_on_members(
+    create_user,
+    create_authenticated_client,
+    create_shopping_list,
+    django_assert_num_queries,
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    url = reverse("shopping_list_add_members", args=[shopping_list.id])
+    client.get(reverse("shopping_list_detail", args=[shopping_list.id]))
+
+    user2 = User.objects.create(username="user2", password="kekek")
+    with CaptureQueriesContext(connection) as single_member_queries:
+        client.put(url, {"members": [user2.id]}, format="json")
+
+    # SQLite limits the number of query parameters, so bigger inserts
+    # are split into batches by Django
+    users = User.objects.bulk_create(
+        User(username=f"member{i}", password="kekek") for i in range(400)
+    )
+    data = {"members": [member.id for member in users]}
+    with django_assert_num_queries(len(single_member_queries)):
+        response = client.put(url, data, format="json")
+
+    assert len(response.data["added"]) == 400
+    assert shopping_list.members.count() == 402
@@ -0,0 +1,164 @@
+from unittest import mock
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.throttling import SimpleRateThrottle
+
+from shopping_list.api.throttling import (CacheCounterStore,
+                                          MinuteRateThrottle,
+                                          RedisCounterStore,
+                                          SlidingWindowRateThrottle, get_store)
+
+
+@pytest.fixture
+def store(settings):
+    settings.SHOPPING_LIST_THROTTLE_STORE = (
+        "shopping_list.api.throttling.LocalCounterStore"
+    )
+    store = get_store()
+    store.clear()
+    return store
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [600.0]
+    monkeypatch.setattr(
+        SlidingWindowRateThrottle, "timer", lambda self: clock[0]
+    )
+    return clock
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    def _rates(**rates):
+        for scope, rate in rates.items():
+            monkeypatch.setitem(SimpleRateThrottle.THROTTLE_RATES, scope, rate)
+
+    return _rates
+
+
+@pytest.mark.django_db
+def test_requests_are_throttled_over_a_sliding_window(
+    create_user, create_authenticated_client, store, now, rates
+):
+    rates(user_minute="2/minute")
+    client = create_authenticated_client(create_user())
+    url = reverse("all_shopping_lists")
+
+    # Two requests at the end of a window
+    now[0] = 659.0
+    assert client.get(url).status_code == status.HTTP_200_OK
+    assert client.get(url).status_code == status.HTTP_200_OK
+
+    # Half of them still count halfway through the next window
+    now[0] = 690.0
+    assert client.get(url).status_code == status.HTTP_200_OK
+    response = client.get(url)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "30"
+
+    now[0] = 720.0
+    assert client.get(url).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_denied_requests_are_not_counted(
+    create_user, create_authenticated_client, store, rates
+):
+    rates(user_minute="2/minute", user_day="5/day")
+    user = create_user()
+    client = create_authenticated_client(user)
+    url = reverse("all_shopping_lists")
+
+    statuses = [client.get(url).status_code for _ in range(4)]
+
+    assert statuses == [200, 200, 429, 429]
+    counts = {
+        key.split("_")[2]: count for key, count in store._counters.items()
+    }
+    assert counts == {"minute": 2, "day": 2}
+
+
+@pytest.mark.django_db
+def test_async_views_are_throttled(
+    create_user, create_authenticated_client, store, now, rates
+):
+    rates(user_minute="2/minute")
+    client = create_authenticated_client(create_user())
+    url = reverse("async_all_shopping_lists")
+
+    now[0] = 600.0
+    assert client.get(url).status_code == status.HTTP_200_OK
+    assert client.get(reverse("all_shopping_lists")).status_code == (
+        status.HTTP_200_OK
+    )
+    response = client.get(url)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "90"
+
+
+@pytest.mark.django_db
+def test_throttles_count_in_the_cache(
+    create_user, create_authenticated_client, rates
+):
+    rates(user_minute="1/minute")
+    client = create_authenticated_client(create_user())
+    url = reverse("all_shopping_lists")
+
+    assert client.get(url).status_code == status.HTTP_200_OK
+    assert client.get(url).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_cache_counter_store_counts_in_a_call_per_counter():
+    store = CacheCounterStore()
+    store.cache.clear()
+
+    assert store.count({"a": 60, "b": 60}, ["c"]) == [1, 1, 0]
+    assert store.count({"a": 60}, ["b"]) == [2, 1]
+    with mock.patch.object(store.cache, "add", wraps=store.cache.add) as add:
+        assert store.count({"a": 60, "b": 60}, []) == [3, 2]
+    add.assert_not_called()
+
+
+def test_redis_counter_store_counts_in_one_round_trip(monkeypatch):
+    pipeline = mock.Mock()
+    # Counts and expires of the increments, then the values read
+    pipeline.execute.return_value = [5, True, 2, True, b"7", None]
+    client = mock.Mock()
+    client.pipeline.return_value = pipeline
+    monkeypatch.setattr(RedisCounterStore, "get_client", lambda self: client)
+    store = RedisCounterStore()
+
+    counts = store.count({"minute": 120, "day": 172800}, ["a", "b"])
+
+    assert counts == [5, 2, 7, 0]
+    pipeline.execute.assert_called_once_with()
+    key = store.cache.make_and_validate_key
+    assert pipeline.incr.call_args_list == [
+        mock.call(key("minute")),
+        mock.call(key("day")),
+    ]
+    assert pipeline.expire.call_args_list == [
+        mock.call(key("minute"), 120),
+        mock.call(key("day"), 172800),
+    ]
+    assert pipeline.get.call_args_list == [
+        mock.call(key("a")),
+        mock.call(key("b")),
+    ]
+
+
+def test_redis_counter_store_needs_a_redis_cache():
+    with pytest.raises(ImproperlyConfigured, match="RedisCache"):
+        RedisCounterStore().count({"a": 60}, [])
+
+
+def test_estimate_weighs_previous_window_by_its_remaining_share():
+    throttle = MinuteRateThrottle()
+    throttle.now, throttle.previous, throttle.current = 615.0, 8, 3
+
+    assert throttle.estimate() == 9.0
@@ -0,0 +1,205 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from shopping_list.models import ShoppingItem, ShoppingList
+
+
+def preview(shopping_list):
+    shopping_list.refresh_from_db()
+    return shopping_list.unpurchased_preview
+
+
+@pytest.mark.django_db
+def test_preview_follows_changes_of_shopping_items(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    items = {
+        name: ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=False
+        )
+        for name in ["Eggs", "Bread", "Milk", "Apples"]
+    }
+    ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Butter", purchased=True
+    )
+    assert preview(shopping_list) == ["Apples", "Bread", "Eggs"]
+
+    items["Apples"].purchased = True
+    items["Apples"].save()
+    assert preview(shopping_list) == ["Bread", "Eggs", "Milk"]
+
+    items["Milk"].name = "Almond milk"
+    items["Milk"].save()
+    assert preview(shopping_list) == ["Almond milk", "Bread", "Eggs"]
+
+    items["Bread"].delete()
+    assert preview(shopping_list) == ["Almond milk", "Eggs"]
+
+    ShoppingItem.objects.filter(name="Eggs").delete()
+    assert preview(shopping_list) == ["Almond milk"]
+
+
+@pytest.mark.django_db
+def test_preview_reads_only_its_size_of_names(
+    create_user, create_shopping_list
+):
+    shopping_list = create_shopping_list(create_user())
+    ShoppingItem.objects.bulk_create(
+        ShoppingItem(
+            shopping_list=shopping_list, name=f"Item {i:03}", purchased=False
+        )
+        for i in range(200)
+    )
+    ShoppingList.objects.filter(pk=shopping_list.pk).update(
+        unpurchased_preview=["Item 000", "Item 001", "Item 002"]
+    )
+    first = ShoppingItem.objects.get(name="Item 000")
+
+    first.purchased = True
+    with CaptureQueriesContext(connection) as queries:
+        first.save()
+
+    assert preview(shopping_list) == ["Item 001", "Item 002", "Item 003"]
+    (select,) = [
+        query["sql"]
+        for query in queries
+        if 'NOT "shopping_list_shoppingitem"."purchased"' in query["sql"]
+    ]
+    assert select.endswith(
+        'ORDER BY "shopping_list_shoppingitem"."name" ASC LIMIT 3'
+    )
+
+
+@pytest.mark.django_db
+def test_preview_follows_bulk_changes(
+    create_user, create_authenticated_client, create_shopping_list
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    shopping_list = create_shopping_list(user)
+    milk = ShoppingItem.objects.create(
+        shopping_list=shopping_list, name="Milk", purchased=False
+    )
+
+    response = client.post(
+        reverse("bulk_shopping_items", args=[shopping_list.id]),
+        {
+            "create": [
+                {"name": "Eggs", "purchased": False},
+                {"name": "Bread", "purchased": True},
+                {"name": "Apples", "purchased": False},
+            ],
+            "update": [{"id": str(milk.id), "purchased": True}],
+        },
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert preview(shopping_list) == ["Apples", "Eggs"]
+
+
+@pytest.mark.django_db
+def test_preview_size_is_configurable(
+    create_user, create_shopping_list, settings
+):
+    settings.SHOPPING_LIST_PREVIEW_SIZE = 1
+    shopping_list = create_shopping_list(create_user())
+    for name in ["Milk", "Eggs"]:
+        ShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=False
+        )
+
+    assert preview(shopping_list) == ["Eggs"]
+
+
+@pytest.mark.django_db
+def test_shopping_lists_are_served_without_reading_shopping_items(
+    create_user, create_authenticated_client, create_shopping_item
+):
+    user = create_user()
+    client = create_authenticated_client(user)
+    create_shopping_item(user, "Eggs")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("all_shopping_lists"))
+
+    assert response.data["results"][0]["unpurchased_items"] == [
+        {"name": "Eggs"}
+    ]
+    assert not any(
+        "shopping_list_shoppingitem" in query["sql"]
+        for query in queries.captured_queries
+    )
+
+
+@pytest.mark.django_db
+def test_check_unpurchased_previews(create_user, create_shopping_list):
+    shopping_list = create_shopping_list(create_user())
+    # Bulk created shopping items aren't previewed
+    ShoppingItem.objects.bulk_create(
+        ShoppingItem(shopping_list=shopping_list, name=name, purchased=False)
+        for name in ["Milk", "Eggs"]
+    )
+
+    out = StringIO()
+    with pytest.raises(CommandError, match="Found 1 outdated previews"):
+        call_command("check_unpurchased_previews", stdout=out)
+    assert f"{shopping_list.pk}: [] instead of ['Eggs', 'Milk']" in (
+        out.getvalue()
+    )
+    assert preview(shopping_list) == []
+
+    call_command("check_unpurchased_previews", "--repair", stdout=out)
+    assert preview(shopping_list) == ["Eggs", "Milk"]
+
+    out = StringIO()
+    call_command("check_unpurchased_previews", stdout=out)
+    assert "All previews are current" in out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_previews_are_filled_by_migration(settings):
+    # The migration keeps the preview size it was written with
+    settings.SHOPPING_LIST_PREVIEW_SIZE = 1
+    executor = MigrationExecutor(connection)
+    executor.migrate([("shopping_list", "0006_shopping_list_item_counts")])
+    apps = executor.loader.project_state(
+        [("shopping_list", "0006_shopping_list_item_counts")]
+    ).apps
+    OldShoppingList = apps.get_model("shopping_list", "ShoppingList")
+    OldShoppingItem = apps.get_model("shopping_list", "ShoppingItem")
+    groceries = OldShoppingList.objects.create(name="Groceries")
+    books = OldShoppingList.objects.create(name="Books")
+    tools = OldShoppingList.objects.create(name="Tools")
+    for shopping_list, name, purchased in [
+        (groceries, "Milk", False),
+        (groceries, "Eggs", False),
+        (groceries, "Bread", True),
+        (groceries, "Tea", False),
+        (groceries, "Butter", False),
+        (books, "Novel", False),
+        (tools, "Hammer", True),
+    ]:
+        OldShoppingItem.objects.create(
+            shopping_list=shopping_list, name=name, purchased=purchased
+        )
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+    assert {
+        shopping_list.name: shopping_list.unpurchased_preview
+        for shopping_list in ShoppingList.objects.all()
+    } == {
+        "Groceries": ["Butter", "Eggs", "Milk"],
+        "Books": ["Novel"],
+        "Tools": [],
+    }
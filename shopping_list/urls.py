@@ -2,8 +2,15 @@ from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework.authtoken.views import obtain_auth_token
 
-from shopping_list.api.views import (ListAddShoppingItem, ListAddShoppingList,
-                                     SearchShoppingItems, ShoppingItemDetail,
+from shopping_list.api.async_views import (AsyncListShoppingItems,
+                                           AsyncListShoppingLists,
+                                           AsyncShoppingItemDetail,
+                                           AsyncShoppingListDetail,
+                                           AsyncShoppingListEvents)
+from shopping_list.api.views import (BulkShoppingItems, ListAddShoppingItem,
+                                     ListAddShoppingList, Metrics,
+                                     SearchShoppingItems, ShoppingItemChanges,
+                                     ShoppingItemDetail,
                                      ShoppingListAddMembers,
                                      ShoppingListDetail,
                                      ShoppingListRemoveMembers)
@@ -38,6 +45,16 @@ urlpatterns = [
         ListAddShoppingItem.as_view(),
         name="list_add_shopping_item",
     ),
+    path(
+        "api/shopping-lists/<uuid:pk>/shopping-items/bulk/",
+        BulkShoppingItems.as_view(),
+        name="bulk_shopping_items",
+    ),
+    path(
+        "api/shopping-lists/<uuid:pk>/shopping-items/changes/",
+        ShoppingItemChanges.as_view(),
+        name="shopping_item_changes",
+    ),
     path(
         "api/shopping-lists/<uuid:pk>/shopping-items/<uuid:item_pk>/",
         ShoppingItemDetail.as_view(),
@@ -48,6 +65,33 @@ urlpatterns = [
         SearchShoppingItems.as_view(),
         name="search_shopping_items",
     ),
+    # Async variants of the read endpoints, for ASGI servers
+    path(
+        "api/async/shopping-lists/",
+        AsyncListShoppingLists.as_view(),
+        name="async_all_shopping_lists",
+    ),
+    path(
+        "api/async/shopping-lists/<uuid:pk>/",
+        AsyncShoppingListDetail.as_view(),
+        name="async_shopping_list_detail",
+    ),
+    path(
+        "api/async/shopping-lists/<uuid:pk>/shopping-items/",
+        AsyncListShoppingItems.as_view(),
+        name="async_list_shopping_items",
+    ),
+    path(
+        "api/async/shopping-lists/<uuid:pk>/shopping-items/<uuid:item_pk>/",
+        AsyncShoppingItemDetail.as_view(),
+        name="async_shopping_item_detail",
+    ),
+    path(
+        "api/async/shopping-lists/<uuid:pk>/events/",
+        AsyncShoppingListEvents.as_view(),
+        name="async_shopping_list_events",
+    ),
+    path("api/metrics/", Metrics.as_view(), name="metrics"),
     # drf-spectacular generated API docs
     path(
         "api/schema/",